@@ -42,7 +42,10 @@ if __name__ == "__main__":
 
         if delete:
             print("Dataset: " + set[:-10] + " TYPE[" + info + "] - DELETING")
-            shutil.rmtree(os.path.join(base, set[:-10]))
-            os.remove(os.path.join(base, set))
+            if os.path.isdir(os.path.join(base, set[:-10])):
+                shutil.rmtree(os.path.join(base, set[:-10]))
+            for ext in [".meta.yaml", ".attr.sqlite", ".manifest.json", ".view.json", ".fingerprint.json", ".journal"]:
+                if os.path.exists(os.path.join(base, set[:-10] + ext)):
+                    os.remove(os.path.join(base, set[:-10] + ext))
         else:
             print("Dataset: " + set[:-10] + " TYPE[" + info + "] - KEEPING")
@@ -20,8 +20,9 @@ import code
 import copy
 import time
 import argparse
+import multiprocessing
 
-from src.lib.run import Run
+from src.lib.registry import PluginRegistry
 
 
 def create_parser():
@@ -36,7 +37,49 @@ def create_parser():
         action="store_true",
         help="Store the full result file and not just the calculated metrics.",
     )
-    parser.add_argument("config", default=None, help="The config file to use.")
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of processes running independent stages of the runs in parallel. Stages shared by several runs always run once.",
+    )
+    parser.add_argument(
+        "--plan",
+        dest="plan",
+        default=False,
+        action="store_true",
+        help="Only print the stages of the runs with cache hits and misses and their estimated runtime, without running anything.",
+    )
+    parser.add_argument(
+        "--list-plugins",
+        dest="list_plugins",
+        default=False,
+        action="store_true",
+        help="Only print the available plugins, without importing them.",
+    )
+    parser.add_argument(
+        "--validate",
+        dest="validate",
+        default=False,
+        action="store_true",
+        help="Only check the config for unknown plugins and parameters, without importing the plugins.",
+    )
+    parser.add_argument(
+        "--enqueue",
+        dest="enqueue",
+        default=False,
+        action="store_true",
+        help="Only add the stages of the runs to the job queue (queue.sqlite), to be run by workers.",
+    )
+    parser.add_argument(
+        "--worker",
+        dest="worker",
+        default=False,
+        action="store_true",
+        help="Run jobs of the job queue until it is empty, in as many processes as given by -j. Needs no config file.",
+    )
+    parser.add_argument("config", nargs="?", default=None, help="The config file to use.")
     return parser
 
 
@@ -63,7 +106,28 @@ if __name__ == "__main__":
         code.interact(local=dict(globals(), **locals()))
         sys.exit(0)
 
-    if not os.path.exists(args.config):
+    if args.list_plugins:
+        print("\n".join(PluginRegistry.get_table()))
+        sys.exit(0)
+
+    if args.worker:
+        from src.lib.jobs import JobQueue, Worker
+        from src.lib.resources import ResourceManager
+
+        def work():
+            # the workers share the cores of the machine
+            ResourceManager.share = max(args.jobs, 1)
+            Worker(JobQueue()).run()
+
+        workers = [multiprocessing.get_context("fork").Process(target=work) for _ in range(max(args.jobs, 1))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+        _LOGGER.info("Job queue: " + str(JobQueue().get_status()))
+        sys.exit(0)
+
+    if args.config is None or not os.path.exists(args.config):
         _LOGGER.critical("Config file does not exist!")
         sys.exit(1)
 
@@ -75,12 +139,60 @@ if __name__ == "__main__":
         _LOGGER.exception(e)
         sys.exit(1)
 
+    if args.validate:
+        from src.lib.sweep import Sweep
+
+        invalid = False
+        for i, cfg in enumerate(_CONFIG):
+            try:
+                configs = Sweep.expand(cfg["config"], cfg.get("sweep"))
+            except Exception as e:
+                configs = [cfg.get("config") if isinstance(cfg, dict) else None]
+                _LOGGER.error("Config {}: {}".format(i, e))
+                invalid = True
+            errors, warnings = [], []
+            for config in configs:
+                e, w = PluginRegistry.validate(config)
+                errors += [message for message in e if message not in errors]
+                warnings += [message for message in w if message not in warnings]
+            if not isinstance(cfg, dict) or "repeat" not in cfg:
+                errors.insert(0, "missing repeat")
+            for message in errors:
+                _LOGGER.error("Config {}: {}".format(i, message))
+            for message in warnings:
+                _LOGGER.warning("Config {}: {}".format(i, message))
+            invalid = invalid or len(errors) > 0
+        _LOGGER.info("Config is invalid." if invalid else "Config is valid.")
+        sys.exit(1 if invalid else 0)
+
+    # imported after the options that only read plugin descriptors, so that they start fast
+    from src.lib.run import Run
+    from src.lib.scheduler import Scheduler
+    from src.lib.planner import Planner
+    from src.lib.sweep import Sweep
+
+    # runs of sweeps are expanded and ordered so that runs sharing stages run one after another
+    _ENTRIES = []
     for cfg in _CONFIG:
+        _ENTRIES += [{"repeat": cfg["repeat"], "config": config} for config in Sweep.expand(cfg["config"], cfg.get("sweep"))]
+    if any("sweep" in cfg for cfg in _CONFIG):
+        _ENTRIES = Sweep.order(_ENTRIES)
+
+    scheduler = Scheduler()
+    for cfg in _ENTRIES:
         for round in range(cfg["repeat"]):
             try:
-                run = Run(copy.deepcopy(cfg["config"]), round=round, save_result=args.save_result)
-                run.run()
+                scheduler.add(Run(copy.deepcopy(cfg["config"]), round=round, save_result=args.save_result, rounds=cfg["repeat"]))
             except Exception as e:
                 _LOGGER.warning("Run failed.")
                 _LOGGER.exception(e)
                 continue
+    if args.plan:
+        print("\n".join(Planner(scheduler).get_table()))
+        sys.exit(0)
+    if args.enqueue:
+        from src.lib.jobs import JobQueue
+
+        JobQueue().enqueue(scheduler)
+        sys.exit(0)
+    scheduler.run(jobs=args.jobs)
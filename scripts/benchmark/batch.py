@@ -0,0 +1,74 @@
+"""
+Benchmark the throughput of face anonymizations point by point against batches (see AbstractFaceAnonymization.anonymize_batch)
+Creates a synthetic dataset of random images in a temporary working directory, as files or packed (see ImagePack),
+and anonymizes a copy of it once with opt.batch_size 1 and once with the given batch size.
+Run from project root via python -m scripts.benchmark.batch [--points POINTS] [--size SIZE] [--batch-size BATCH_SIZE] [--packed] [--methods METHODS]
+"""
+
+import argparse
+import logging
+import os
+import os.path
+import tempfile
+import time
+import yaml
+import numpy as np
+from src.lib.data.pack import ImagePack
+from src.lib.data.set import Dataset
+from src.lib.module_loader import ModuleLoader
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--points", type=int, default=2000, help="Number of images to create.")
+    parser.add_argument("-s", "--size", type=int, default=224, help="Width and height of the images.")
+    parser.add_argument("-b", "--batch-size", dest="batch_size", type=int, default=64, help="Points per batch.")
+    parser.add_argument("--packed", action="store_true", help="Pack the images into one array instead of PNG files.")
+    parser.add_argument(
+        "-m", "--methods", default="gaussianblur,pixelate,gaussnoise,eyemask,blackbox", help="Comma separated anonymizations to measure."
+    )
+    return parser
+
+
+def create_dataset(name, points, size, packed):
+    import cv2
+
+    folder = os.path.join("data", name)
+    os.makedirs(folder)
+    keys = ["{:06d}.{:06d}".format(i // 20, i) for i in range(points)]
+    rng = np.random.default_rng(0)
+    if packed:
+        array = ImagePack.create(folder, keys, (size, size, 3))
+        for i in range(points):
+            array[i] = rng.integers(0, 256, (size, size, 3), dtype=np.uint8)
+        array.flush()
+    else:
+        for key in keys:
+            cv2.imwrite(os.path.join(folder, key + ".png"), rng.integers(0, 256, (size, size, 3), dtype=np.uint8))
+    with open(os.path.join("data", name + ".meta.yaml"), "w") as file:
+        file.write("---\n" + yaml.dump({"name": name, "original": True, "trait": "face"}))
+
+
+def timed(method, batch_size):
+    dataset = Dataset("bench").copy()
+    anonymization = ModuleLoader.get_anonymization_by_name(method, "face")({"opt": {"batch_size": batch_size}}, dataset)
+    start = time.perf_counter()
+    anonymization.run()
+    return len(dataset.datapoints) / (time.perf_counter() - start)
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        create_dataset("bench", args.points, args.size, args.packed)
+
+        for method in args.methods.split(","):
+            single = timed(method, 1)
+            batched = timed(method, args.batch_size)
+            print("{}: per point {:8.1f} points/s, batches of {} {:8.1f} points/s".format(method, single, args.batch_size, batched))
@@ -0,0 +1,55 @@
+"""
+Benchmark the throughput of a process pool against the CPU budget (see ResourceManager)
+Every point is a BLAS-heavy filter on a synthetic image. With the budget managed, the pool has as many processes
+as the budget allows and every process limits BLAS to its share; unmanaged, every process starts as many BLAS threads as there are cores.
+Run from project root via python -m scripts.benchmark.budget [--points POINTS] [--size SIZE] [--budgets BUDGETS]
+"""
+
+import argparse
+import time
+import numpy as np
+from multiprocessing import get_context
+from src.lib.resources import ResourceManager
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-p", "--points", type=int, default=256, help="Number of points to process.")
+    parser.add_argument("-s", "--size", type=int, default=256, help="Width and height of the images.")
+    parser.add_argument("-b", "--budgets", default=None, help="Comma separated budgets to measure (default: powers of two up to all cores).")
+    return parser
+
+
+def process(args):
+    seed, size = args
+    img = np.random.default_rng(seed).random((size, size))
+    kernel = np.tri(size) / size
+    # separable box filter as two matrix products
+    return float((kernel @ img @ kernel.T).sum())
+
+
+def timed(budget, points, size, managed):
+    ResourceManager.configure(budget)
+    workers = ResourceManager.get_workers()
+    threads = ResourceManager.get_threads(workers) if managed else ResourceManager.get_cpus()
+    start = time.perf_counter()
+    with get_context("fork").Pool(processes=workers, initializer=ResourceManager.init_worker, initargs=(threads,)) as pool:
+        pool.map(process, [(i, size) for i in range(points)], chunksize=max(points // (workers * 4), 1))
+    return points / (time.perf_counter() - start)
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    cpus = ResourceManager.get_cpus()
+    if args.budgets is not None:
+        budgets = [int(b) for b in args.budgets.split(",")]
+    else:
+        budgets = sorted(set([2**i for i in range(cpus.bit_length()) if 2**i <= cpus] + [cpus]))
+
+    for budget in budgets:
+        managed = timed(budget, args.points, args.size, True)
+        unmanaged = timed(budget, args.points, args.size, False)
+        print("budget {:3d}: managed {:8.1f} points/s, unmanaged {:8.1f} points/s".format(budget, managed, unmanaged))
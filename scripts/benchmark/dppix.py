@@ -0,0 +1,89 @@
+"""
+Benchmark DP-Pix per image: the former loop over blocks and pixels against the vectorized implementation (see DppixAnonymization)
+Both are run on the same synthetic images. As both draw Laplace noise, their outputs are compared by statistics:
+the mean absolute difference to the unperturbed block means and its standard deviation should agree.
+Run from project root via python -m scripts.benchmark.dppix [--images IMAGES] [--size SIZE] [-b B] [-e E] [-m M]
+"""
+
+import argparse
+import math
+import time
+import numpy as np
+from src.anonymization.face.dppix import DppixAnonymization
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-i", "--images", type=int, default=20, help="Number of images to anonymize.")
+    parser.add_argument("-s", "--size", type=int, default=224, help="Width and height of the images.")
+    parser.add_argument("-b", type=int, default=16, help="Block size.")
+    parser.add_argument("-e", type=float, default=0.5, help="Privacy budget.")
+    parser.add_argument("-m", type=int, default=16, help="Number of pixels.")
+    return parser
+
+
+def anonymize_loop(img, config, rng):
+    """The former implementation, with blocks over the width instead of the height of the image."""
+    copy = img.copy()
+    for i in range(math.ceil(img.shape[0] / config["b"])):
+        for j in range(math.ceil(img.shape[1] / config["b"])):
+            colors = []
+            for x in range(config["b"]):
+                for y in range(config["b"]):
+                    try:
+                        colors.append(img[i * config["b"] + x, j * config["b"] + y])
+                    except IndexError:
+                        pass
+            new_color = np.mean(colors, axis=0)
+            for x in range(3):
+                new_color[x] += rng.laplace(scale=((255 * config["m"]) / (config["b"] * config["b"] * config["e"])))
+                new_color[x] = max(0, min(255, new_color[x]))
+
+            for x in range(config["b"]):
+                for y in range(config["b"]):
+                    try:
+                        copy[i * config["b"] + x, j * config["b"] + y] = new_color
+                    except IndexError:
+                        pass
+    return copy
+
+
+class Point:
+    def __init__(self, i):
+        self.idname = "bench"
+        self.pointname = str(i)
+
+
+def get_deviation(images, results, b):
+    """Return the absolute differences of the results to the mean colors of their blocks."""
+    deviations = []
+    for img, result in zip(images, results):
+        for i in range(0, img.shape[0], b):
+            for j in range(0, img.shape[1], b):
+                mean = img[i : i + b, j : j + b].reshape(-1, 3).mean(axis=0)
+                deviations.append(np.abs(result[i, j].astype(np.float64) - mean))
+    return np.concatenate(deviations)
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    config = {"b": args.b, "e": args.e, "m": args.m, "seed": 0}
+    # the anonymization is only used for its methods, it needs no dataset
+    anonymization = DppixAnonymization.__new__(DppixAnonymization)
+    anonymization.config = config
+    rng = np.random.default_rng(0)
+    images = [rng.integers(0, 256, (args.size, args.size, 3), dtype=np.uint8) for _ in range(args.images)]
+
+    start = time.perf_counter()
+    loop = [anonymize_loop(img, config, rng) for img in images]
+    loop_time = (time.perf_counter() - start) / args.images
+    start = time.perf_counter()
+    vectorized = [anonymization.anonymize_batch(img[np.newaxis], [Point(i)])[0] for i, img in enumerate(images)]
+    vectorized_time = (time.perf_counter() - start) / args.images
+
+    for name, results, elapsed in [("loop", loop, loop_time), ("vectorized", vectorized, vectorized_time)]:
+        deviation = get_deviation(images, results, args.b)
+        print("{}: {:9.3f} ms per image, deviation from block means {:.2f} (std {:.2f})".format(name, elapsed * 1000, deviation.mean(), deviation.std()))
@@ -0,0 +1,55 @@
+"""
+Benchmark cold (full folder scan) and warm (manifest) load times of a dataset
+Creates a synthetic dataset of empty files in a temporary working directory.
+Run from project root via python -m scripts.benchmark.scan [--files FILES] [--per-id PER_ID] [--repeat REPEAT]
+"""
+
+import argparse
+import logging
+import os
+import os.path
+import tempfile
+import time
+import yaml
+from src.lib.data.set import Dataset
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-f", "--files", type=int, default=200000, help="Number of datapoint files to create.")
+    parser.add_argument("-p", "--per-id", dest="per_id", type=int, default=20, help="Number of datapoints per identity.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of timed loads per mode.")
+    return parser
+
+
+def create_dataset(name, files, per_id):
+    folder = os.path.join("data", name)
+    os.makedirs(folder)
+    for i in range(files):
+        open(os.path.join(folder, "{:06d}.{:06d}.png".format(i // per_id, i)), "w").close()
+    with open(os.path.join("data", name + ".meta.yaml"), "w") as file:
+        file.write("---\n" + yaml.dump({"name": name, "original": True, "trait": "face"}))
+
+
+def timed_load(name, cold):
+    if cold and os.path.exists(Dataset.get_manifest_path(name)):
+        os.remove(Dataset.get_manifest_path(name))
+    start = time.perf_counter()
+    Dataset(name)
+    return time.perf_counter() - start
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.WARNING)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        create_dataset("bench", args.files, args.per_id)
+
+        for mode in ["cold", "warm"]:
+            times = [timed_load("bench", mode == "cold") for _ in range(args.repeat)]
+            print("{}: min {:.3f}s, mean {:.3f}s ({} files)".format(mode, min(times), sum(times) / len(times), args.files))
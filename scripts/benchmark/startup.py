@@ -0,0 +1,70 @@
+"""
+Benchmark the startup time of the CLI entry point
+Times main.py --list-plugins and --validate, which only read plugin descriptors (see PluginRegistry),
+against importing every plugin module through ModuleLoader. Plugins whose dependencies are missing are counted as failed.
+Run from project root via python -m scripts.benchmark.startup [--config CONFIG] [--repeat REPEAT]
+"""
+
+import argparse
+import subprocess
+import sys
+import time
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-c", "--config", default="sample.runconfig.yaml", help="Config file to validate.")
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="Number of timed runs per command.")
+    return parser
+
+
+# imports all plugins like running them would, before the registry this was needed to list or check them
+IMPORT_ALL = """
+import logging
+from src.lib.registry import PluginRegistry
+from src.lib.module_loader import ModuleLoader
+
+loaders = {
+    "exp": lambda p: ModuleLoader.get_exp_by_name(p["name"]),
+    "anonymization": lambda p: ModuleLoader.get_anonymization_by_name(p["name"], p["trait"]),
+    "deanonymization": lambda p: ModuleLoader.get_deanonymization_by_name(p["name"], p["trait"]),
+    "privacy": lambda p: ModuleLoader.get_classification_by_name(p["name"], p["trait"]),
+    "utility": lambda p: ModuleLoader.get_utility_by_name(p["name"], p["trait"]),
+    "selector": lambda p: ModuleLoader.get_selector_by_name(p["name"]),
+    "splitter": lambda p: ModuleLoader.get_splitter_by_name(p["name"]),
+    "metric": lambda p: ModuleLoader.get_metric_by_name(p["name"]),
+}
+failed = 0
+for plugin in PluginRegistry.load():
+    try:
+        loaders[plugin["kind"]](plugin)
+    except Exception:
+        failed += 1
+print(failed)
+"""
+
+
+def timed(command):
+    start = time.perf_counter()
+    output = subprocess.run(command, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    return time.perf_counter() - start, output.stdout
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    commands = [
+        ("list-plugins", [sys.executable, "main.py", "--list-plugins"]),
+        ("validate", [sys.executable, "main.py", "--validate", args.config]),
+        ("import all plugins", [sys.executable, "-c", IMPORT_ALL]),
+    ]
+    for name, command in commands:
+        results = [timed(command) for _ in range(args.repeat)]
+        times = [t for t, _ in results]
+        note = ""
+        if name == "import all plugins":
+            note = " ({} plugins failed to import)".format(results[-1][1].strip())
+        print("{}: min {:.3f}s, mean {:.3f}s{}".format(name, min(times), sum(times) / len(times), note))
@@ -0,0 +1,45 @@
+"""
+Convert the per-point and per-identity YAML sidecar files of a dataset into a single attribute store (data/<dataset>.attr.sqlite)
+Run from project root via python -m scripts.dataset.convert_attributes [--remove] <dataset>
+"""
+
+import argparse
+import os
+import os.path
+import yaml
+from src.lib.data.set import Dataset
+from src.lib.data.attributes import AttributeStore
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-r", "--remove", default=False, action="store_true", help="Remove the YAML sidecar files after converting.")
+    parser.add_argument("dataset", default=None, help="The name of the dataset to convert.")
+    return parser
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    if AttributeStore.exists(args.dataset):
+        raise AttributeError("dataset already has an attribute store!")
+
+    set = Dataset(args.dataset)
+    keys = list(set.identities.keys()) + list(set.datapoints.keys())
+
+    attributes = {}
+    for key in keys:
+        path = os.path.join(set.folder, key + ".yaml")
+        if os.path.exists(path):
+            with open(path, "r") as file:
+                attributes[key] = yaml.load(file, Loader=yaml.SafeLoader)
+
+    AttributeStore(set.name).set_batch(attributes)
+    print("Converted attributes of {} identities and datapoints.".format(len(attributes)))
+
+    if args.remove:
+        for key in attributes.keys():
+            os.remove(os.path.join(set.folder, key + ".yaml"))
@@ -7,6 +7,7 @@ import sys
 import random
 import os
 from src.lib.data.set import Dataset
+from src.lib.data.point import PackedImage
 
 if __name__ == "__main__":
     anon_set = Dataset(sys.argv[1])
@@ -15,11 +16,15 @@ if __name__ == "__main__":
 
     random.seed(a=sys.argv[4])
 
-    result_set = clear_set.copy(newname=(anon_set.name + "-p" + str(perc)), softlinked=True)
+    result_set = clear_set.copy(newname=(anon_set.name + "-p" + str(perc)), softlinked=True).detach()
 
     for identity in result_set.point_by_id():
         random.shuffle(identity)
         split = int((perc / 100) * len(identity))
         for img in identity[:split]:
+            if isinstance(result_set.datapoints[img], PackedImage):
+                # the pack of the result set is unshared from the clear set on the first write
+                result_set.datapoints[img].save_image(anon_set.datapoints[img].load_image())
+                continue
             os.remove(result_set.datapoints[img].get_path())
             os.symlink(anon_set.datapoints[img].get_path(), result_set.datapoints[img].get_path())
@@ -0,0 +1,11 @@
+"""
+Rebuild the dataset index (data/index.json) from the meta files of all datasets
+Required after datasets were added, removed or renamed outside of the framework.
+Run from project root via python -m scripts.dataset.reindex
+"""
+
+from src.lib.data.index import DatasetIndex
+
+if __name__ == "__main__":
+    index = DatasetIndex.rebuild()
+    print("Indexed {} datasets.".format(len(index["sets"])))
@@ -5,8 +5,8 @@ Run from project root via python -m scripts.dataset.select [--opts OPTS_JSON] <s
 
 import json
 import argparse
-import os
 from src.lib.data.set import Dataset
+from src.lib.data.manager import DatasetManager
 from src.lib.module_loader import ModuleLoader
 
 
@@ -29,10 +29,7 @@ if __name__ == "__main__":
     selector = ModuleLoader.get_selector_by_name(args.selector)(json.loads(args.opts))
     new_set = selector.run(set)
 
-    name = new_set.name
-    new_set.meta = {"name": args.dataset_tocreate, "original": True, "trait": set.meta["trait"]}
+    new_set.meta = {"name": new_set.name, "original": True, "trait": set.meta["trait"]}
     new_set.save_meta()
 
-    base = os.path.join(os.getcwd(), "data")
-    os.rename(os.path.join(base, name + ".meta.yaml"), os.path.join(base, args.dataset_tocreate + ".meta.yaml"))
-    os.rename(os.path.join(base, name), os.path.join(base, args.dataset_tocreate))
+    DatasetManager.rename(new_set.name, args.dataset_tocreate)
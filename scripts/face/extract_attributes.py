@@ -21,17 +21,18 @@ if __name__ == "__main__":
     i = 0
     n = len(set.datapoints)
 
-    for img in tqdm(set.datapoints.values()):
-        i += 1
-        print("Image {}/{}.".format(i, n))
-        try:
-            res = DeepFace.analyze(
-                img_path=img.get_path(),
-                actions=["age", "race", "gender"],
-                detector_backend="retinaface",
-                already_normalized=True,
-            )
-            res = json.loads(json.dumps(res))
-            img.save_attr("deepface", res)
-        except ValueError as e:
-            print(e)
+    with set.attribute_batch(every=100) as attributes:
+        for img in tqdm(set.datapoints.values()):
+            i += 1
+            print("Image {}/{}.".format(i, n))
+            try:
+                res = DeepFace.analyze(
+                    img_path=img.get_path(),
+                    actions=["age", "race", "gender"],
+                    detector_backend="retinaface",
+                    already_normalized=True,
+                )
+                res = json.loads(json.dumps(res))
+                attributes.set(img, "deepface", res)
+            except ValueError as e:
+                print(e)
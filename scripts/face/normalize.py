@@ -28,7 +28,7 @@ def get_largest_face(info):
     return list(info.values())[largest]
 
 
-def normalize_image(point, model, interactive=False):
+def normalize_image(point, model, attributes, interactive=False):
     img = cv2.imread(point.get_path())
 
     info = RetinaFace.detect_faces(img, model=model)
@@ -88,7 +88,7 @@ def normalize_image(point, model, interactive=False):
     img = cv2.resize(img, target_size)
 
     cv2.imwrite(point.get_path()[:-4] + ".png", img)
-    point.save_attr("bbox", {"top": 0, "left": 0, "bottom": target_size[0] - 1, "right": target_size[0] - 1})
+    attributes.set(point, "bbox", {"top": 0, "left": 0, "bottom": target_size[0] - 1, "right": target_size[0] - 1})
     if not point.get_path() == point.get_path()[:-4] + ".png":
         os.remove(point.get_path())
 
@@ -110,13 +110,15 @@ if len(sys.argv) > 3:
 
 if not interactive:
     newset = set.copy(newname=set.name + "-normx")
-    for point in tqdm(newset.datapoints.values()):
-        try:
-            normalize_image(point, model)
-        except BaseException as e:
-            logging.error("\n\n")
-            logging.error("ERROR: failed to normalize image " + point.get_path())
-            logging.exception(e)
+    with newset.attribute_batch(every=100) as attributes:
+        for point in tqdm(newset.datapoints.values()):
+            try:
+                normalize_image(point, model, attributes)
+            except BaseException as e:
+                logging.error("\n\n")
+                logging.error("ERROR: failed to normalize image " + point.get_path())
+                logging.exception(e)
 else:
     point = set.datapoints[sys.argv[3]]
-    normalize_image(point, model, True)
+    with set.attribute_batch() as attributes:
+        normalize_image(point, model, attributes, True)
@@ -0,0 +1,54 @@
+"""
+Pack the images of a dataset of equally sized images (e.g. after scripts/face/normalize.py) into a memory-mapped image pack
+The image files are replaced by data/<dataset>/pack.npy and data/<dataset>/pack.json, see src/lib/data/pack.py
+Run from project root via python -m scripts.face.pack [--keep] <dataset>
+"""
+
+import argparse
+import os
+from tqdm import tqdm
+from src.lib.data.set import Dataset
+from src.lib.data.pack import ImagePack
+from src.lib.data.point import Image, PNGImage
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("-k", "--keep", default=False, action="store_true", help="Keep the image files after packing.")
+    parser.add_argument("dataset", default=None, help="The name of the dataset to pack.")
+    return parser
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    set = Dataset(args.dataset)
+    if ImagePack.exists(set.folder):
+        raise AttributeError("dataset is already packed!")
+
+    points = [point for point in set.datapoints.values() if type(point) in [Image, PNGImage]]
+    if not len(points):
+        raise AttributeError("dataset contains no images!")
+    for point in points:
+        if os.path.islink(point.get_path()):
+            raise AttributeError("dataset contains symlinked images, pack the dataset holding the files instead!")
+
+    shape = points[0].load_image().shape
+    array = ImagePack.create(set.folder, [point.idname + "." + point.pointname for point in points], shape)
+    for i, point in enumerate(tqdm(points)):
+        img = point.load_image()
+        if img.shape != shape:
+            os.remove(os.path.join(set.folder, ImagePack.index))
+            os.remove(os.path.join(set.folder, ImagePack.data))
+            raise AttributeError("image " + point.get_filename() + " has shape " + str(img.shape) + ", expected " + str(shape))
+        array[i] = img
+    array.flush()
+
+    if not args.keep:
+        for point in points:
+            os.remove(point.get_path())
+
+    print("Packed {} images of shape {}.".format(len(points), shape))
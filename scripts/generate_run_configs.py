@@ -1,11 +1,16 @@
 #!/usr/bin/env python3
 """
 Generate run config files from experiment config files.
+Every list-valued anonymization parameter is swept (all combinations), further parameters can be swept
+with a sweep block (see Sweep), e.g. over the parameters of the selector or the recognition.
+Runs in the written file are ordered so that runs sharing stages, e.g. the same anonymized set, are next to each other.
+Run from project root via python -m scripts.generate_run_configs CONFIG
 """
 
 import argparse
 import yaml
 import copy
+from src.lib.sweep import Sweep
 
 
 def generate_single_config(base):
@@ -23,6 +28,7 @@ def generate_single_config(base):
 
 
 def generate_configs(exp_config):
+    """Return the run configs of an experiment config in the order of the swept parameters (see scripts/plot_results.py)."""
     configs = []
     base = {
         "cleanup": True,
@@ -40,19 +46,12 @@ def generate_configs(exp_config):
 
     for anonymization in exp_config["anonymizations"]:
         base["anonymization"] = anonymization
-        param = None
-        for k, v in base["anonymization"]["params"].items():
-            if type(v) is list:
-                param = k
+        params = {"anonymization.params." + k: v for k, v in anonymization["params"].items() if type(v) is list}
+        for config in Sweep.expand(base, [{"product": params}] if len(params) else None):
+            for single in generate_single_config(config):
+                configs += [x for x in Sweep.expand(single, exp_config.get("sweep")) if x not in configs]
 
-        if param is not None:
-            for p in copy.deepcopy(base["anonymization"]["params"][param]):
-                base["anonymization"]["params"][param] = p
-                configs.append(generate_single_config(base))
-        else:
-            configs.append(generate_single_config(base))
-
-    return list(map(lambda x: {"repeat": 1, "config": x}, [x for y in configs for x in y]))
+    return [{"repeat": 1, "config": x} for x in configs]
 
 
 def create_parser():
@@ -70,7 +69,7 @@ if __name__ == "__main__":
     with open(args.config, "r") as file:
         exp_config = yaml.load(file, Loader=yaml.SafeLoader)
 
-    run_config = generate_configs(exp_config)
+    run_config = Sweep.order(generate_configs(exp_config))
 
     with open(args.config.replace(".yaml", ".runconfig.yaml"), "w") as file:
         file.write("---\n" + yaml.dump(run_config))
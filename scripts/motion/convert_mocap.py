@@ -0,0 +1,40 @@
+"""
+Convert the JSON .mocap files of a dataset into the binary memory-mappable format (NumPy .npy) in place
+Run from project root via python -m scripts.motion.convert_mocap <dataset>
+"""
+
+import argparse
+import os
+from src.lib.data.set import Dataset
+from src.lib.data.point import MOCAP
+
+
+def create_parser():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("dataset", default=None, help="The name of the dataset to convert.")
+    return parser
+
+
+parser = create_parser()
+__doc__ += parser.format_help()
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+
+    set = Dataset(args.dataset)
+    converted = 0
+    skipped = 0
+    for point in set.datapoints.values():
+        if not isinstance(point, MOCAP):
+            continue
+        if os.path.islink(point.get_path()):
+            # the file belongs to another dataset, convert that one instead
+            print("Skipping symlinked file " + point.get_filename())
+            skipped += 1
+            continue
+        if point.is_binary():
+            continue
+        point.save(point.load())
+        converted += 1
+
+    print("Converted {} datapoints, skipped {} symlinked datapoints.".format(converted, skipped))
@@ -2,7 +2,7 @@
 
 """Plots the motions in a file, might require some adjusting of the shown range and angle.
 
-Original: One file with a motion sequences as position as list of list [[],[],...]
+Original: One file with a motion sequences as position as list of list [[],[],...], binary (.npy) or JSON
 
 in_path: Path to the motion sequence file
 """
@@ -11,6 +11,17 @@ from matplotlib.animation import FuncAnimation
 from matplotlib import pyplot as plt
 import sys
 import json
+import numpy as np
+
+
+def load_motion(path):
+    """Load a motion sequence, binary (.npy) as written by MOCAP.save or legacy JSON."""
+    with open(path, "rb") as f:
+        binary = f.read(6) == b"\x93NUMPY"
+    if binary:
+        return np.load(path).tolist()
+    with open(path, "r") as f:
+        return json.load(f)
 
 
 def plot_original_poses(poses):
@@ -59,6 +70,5 @@ if __name__ == "__main__":
         exit(1)
 
     walker_file = sys.argv[1]
-    with open(walker_file, "r") as f:
-        walker_data = json.load(f)
-        plot_original_poses(walker_data)
+    walker_data = load_motion(walker_file)
+    plot_original_poses(walker_data)
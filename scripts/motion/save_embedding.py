@@ -31,11 +31,12 @@ if __name__ == "__main__":
     pca.fit(data)
 
     i = 0
-    for mocap in set.datapoints.values():
-        try:
-            res = pca.transform(data[i].reshape(1, -1)).flatten().tolist()
-            res = json.loads(json.dumps(res))
-            mocap.save_attr("embedding", res)
-        except ValueError as e:
-            print(e)
-        i = i + 1
+    with set.attribute_batch() as attributes:
+        for mocap in set.datapoints.values():
+            try:
+                res = pca.transform(data[i].reshape(1, -1)).flatten().tolist()
+                res = json.loads(json.dumps(res))
+                attributes.set(mocap, "embedding", res)
+            except ValueError as e:
+                print(e)
+            i = i + 1
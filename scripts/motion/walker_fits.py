@@ -5,7 +5,7 @@
 Original: A gait data set which was already put into the right structure and preprocessed
 Result: Update to the metadata file of each subject
 
-in_path: Path to the folder with the .bsor files
+in_path: Path to the folder with the .bsor files and the walker files (.json or .mocap, binary or JSON)
 """
 
 import time
@@ -22,6 +22,16 @@ from os import listdir
 from os.path import isfile, join
 
 
+def load_motion(path):
+    """Load a motion sequence, binary (.npy) as written by MOCAP.save or legacy JSON."""
+    with open(path, "rb") as f:
+        binary = f.read(6) == b"\x93NUMPY"
+    if binary:
+        return np.load(path)
+    with open(path, "r") as f:
+        return np.array(json.load(f))
+
+
 def create_walker_fits(data, fps):
     combined_sequences = []
     for sample in data:
@@ -163,17 +173,16 @@ if __name__ == "__main__":
 
     onlyfiles = [f for f in listdir(data_folder) if isfile(join(data_folder, f))]
 
-    json_files = [f for f in onlyfiles if ".json" in f]
+    json_files = [f for f in onlyfiles if ".json" in f or ".mocap" in f]
     yaml_files = [f for f in onlyfiles if ".yaml" in f]
 
     walker_data = {}
     for file in json_files:
-        with open(join(data_folder, file), "r") as f:
-            id = file.split(".")[0]
-            if id not in walker_data:
-                walker_data[id] = []
+        id = file.split(".")[0]
+        if id not in walker_data:
+            walker_data[id] = []
 
-            walker_data[id].append(json.load(f))
+        walker_data[id].append(load_motion(join(data_folder, file)))
 
     for i in walker_data:
         print(i)
@@ -4,7 +4,7 @@ import matplotlib.pyplot as plt
 import yaml
 import copy
 
-from generate_run_configs import generate_configs
+from scripts.generate_run_configs import generate_configs
 
 
 def calc_auc(xs, ys):
@@ -1,16 +1,22 @@
 import logging
 import uuid
+from ..lib.data.journal import Journal
+from ..lib.executor import PointExecutor
+from ..lib.rng import RandomStreams
 
 
 class AbstractAnonymization:
     name = "abstract"
     random = False
+    # processes of anonymize_all unless set by opt.workers, None for the CPU budget of the run (see PointExecutor)
+    workers = 1
 
     def __init__(self, config, dataset):
         self.log = logging.getLogger("seba.anonymization")
         self.config = config
         self.dataset = dataset
         self.bg = None
+        self.bg_key = None
 
         if self.dataset.meta["original"] is True or ("softlinked" in self.dataset.meta and self.dataset.meta["softlinked"] is True):
             raise AttributeError("Can only run anonymization on non-original hardlinked datasets.")
@@ -26,24 +32,105 @@ class AbstractAnonymization:
 
     def run(self):
         self.log.info("Running anonymization on dataset " + self.dataset.name)
+        self.journal = Journal(self.dataset.name)
+        self.done = self.dataset.resume(self.journal, keep=self.resumable())
+        # the set is only used as a result once it is marked complete
+        self.save_meta(complete=False)
+        if not self.unshares_points():
+            self.dataset.unshare()
         self.anonymize_all()
+        self.dataset.sync()
         self.save_meta()
+        self.journal.delete()
         self.log.info("Anonymization successful.")
 
     def anonymize_all(self):
-        for point in self.dataset.datapoints.values():
-            self.anonymize(point)
+        shared = self.dataset.meta.get("copy_mode") == "hardlink"
+        points = self.pending_points()
+        executor = PointExecutor(self.config, self.workers)
+        size = self.get_batch_size()
+        batched = size is not None and size > 1
+        if shared and (batched or executor.is_parallel()) and len(points):
+            # packed images share one file, which must not be copied by several workers or threads at once
+            points[0].unshare()
+
+        def anonymize(point):
+            if shared:
+                point.unshare()
+            self.anonymize_point(point)
+
+        def save(point, image):
+            if shared:
+                point.unshare()
+            point.save_image(image)
+
+        if batched:
+            executor.run_batches(points, size, lambda point: point.load_image(), self.anonymize_batch, save, self.finish_point, "Anonymized")
+        else:
+            executor.run(points, anonymize, self.finish_point, "Anonymized")
+
+    def get_batch_size(self):
+        """Return the number of points anonymize_all passes to anonymize_batch at once (see AbstractFaceAnonymization),
+        None to anonymize one point at a time."""
+        return None
+
+    def anonymize_point(self, point):
+        """Anonymize a single point, called by anonymize_all for every pending point, possibly in a worker process."""
+        self.anonymize(point)
+
+    def unshares_points(self):
+        """Whether anonymize_all unshares hardlinked files itself right before each point is written."""
+        return type(self).anonymize_all is AbstractAnonymization.anonymize_all
+
+    def resumable(self):
+        """Whether anonymize_all records finished points (see finish_point), so an interrupted run can be resumed."""
+        return type(self).anonymize_all is AbstractAnonymization.anonymize_all
+
+    @classmethod
+    def is_pointwise(cls):
+        """Whether every point is anonymized on its own, independent of the other points, the background and random state.
+        Anonymizing a dataset then equals anonymizing its parent and keeping the points of the dataset."""
+        return cls.anonymize_all is AbstractAnonymization.anonymize_all and not cls.random
+
+    def streamable(self):
+        """Whether points are anonymized one at a time only through load_image and save_image,
+        so the anonymization can be applied to in-memory datasets (see StreamExperiment)."""
+        return self.resumable()
+
+    def pending_points(self):
+        """Return the points not finished by an earlier, interrupted run."""
+        return [point for key, point in self.dataset.datapoints.items() if key not in self.done]
+
+    def finish_point(self, point):
+        self.journal.record(point.idname + "." + point.pointname)
 
     def anonymize(self, point):
         pass
 
-    def add_bg(self, bg):
+    def get_seed(self):
+        """Return the seed parameter, or the random value of the dataset if none is set (see save_meta)."""
+        if self.config.get("seed") is not None:
+            return self.config["seed"]
+        if "random" not in self.dataset.meta:
+            self.dataset.meta["random"] = int(uuid.uuid4())
+        return self.dataset.meta["random"]
+
+    def get_rng(self, point):
+        """Return the random generator of a point, derived from the seed, the anonymization and the key of the point.
+        Random anonymizations draw from it, so their results do not depend on the order or process points are anonymized in."""
+        return RandomStreams.get_generator(self.get_seed(), self.name, point.idname + "." + point.pointname)
+
+    def add_bg(self, bg, key=None):
+        """Set the background dataset, saved in the meta by key (its name by default)."""
         self.bg = bg
+        self.bg_key = bg.name if key is None else key
 
-    def save_meta(self):
+    def save_meta(self, complete=True):
         self.dataset.meta["anonymization"] = self.name
         self.dataset.meta["params"] = self.config
-        self.dataset.meta["random"] = 0 if not self.random else int(uuid.uuid4())
+        if "random" not in self.dataset.meta:
+            self.dataset.meta["random"] = 0 if not self.random else int(uuid.uuid4())
+        self.dataset.meta["complete"] = complete
         if self.bg is not None:
-            self.dataset.meta["background"] = self.bg.name
+            self.dataset.meta["background"] = self.bg_key
         self.dataset.save_meta()
@@ -1,8 +1,58 @@
 from ..abstract import AbstractAnonymization
+from ...lib.data.pack import ImagePack
+
+import numpy as np
 
 
 class AbstractFaceAnonymization(AbstractAnonymization):
     name = "abstractface"
+    # points per batch of anonymize_batch unless set by opt.batch_size
+    batch_size = 64
+    # channels cv2 functions accept
+    max_channels = 512
+
+    def run(self):
+        if self.dataset.is_packed():
+            shape = ImagePack.open(self.dataset.setpath).get_shape()
+            if self.get_shape(shape) != shape:
+                raise AttributeError(
+                    "Anonymization " + self.name + " changes the size of images, packed datasets can only store images of one size. "
+                    "Run it on an unpacked dataset."
+                )
+        super().run()
+
+    def get_shape(self, shape):
+        """Return the shape of the anonymized images of images of the given shape (H, W, 3)."""
+        return shape
+
+    def anonymize(self, image):
+        # anonymizations implementing only anonymize_batch anonymize single points as batches of one
+        if type(self).anonymize_batch is not AbstractFaceAnonymization.anonymize_batch:
+            image.save_image(self.anonymize_batch(image.load_image()[np.newaxis], [image])[0])
+
+    def anonymize_batch(self, images, points):
+        """Anonymize the images of points, stacked into one (N, H, W, 3) array, and return the anonymized images.
+        Optional: anonymizations implementing it are run by anonymize_all in batches of opt.batch_size points (1 to disable),
+        images are read ahead and written back by threads (see PointExecutor.run_batches)."""
+        return None
+
+    def get_batch_size(self):
+        if type(self).anonymize_batch is AbstractFaceAnonymization.anonymize_batch:
+            return None
+        return int(self.config.get("opt", {}).get("batch_size", self.batch_size))
+
+    @staticmethod
+    def apply_stacked(images, function):
+        """Apply a cv2 function that treats every channel on its own (filters, resizing) to a batch of images,
+        as few images with the channels of many images stacked."""
+        n, height, width, channels = images.shape
+        per_call = max(AbstractFaceAnonymization.max_channels // channels, 1)
+        results = []
+        for i in range(0, n, per_call):
+            part = images[i : i + per_call]
+            result = function(np.ascontiguousarray(part.transpose(1, 2, 0, 3).reshape(height, width, -1)))
+            results.append(result.reshape(result.shape[0], result.shape[1], len(part), channels).transpose(2, 0, 1, 3))
+        return np.concatenate(results)
 
     def get_faces(self, img):
         if not img.bbox:
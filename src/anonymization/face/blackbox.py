@@ -1,6 +1,5 @@
 from .abstract import AbstractFaceAnonymization
 
-import cv2
 import numpy as np
 
 
@@ -17,7 +16,5 @@ class BlackboxAnonymization(AbstractFaceAnonymization):
 
     name = "blackbox"
 
-    def anonymize(self, image):
-        img = cv2.imread(image.get_path())
-        nimg = np.zeros(img.shape)
-        cv2.imwrite(image.get_path(), nimg)
+    def anonymize_batch(self, images, points):
+        return np.zeros_like(images)
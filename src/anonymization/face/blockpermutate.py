@@ -1,6 +1,5 @@
 from .abstract import AbstractFaceAnonymization
 
-import cv2
 import random
 import copy
 
@@ -28,16 +27,15 @@ class BlockpermutateAnonymization(AbstractFaceAnonymization):
             self.config["blocksize"] = int(self.config["blocksize"])
 
     def anonymize(self, image):
-        random.seed(a=self.config["seed"])
-
-        img = cv2.imread(image.get_path())
+        img = image.load_image()
         newimg = copy.deepcopy(img)
 
         blocks_x = img.shape[0] // self.config["blocksize"]
         blocks_y = img.shape[1] // self.config["blocksize"]
 
         permutation = [(y, x) for x in range(blocks_x) for y in range(blocks_y)]
-        random.shuffle(permutation)
+        # the same permutation for every image, drawn without changing the global random state
+        random.Random(self.config["seed"]).shuffle(permutation)
 
         for x in range(blocks_x):
             for y in range(blocks_y):
@@ -50,4 +48,4 @@ class BlockpermutateAnonymization(AbstractFaceAnonymization):
                     (new_x * self.config["blocksize"]) : ((new_x + 1) * self.config["blocksize"]),
                 ]
 
-        cv2.imwrite(image.get_path(), newimg)
+        image.save_image(newimg)
@@ -40,16 +40,19 @@ class CiaganAnonymization(AbstractFaceAnonymization):
         if "opt" not in self.config or "batch_size" not in self.config["opt"]:
             self.config["opt"]["batch_size"] = 15000
 
+    def get_shape(self, shape):
+        return (224, 224) + tuple(shape[2:])
+
     def anonymize_all(self):
         i = 0
         while i * self.config["opt"]["batch_size"] < len(self.dataset.datapoints):
             batch = list(self.dataset.datapoints.values())[
                 i * self.config["opt"]["batch_size"] : (i + 1) * self.config["opt"]["batch_size"]
             ]
-            self.anonymize_batch(batch)
+            self.run_batch(batch)
             i += 1
 
-    def anonymize_batch(self, batch):
+    def run_batch(self, batch):
         batch_folder = os.path.join(self.dataset.folder, "batch")
         os.mkdir(batch_folder)
         os.mkdir(os.path.join(batch_folder, "orig"))
@@ -61,7 +64,7 @@ class CiaganAnonymization(AbstractFaceAnonymization):
         for point in batch:
             newpath = os.path.join(batch_folder, "orig", "0", str(index).zfill(6) + ".jpg")
             point.tmp_index = index
-            img = cv2.imread(point.get_path())
+            img = point.load_image()
             cv2.imwrite(newpath, img)
             index += 1
 
@@ -95,7 +98,7 @@ class CiaganAnonymization(AbstractFaceAnonymization):
                 img = cv2.imread(path)
                 img = self.remove_duplicated_pixels(img)
                 img = cv2.resize(img, (224, 224), cv2.INTER_CUBIC)
-                cv2.imwrite(point.get_path(), img)
+                point.save_image(img)
 
         shutil.rmtree(batch_folder)
 
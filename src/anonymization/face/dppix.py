@@ -1,7 +1,5 @@
 from .abstract import AbstractFaceAnonymization
 
-import cv2
-import math
 import numpy as np
 
 
@@ -21,9 +19,11 @@ class DppixAnonymization(AbstractFaceAnonymization):
         - (float) e: privacy budget
         - (int) b: block size
         - (int) m: number of pixels
+        - (string) seed: seed of the random generators of the points (optional)
     """
 
     name = "dppix"
+    random = True
 
     def validate_config(self):
         if "e" not in self.config:
@@ -33,29 +33,17 @@ class DppixAnonymization(AbstractFaceAnonymization):
         if "m" not in self.config:
             raise AttributeError("DP-Pix anonymization: missing parameter m (number of pixels)")
 
-    def anonymize(self, image):
-        img = cv2.imread(image.get_path())
-        copy = img.copy()
-        for i in range(math.ceil(img.shape[0] / self.config["b"])):
-            for j in range(math.ceil(img.shape[0] / self.config["b"])):
-                colors = []
-                for x in range(self.config["b"]):
-                    for y in range(self.config["b"]):
-                        try:
-                            colors.append(img[i * self.config["b"] + x, j * self.config["b"] + y])
-                        except IndexError:
-                            pass
-                new_color = np.mean(colors, axis=0)
-                for x in range(3):
-                    new_color[x] += np.random.default_rng().laplace(
-                        scale=((255 * self.config["m"]) / (self.config["b"] * self.config["b"] * self.config["e"]))
-                    )
-                    new_color[x] = max(0, min(255, new_color[x]))
-
-                for x in range(self.config["b"]):
-                    for y in range(self.config["b"]):
-                        try:
-                            copy[i * self.config["b"] + x, j * self.config["b"] + y] = new_color
-                        except IndexError:
-                            pass
-        cv2.imwrite(image.get_path(), copy)
+    def anonymize_batch(self, images, points):
+        b = self.config["b"]
+        n, height, width, channels = images.shape
+        # block sums, blocks at the right and bottom edge may be smaller
+        rows = np.arange(0, height, b)
+        cols = np.arange(0, width, b)
+        sums = np.add.reduceat(np.add.reduceat(images.astype(np.float64), rows, axis=1), cols, axis=2)
+        counts = np.outer(np.diff(np.append(rows, height)), np.diff(np.append(cols, width)))
+        colors = sums / counts[np.newaxis, :, :, np.newaxis]
+        scale = (255 * self.config["m"]) / (b * b * self.config["e"])
+        colors += np.stack([self.get_rng(point).laplace(scale=scale, size=colors.shape[1:]) for point in points])
+        # assigning floats to an uint8 image truncates
+        colors = np.clip(colors, 0, 255).astype(np.uint8)
+        return np.repeat(np.repeat(colors, b, axis=1), b, axis=2)[:, :height, :width]
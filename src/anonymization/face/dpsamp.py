@@ -3,14 +3,12 @@ from .abstract import AbstractFaceAnonymization
 import cv2
 import math
 import numpy as np
-import random
 import scipy.interpolate
-from multiprocessing import Pool
 
 
-def anonymize_image(imgpath, config):
-    random.seed(a=config["seed"])
-    img = cv2.imread(imgpath)
+def anonymize_image(img, config, rng):
+    # k-means starts from random centers drawn by cv2
+    cv2.setRNGSeed(int(rng.integers(2**31)))
     # generate k clusters using k-means
     pxls = np.float32(img.reshape((-1, 3)))
     criteria = (cv2.TERM_CRITERIA_EPS + cv2.TERM_CRITERIA_MAX_ITER, 100, 0.2)
@@ -41,7 +39,7 @@ def anonymize_image(imgpath, config):
                 if label[j][0] == i:
                     if np.absolute(center[i] - pxls[j]).sum() <= config["threshold"]:
                         pxls_to_choose.append(j)
-            random.shuffle(pxls_to_choose)
+            rng.shuffle(pxls_to_choose)
             sampled_pixels += pxls_to_choose[:x]
         except Exception:
             pass
@@ -65,7 +63,7 @@ def anonymize_image(imgpath, config):
         for y in range(img.shape[1]):
             img[x, y] = [nnimg[0][x][y], nnimg[1][x][y], nnimg[2][x][y]]
 
-    cv2.imwrite(imgpath, img)
+    return img
 
 
 class DpsampAnonymization(AbstractFaceAnonymization):
@@ -86,9 +84,13 @@ class DpsampAnonymization(AbstractFaceAnonymization):
         - (int) k: number of clusters
         - (int) m: number of pixels
         - (float) threshold: distance to center for pixel considered to have this intensity
+        - (string) seed: seed of the random generators of the points (optional)
+        - (dict) opt: workers: maximum number of processes (optional, default: the CPU budget of the run)
     """
 
     name = "dpsamp"
+    random = True
+    workers = None
 
     def validate_config(self):
         if "e" not in self.config:
@@ -102,11 +104,9 @@ class DpsampAnonymization(AbstractFaceAnonymization):
         if "seed" not in self.config:
             self.config["seed"] = None
 
-        if "opt" not in self.config or "threads" not in self.config["opt"]:
-            self.config["opt"] = {"threads": 24}
+        if "threads" in self.config.get("opt", {}):
+            # renamed to workers like the other anonymizations (see PointExecutor)
+            self.config["opt"].setdefault("workers", self.config["opt"]["threads"])
 
-    def anonymize_all(self):
-        p = Pool(processes=self.config["opt"]["threads"])
-        args = list(map(lambda x: (x.get_path(), self.config), self.dataset.datapoints.values()))
-        p.starmap(anonymize_image, args)
-        p.close()
+    def anonymize(self, image):
+        image.save_image(anonymize_image(image.load_image(), self.config, self.get_rng(image)))
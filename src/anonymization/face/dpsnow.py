@@ -1,7 +1,6 @@
 from .abstract import AbstractFaceAnonymization
 
-import cv2
-import random
+import numpy as np
 
 
 class DpsnowAnonymization(AbstractFaceAnonymization):
@@ -13,16 +12,15 @@ class DpsnowAnonymization(AbstractFaceAnonymization):
             NY, USA, 2020. Association for Computing Machinery.
 
     Required pips:
-        - opencv-python
+        - numpy
 
     Parameters:
         - (float) d: privacy budget
+        - (string) seed: seed of the random generators of the points (optional)
     """
 
     name = "dpsnow"
-
-    def init(self):
-        random.seed(a=self.config["seed"])
+    random = True
 
     def validate_config(self):
         if "d" not in self.config:
@@ -30,10 +28,13 @@ class DpsnowAnonymization(AbstractFaceAnonymization):
         if "seed" not in self.config:
             self.config["seed"] = None
 
-    def anonymize(self, image):
-        img = cv2.imread(image.get_path())
-        coords = [(y, x) for x in range(img.shape[1]) for y in range(img.shape[0])]
-        random.shuffle(coords)
-        for coord in coords[: int((1 - self.config["d"]) * len(coords))]:
-            img[coord[0], coord[1]] = [127, 127, 127]
-        cv2.imwrite(image.get_path(), img)
+    def anonymize_batch(self, images, points):
+        n, height, width, channels = images.shape
+        # the same number of pixels in every image, drawn without replacement
+        count = int((1 - self.config["d"]) * height * width)
+        mask = np.zeros((n, height * width), dtype=bool)
+        for i, point in enumerate(points):
+            mask[i, self.get_rng(point).choice(height * width, size=count, replace=False)] = True
+        images = np.array(images)
+        images[mask.reshape(n, height, width)] = 127
+        return images
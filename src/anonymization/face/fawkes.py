@@ -67,7 +67,8 @@ class FawkesAnonymization(AbstractFaceAnonymization):
         exec_ext_cmd(cmd)
 
     def anonymize_all(self):
-        if len(self.dataset.datapoints) <= self.config["opt"]["max_img_batch"]:
+        # packed datasets have no folder of images, their points are linked into batches
+        if len(self.dataset.datapoints) <= self.config["opt"]["max_img_batch"] and not self.dataset.is_packed():
             self.run_fawkes(self.dataset.folder, ext=list(self.dataset.datapoints.values())[0].ext)
             for point in self.dataset.datapoints.values():
                 fawkes_name = self.ffilename(point.get_path(), point.ext)
@@ -22,9 +22,7 @@ class GaussianblurAnonymization(AbstractFaceAnonymization):
         else:
             self.config["kernel"] = int(self.config["kernel"])
 
-    def anonymize(self, image):
-        img = cv2.imread(image.get_path())
+    def anonymize_batch(self, images, points):
         # config['kernel'] is for face width 100. linear in face width. round to nearest odd int
-        kernel = 2 * math.floor(((img.shape[1]) * self.config["kernel"]) / 200) + 1
-        img = cv2.GaussianBlur(img, (kernel, kernel), 0)
-        cv2.imwrite(image.get_path(), img)
+        kernel = 2 * math.floor(((images.shape[2]) * self.config["kernel"]) / 200) + 1
+        return self.apply_stacked(images, lambda img: cv2.GaussianBlur(img, (kernel, kernel), 0))
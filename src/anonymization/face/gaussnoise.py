@@ -1,6 +1,5 @@
 from .abstract import AbstractFaceAnonymization
 
-import cv2
 import numpy as np
 
 
@@ -8,13 +7,15 @@ class GaussnoiseAnonymization(AbstractFaceAnonymization):
     """Add gaussian noise to the face in an image
 
     Required pips:
-        - opencv-python
+        - numpy
 
     Parameters:
         - (int) sigma: sigma for noise distribution function
+        - (string) seed: seed of the random generators of the points (optional)
     """
 
     name = "gaussnoise"
+    random = True
 
     def validate_config(self):
         if "sigma" not in self.config:
@@ -22,11 +23,9 @@ class GaussnoiseAnonymization(AbstractFaceAnonymization):
         else:
             self.config["sigma"] = int(self.config["sigma"])
 
-    def anonymize(self, image):
-        img = cv2.imread(image.get_path())
-        im = np.zeros(img.shape, np.uint8)
-        sigma = (self.config["sigma"], self.config["sigma"], self.config["sigma"])
-        cv2.randn(im, (0, 0, 0), sigma)
-        img = cv2.add(img, im)
-
-        cv2.imwrite(image.get_path(), img)
+    def anonymize_batch(self, images, points):
+        # like cv2.randn into an uint8 image, negative noise saturates to 0
+        noise = np.stack([self.get_rng(point).normal(0, self.config["sigma"], images.shape[1:]) for point in points])
+        noise = np.clip(np.rint(noise), 0, 255)
+        # saturating like cv2.add
+        return np.clip(images + noise, 0, 255).astype(np.uint8)
@@ -3,7 +3,6 @@ from .abstract import AbstractFaceAnonymization
 from sklearn.preprocessing import StandardScaler
 from sklearn.decomposition import PCA
 import numpy as np
-import cv2
 
 
 class KanonAnonymization(AbstractFaceAnonymization):
@@ -34,7 +33,7 @@ class KanonAnonymization(AbstractFaceAnonymization):
 
         images = []
         for point in self.bg.datapoints.values():
-            img = cv2.imread(point.get_path())
+            img = point.load_image()
             images.append(img.flatten())
         images = np.array(images)
 
@@ -48,7 +47,7 @@ class KanonAnonymization(AbstractFaceAnonymization):
         self.log.debug("Finished Setup")
 
         for point in self.dataset.datapoints.values():
-            img = cv2.imread(point.get_path())
+            img = point.load_image()
             f = self.pca.transform(self.scaler.transform(img.flatten().reshape(1, -1)))
 
             distances = []
@@ -71,7 +70,7 @@ class KanonAnonymization(AbstractFaceAnonymization):
 
             picked_imgs.append(point)
             img = self.merge_images(picked_imgs, shape=img.shape)
-            cv2.imwrite(point.get_path(), img)
+            point.save_image(img)
 
     def findCosineDistance(self, x, y):
         a = np.matmul(np.transpose(x), y)
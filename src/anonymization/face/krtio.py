@@ -1,7 +1,6 @@
 from .abstract import AbstractFaceAnonymization
 from ...lib.data.set import Dataset
 
-import cv2
 from Crypto.Cipher import AES
 from Crypto.Util.Padding import pad
 import copy
@@ -66,13 +65,13 @@ class KrtioAnonymization(AbstractFaceAnonymization):
         return int.from_bytes(x, "big") % max
 
     def anonymize(self, image):
-        aimg = cv2.imread(image.get_path())
+        aimg = image.load_image()
 
         overlay_pixels = []
         for j in range(self.config["k"]):
             index = self.randrange(len(self.overlays), image.pointname + "0" + str(j))
             overlay = list(self.overlays.values())[index]
-            img = cv2.imread(overlay.get_path())
+            img = overlay.load_image()
             y_blocks = int(len(img) / self.config["blocksize"])
             x_blocks = int(len(img[0]) / self.config["blocksize"])
             permutation = [(y, x) for x in range(x_blocks) for y in range(y_blocks)]
@@ -97,4 +96,4 @@ class KrtioAnonymization(AbstractFaceAnonymization):
                         map(lambda ov: ov[y, x][i], overlay_pixels)
                     )
 
-        cv2.imwrite(image.get_path(), aimg)
+        image.save_image(aimg)
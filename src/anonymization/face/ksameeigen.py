@@ -1,6 +1,5 @@
 from .kanon import KanonAnonymization
 
-import cv2
 import numpy as np
 
 
@@ -20,7 +19,7 @@ class KsameeigenAnonymization(KanonAnonymization):
     name = "ksameeigen"
 
     def merge_images(self, points, shape=()):
-        images = list(map(lambda x: cv2.imread(x.get_path()).flatten(), points))
+        images = list(map(lambda x: x.load_image().flatten(), points))
         features = self.pca.transform(self.scaler.transform(images))
         mean = np.mean(features, axis=0)
         img = self.scaler.inverse_transform(self.pca.inverse_transform(mean.reshape(1, -1)))
@@ -1,6 +1,5 @@
 from .kanon import KanonAnonymization
 
-import cv2
 import numpy as np
 
 
@@ -20,5 +19,5 @@ class KsamepixelAnonymization(KanonAnonymization):
     name = "ksamepixel"
 
     def merge_images(self, points, shape=()):
-        images = list(map(lambda x: cv2.imread(x.get_path()), points))
+        images = list(map(lambda x: x.load_image(), points))
         return np.mean(images, axis=0)
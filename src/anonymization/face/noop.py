@@ -11,3 +11,17 @@ class NoopAnonymization(AbstractFaceAnonymization):
     """
 
     name = "noop"
+
+    def anonymize_all(self):
+        # points are neither read nor written, hardlinked files stay shared
+        pass
+
+    def unshares_points(self):
+        return True
+
+    def resumable(self):
+        return True
+
+    @classmethod
+    def is_pointwise(cls):
+        return True
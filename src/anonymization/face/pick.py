@@ -25,6 +25,10 @@ class PickAnonymization(AbstractFaceAnonymization):
         if "hardlink" not in self.config:
             self.config["hardlink"] = False
 
+    def streamable(self):
+        # replaces the files of the points
+        return False
+
     def anonymize(self, image):
         filename = image.get_path().split("/")[-1]
         path = os.path.join(os.getcwd(), "data", self.config["dataset"], filename)
@@ -28,10 +28,16 @@ class PixelateAnonymization(AbstractFaceAnonymization):
         else:
             self.config["keepshape"] = bool(self.config["keepshape"])
 
-    def anonymize(self, image):
-        img = cv2.imread(image.get_path())
-        orig_shape = img.shape[:2]
-        img = cv2.resize(img, (self.config["size"], int((img.shape[1] / img.shape[0]) * self.config["size"])))
+    def get_shape(self, shape):
         if self.config["keepshape"]:
-            img = cv2.resize(img, orig_shape, interpolation=cv2.INTER_NEAREST)
-        cv2.imwrite(image.get_path(), img)
+            return shape
+        # cv2.resize takes (width, height)
+        return (int((shape[1] / shape[0]) * self.config["size"]), self.config["size"]) + tuple(shape[2:])
+
+    def anonymize_batch(self, images, points):
+        orig_shape = images.shape[1:3]
+        size = (self.config["size"], int((images.shape[2] / images.shape[1]) * self.config["size"]))
+        images = self.apply_stacked(images, lambda img: cv2.resize(img, size))
+        if self.config["keepshape"]:
+            images = self.apply_stacked(images, lambda img: cv2.resize(img, orig_shape, interpolation=cv2.INTER_NEAREST))
+        return images
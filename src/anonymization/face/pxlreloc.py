@@ -1,6 +1,5 @@
 from .abstract import AbstractFaceAnonymization
 
-import cv2
 import copy
 
 
@@ -27,7 +26,7 @@ class PxlrelocAnonymization(AbstractFaceAnonymization):
             raise AttributeError("PxlrelocAnonymization: config: Requires number of steps to move pixel position by")
 
     def anonymize(self, image):
-        img = cv2.imread(image.get_path())
+        img = image.load_image()
         newimg = copy.deepcopy(img)
 
         forder = self.gen_order(img.shape[0], img.shape[1])
@@ -36,7 +35,7 @@ class PxlrelocAnonymization(AbstractFaceAnonymization):
         for i in range(len(forder)):
             newimg[torder[i]] = img[forder[i]]
 
-        cv2.imwrite(image.get_path(), newimg)
+        image.save_image(newimg)
 
     def gen_order(self, max, may):
         if max == 0 or may == 0:
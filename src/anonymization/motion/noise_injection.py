@@ -12,9 +12,11 @@ class Noise_injectionAnonymization(AbstractMotionAnonymization):
         - (string) distribution: one of ["normal", "laplace", "uniform"]
         - (float) scaling: a scalar to scale the noise added
         - (string) type: one of ["direct", "indirect"]
+        - (string) seed: seed of the random generators of the points (optional)
     """
 
     name = "noise_injection"
+    random = True
 
     def validate_config(self):
         if "distribution" not in self.config or self.config["distribution"] not in ["normal", "laplace", "uniform"]:
@@ -30,11 +32,13 @@ class Noise_injectionAnonymization(AbstractMotionAnonymization):
     def anonymize(self, mocap, data):
         size = len(data) * len(data[0])
 
-        rand = np.random.default_rng().uniform(0, 1, size)
+        rng = self.get_rng(mocap)
         if self.config["distribution"] == "laplace":
-            rand = np.random.default_rng().laplace(0, 1, size)
-        if self.config["distribution"] == "normal":
-            rand = np.random.default_rng().normal(0, 1, size)
+            rand = rng.laplace(0, 1, size)
+        elif self.config["distribution"] == "normal":
+            rand = rng.normal(0, 1, size)
+        else:
+            rand = rng.uniform(0, 1, size)
 
         new_data = []
         if self.config["type"] == "direct":
@@ -1,8 +1,12 @@
 import logging
+from ..lib.data.journal import Journal
+from ..lib.executor import PointExecutor
 
 
 class AbstractDeanonymization:
     name = "abstract"
+    # processes of deanonymize_all unless set by opt.workers, None for the CPU budget of the run (see PointExecutor)
+    workers = 1
 
     def __init__(self, config):
         self.log = logging.getLogger("seba.deanonymization")
@@ -20,26 +24,65 @@ class AbstractDeanonymization:
     def train(self, clear_set, anon_set):
         pass
 
+    def is_cached(self, clear_set, anon_set):
+        """Whether train() would reuse a cached model instead of training, None if models are not cached."""
+        return None
+
     def run(self, dataset):
         self.dataset = dataset
         if self.dataset.meta["original"] is True or ("softlinked" in self.dataset.meta and self.dataset.meta["softlinked"] is True):
             raise AttributeError("Can only run deanonymization on non-original hardlinked datasets.")
 
         self.log.info("Running deanonymization on dataset " + self.dataset.name)
+        self.journal = Journal(self.dataset.name)
+        self.done = self.dataset.resume(self.journal, keep=self.resumable())
+        # the set is only used as a result once it is marked complete
+        self.save_meta(complete=False)
+        if not self.unshares_points():
+            self.dataset.unshare()
         self.deanonymize_all()
+        self.dataset.sync()
         self.save_meta()
+        self.journal.delete()
         self.log.info("Deanonymization successful.")
 
     def deanonymize_all(self):
-        for point in self.dataset.datapoints.values():
+        shared = self.dataset.meta.get("copy_mode") == "hardlink"
+        points = self.pending_points()
+        executor = PointExecutor(self.config, self.workers)
+        if shared and executor.is_parallel() and len(points):
+            # packed images share one file, which must not be copied by several workers at once
+            points[0].unshare()
+
+        def deanonymize(point):
+            if shared:
+                point.unshare()
             self.deanonymize(point)
 
+        executor.run(points, deanonymize, self.finish_point, "Deanonymized")
+
+    def unshares_points(self):
+        """Whether deanonymize_all unshares hardlinked files itself right before each point is written."""
+        return type(self).deanonymize_all is AbstractDeanonymization.deanonymize_all
+
+    def resumable(self):
+        """Whether deanonymize_all records finished points (see finish_point), so an interrupted run can be resumed."""
+        return type(self).deanonymize_all is AbstractDeanonymization.deanonymize_all
+
+    def pending_points(self):
+        """Return the points not finished by an earlier, interrupted run."""
+        return [point for key, point in self.dataset.datapoints.items() if key not in self.done]
+
+    def finish_point(self, point):
+        self.journal.record(point.idname + "." + point.pointname)
+
     def deanonymize(self, point):
         pass
 
-    def save_meta(self):
+    def save_meta(self, complete=True):
         self.dataset.meta["deanonymization"] = self.name
         self.dataset.meta["params"] = self.config
+        self.dataset.meta["complete"] = complete
         self.dataset.save_meta()
 
     def cleanup(self):
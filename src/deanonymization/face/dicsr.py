@@ -51,6 +51,8 @@ class DicsrDeanonymization(AbstractFaceDeanonymization):
             raise AttributeError("DIC SR Deanonymization requires location of pretrained model")
 
     def deanonymize_all(self):
+        if self.dataset.is_packed():
+            raise AttributeError("DIC SR Deanonymization reads the image files of the dataset folder, it does not support packed datasets")
         self.write_config()
         cmd = [self.config["opt"]["bin"], "-opt", os.path.join(self.dataset.folder, "config.json")]
         exec_ext_cmd(cmd)
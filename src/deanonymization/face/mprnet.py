@@ -32,6 +32,8 @@ class MprnetDeanonymization(AbstractFaceDeanonymization):
             raise AttributeError("MPRnet Deanonymization requires location of executable")
 
     def deanonymize_all(self):
+        if self.dataset.is_packed():
+            raise AttributeError("MPRnet Deanonymization reads the image files of the dataset folder, it does not support packed datasets")
         cmd = [
             "env/bin/python3",
             "demo.py",
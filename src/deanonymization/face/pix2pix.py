@@ -136,6 +136,8 @@ class Pix2pixDeanonymization(AbstractFaceDeanonymization):
                 os.symlink(anon.datapoints[k].get_path(), os.path.join(self.base, "data", "B", folder, anon.datapoints[k].get_filename()))
 
     def deanonymize_all(self):
+        if self.dataset.is_packed():
+            raise AttributeError("Pix2Pix Deanonymization reads the image files of the dataset folder, it does not support packed datasets")
         cmd = [
             "env/bin/python3",
             "test.py",
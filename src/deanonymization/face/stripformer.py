@@ -32,6 +32,8 @@ class StripformerDeanonymization(AbstractFaceDeanonymization):
             raise AttributeError("Stripformer Deanonymization requires location of executable")
 
     def deanonymize_all(self):
+        if self.dataset.is_packed():
+            raise AttributeError("Stripformer Deanonymization reads the image files of the dataset folder, it does not support packed datasets")
         os.mkdir(os.path.join(self.dataset.folder, "batch"))
         os.mkdir(os.path.join(self.dataset.folder, "batch", "0"))
 
@@ -124,21 +124,30 @@ class TorchDeanonymization(AbstractFaceDeanonymization):
         self.save_model(anon_set, suffix="final")
         self.load_model(anon_set)  # Reload best model (last might not be best)
 
-    def load_model(self, dataset):
+    def find_model(self, dataset):
+        """Return the path of a model trained with the same config on the dataset, None if there is none."""
         dataset.reload_meta()
         if "models" not in dataset.meta:
             dataset.meta["models"] = []
 
-        for i in range(len(dataset.meta["models"])):
-            x = dataset.meta["models"][i]
+        for x in dataset.meta["models"]:
             if x["name"] == self.name and x["suffix"] == "none" and x["config"] == self.config:
                 if os.path.exists(x["path"]):
-                    self.model = torch.load(x["path"])
-                    if not hasattr(self.model, "resize"):
-                        self.model.resize = False
-                    self.log.info("Using existing model: " + x["path"])
-                    return True
-        return False
+                    return x["path"]
+        return None
+
+    def is_cached(self, clear_set, anon_set):
+        return self.find_model(anon_set) is not None
+
+    def load_model(self, dataset):
+        path = self.find_model(dataset)
+        if path is None:
+            return False
+        self.model = torch.load(path)
+        if not hasattr(self.model, "resize"):
+            self.model.resize = False
+        self.log.info("Using existing model: " + path)
+        return True
 
     def load_data(self, clear_set, anon_set):
         if self.config["opt"]["memcache_imgs"]:
@@ -0,0 +1,121 @@
+import os
+import os.path
+import json
+import sqlite3
+import logging
+from contextlib import closing
+
+
+class AttributeStore:
+    """Dataset-level storage of identity and datapoint attributes.
+
+    All attributes of a dataset live in a single SQLite file next to its meta file (data/<name>.attr.sqlite).
+    Rows are keyed like the per-point YAML sidecars they replace (<id> for identities, <id>.<point> for datapoints)
+    and hold the JSON encoded attribute dict. The whole table is read in one query on first access and served from memory.
+    """
+
+    ext = "attr.sqlite"
+
+    def __init__(self, name):
+        self.name = name
+        self.path = AttributeStore.get_path(name)
+        self.attr = None
+
+    @staticmethod
+    def get_path(name):
+        return os.path.join(os.getcwd(), "data", name + "." + AttributeStore.ext)
+
+    @staticmethod
+    def exists(name):
+        return os.path.exists(AttributeStore.get_path(name))
+
+    def connect(self):
+        con = sqlite3.connect(self.path)
+        con.execute("CREATE TABLE IF NOT EXISTS attributes (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        return con
+
+    def load(self):
+        if self.attr is None:
+            # bulk loading
+            with closing(self.connect()) as con:
+                self.attr = dict((k, json.loads(v)) for k, v in con.execute("SELECT key, value FROM attributes"))
+
+    def get(self, key):
+        self.load()
+        if key not in self.attr:
+            return {}
+        return self.attr[key]
+
+    def keys(self):
+        self.load()
+        return self.attr.keys()
+
+    def set(self, key, value):
+        self.set_batch({key: value})
+
+    def set_batch(self, items):
+        self.load()
+        rows = [(k, json.dumps(v)) for k, v in items.items()]
+        with closing(self.connect()) as con:
+            with con:
+                con.executemany("INSERT OR REPLACE INTO attributes (key, value) VALUES (?, ?)", rows)
+        self.attr.update(items)
+
+    def copy_to(self, name, keys=None):
+        self.load()
+        store = AttributeStore(name)
+        if keys is None:
+            keys = self.attr.keys()
+        store.set_batch(dict((k, self.attr[k]) for k in keys if k in self.attr))
+        return store
+
+    def delete(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+        self.attr = None
+
+
+class AttributeBatch:
+    """Buffered attribute writer for annotating many identities or datapoints, see Dataset.attribute_batch.
+
+    Updates are kept in memory and written in one pass per flush: one transaction if the dataset has an attribute store,
+    otherwise every changed YAML sidecar is written once, no matter how many of its keys were set.
+    Pending updates are flushed every `every` objects and when the context is left, also on errors or interrupts.
+    """
+
+    def __init__(self, every=1000):
+        self.every = every
+        self.pending = {}
+        self.log = logging.getLogger("seba.data")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.flush()
+        return False
+
+    def set(self, obj, key, value):
+        self.set_batch(obj, {key: value})
+
+    def set_batch(self, obj, attributes):
+        """Update attributes of an identity or datapoint."""
+        obj.load_attr()
+        obj.attr.update(attributes)
+        self.pending[id(obj)] = obj
+        if len(self.pending) >= self.every:
+            self.flush()
+
+    def flush(self):
+        if not len(self.pending):
+            return
+        stores = {}
+        for obj in self.pending.values():
+            if obj.attributes is not None:
+                stores.setdefault(id(obj.attributes), (obj.attributes, {}))[1][obj.get_attr_key()] = obj.attr
+            else:
+                obj.save_attr_file()
+        for store, items in stores.values():
+            store.set_batch(items)
+        self.log.debug("Flushed attributes of " + str(len(self.pending)) + " objects.")
+        self.pending = {}
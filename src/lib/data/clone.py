@@ -0,0 +1,89 @@
+import os
+import os.path
+import errno
+import fcntl
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+
+# ioctl request number of FICLONE (linux/fs.h)
+FICLONE = 0x40049409
+
+
+class FileCloner:
+    """Copy files of a dataset with the cheapest strategy the filesystem supports.
+
+    Modes:
+        - copy: copy all files with a pool of threads
+        - reflink: clone files copy-on-write (FICLONE, e.g. on btrfs or xfs), the data is only duplicated once it is written
+        - hardlink: hardlink files, writers have to replace the file before writing to it (see Datapoint.unshare)
+        - auto: use reflink if supported, otherwise hardlink, otherwise copy
+    """
+
+    modes = ["auto", "reflink", "hardlink", "copy"]
+
+    def __init__(self, mode="copy", threads=None):
+        if mode not in FileCloner.modes:
+            raise AttributeError("FileCloner: unknown copy mode " + str(mode))
+        self.mode = mode
+        self.threads = threads
+        self.log = logging.getLogger("seba.data")
+
+    @staticmethod
+    def reflink(src, dst):
+        with open(src, "rb") as s:
+            with open(dst, "wb") as d:
+                try:
+                    fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+                except OSError:
+                    os.remove(dst)
+                    raise
+
+    @staticmethod
+    def hardlink(src, dst):
+        os.link(src, dst, follow_symlinks=True)
+
+    @staticmethod
+    def copy(src, dst):
+        shutil.copy(src, dst)
+
+    def probe(self, src, dst):
+        """Find the cheapest working mode by cloning the first file."""
+        for mode in ["reflink", "hardlink"]:
+            try:
+                getattr(FileCloner, mode)(src, dst)
+                return mode
+            except OSError as e:
+                if e.errno not in [errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV, errno.EINVAL, errno.EPERM, errno.EMLINK]:
+                    raise
+        FileCloner.copy(src, dst)
+        return "copy"
+
+    def clone(self, files, private=None):
+        """Clone a list of (src, dst) tuples. Files listed in private (e.g. metadata written in place) are never hardlinked.
+        Returns the mode that was used."""
+        if not len(files):
+            return self.mode
+        private = set(private) if private else set()
+
+        mode = self.mode
+        if mode == "auto":
+            i = next((i for i in range(len(files)) if files[i][0] not in private), None)
+            if i is None:
+                mode = "copy"
+            else:
+                mode = self.probe(*files[i])
+                files = files[:i] + files[i + 1 :]
+            self.log.debug("Using copy mode " + mode)
+
+        def run(file):
+            src, dst = file
+            if mode == "hardlink" and src in private:
+                FileCloner.copy(src, dst)
+            else:
+                getattr(FileCloner, mode)(src, dst)
+
+        with ThreadPoolExecutor(max_workers=self.threads) as executor:
+            # consume the iterator to propagate exceptions
+            list(executor.map(run, files))
+        return mode
@@ -0,0 +1,116 @@
+import os
+import os.path
+import json
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from .point import PackedImage
+from ..utils import get_tmp_path
+
+
+class Fingerprint:
+    """Content fingerprint of a dataset, independent of its name and the way it was created.
+
+    The fingerprint is the root of a Merkle tree over the point keys and the hashes of their files:
+    every point is hashed from its key and file content, every identity from its points and the root from the identities.
+    File hashes are cached together with size and mtime of the file (data/<name>.fingerprint.json),
+    so only new or changed files are read again.
+    """
+
+    ext = "fingerprint.json"
+    # bytes read per step when hashing files
+    block = 1 << 20
+
+    def __init__(self, dataset, threads=None):
+        self.dataset = dataset
+        self.threads = threads
+        self.path = Fingerprint.get_path(dataset.name)
+        self.log = logging.getLogger("seba.data")
+
+    @staticmethod
+    def get_path(name):
+        return os.path.join(os.getcwd(), "data", name + "." + Fingerprint.ext)
+
+    @staticmethod
+    def digest(data):
+        return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+    @staticmethod
+    def hash_file(path):
+        h = hashlib.blake2b(digest_size=20)
+        with open(path, "rb") as file:
+            while True:
+                data = file.read(Fingerprint.block)
+                if not data:
+                    break
+                h.update(data)
+        return h.hexdigest()
+
+    def load_cache(self):
+        if not os.path.exists(self.path):
+            return {}
+        with open(self.path, "r") as file:
+            return json.load(file)["files"]
+
+    def save_cache(self, files, root):
+        tmp = get_tmp_path(self.path)
+        with open(tmp, "w") as file:
+            json.dump({"root": root, "files": files}, file)
+        os.replace(tmp, self.path)
+
+    def hash_point(self, point):
+        # packed images are hashed by their pixels, everything else by the file holding the point
+        if isinstance(point, PackedImage):
+            return Fingerprint.digest(point.load_image().tobytes())
+        return Fingerprint.hash_file(os.path.join(point.setpath, point.get_filename()))
+
+    def stat_point(self, point):
+        if isinstance(point, PackedImage):
+            path = point.get_pack().path
+        else:
+            path = os.path.join(point.setpath, point.get_filename())
+        stat = os.stat(path)
+        return [stat.st_size, stat.st_mtime_ns]
+
+    def get(self):
+        """Return the fingerprint, hashing only points whose files changed since the last call."""
+        cache = self.load_cache()
+        files = {}
+        todo = []
+        for key, point in self.dataset.datapoints.items():
+            stat = self.stat_point(point)
+            if key in cache and cache[key][:2] == stat:
+                files[key] = cache[key]
+            else:
+                todo.append((key, point, stat))
+
+        if len(todo):
+            self.log.info("Hashing " + str(len(todo)) + " datapoints of dataset " + self.dataset.name)
+            with ThreadPoolExecutor(max_workers=self.threads) as executor:
+                hashes = list(executor.map(lambda x: self.hash_point(x[1]), todo))
+            for (key, point, stat), h in zip(todo, hashes):
+                files[key] = stat + [h]
+
+        root = Fingerprint.get_root(self.dataset.id_points, dict((key, file[2]) for key, file in files.items()))
+        if len(todo) or len(files) != len(cache):
+            self.save_cache(files, root)
+        return root
+
+    def get_cached(self):
+        """Return the fingerprint if the cached hashes of all points are up to date, None otherwise. Nothing is hashed or written."""
+        cache = self.load_cache()
+        hashes = {}
+        for key, point in self.dataset.datapoints.items():
+            if key not in cache or cache[key][:2] != self.stat_point(point):
+                return None
+            hashes[key] = cache[key][2]
+        return Fingerprint.get_root(self.dataset.id_points, hashes)
+
+    @staticmethod
+    def get_root(id_points, hashes):
+        """Return the root of the Merkle tree over the points of the identities, given the hash of every point."""
+        nodes = []
+        for idname in sorted(id_points.keys()):
+            leaves = [Fingerprint.digest((key + ":" + hashes[key]).encode()) for key in sorted(id_points[idname])]
+            nodes.append(Fingerprint.digest((idname + ":" + "".join(leaves)).encode()))
+        return Fingerprint.digest("".join(nodes).encode())
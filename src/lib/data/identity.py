@@ -4,10 +4,11 @@ import yaml
 
 
 class Identity:
-    def __init__(self, setpath, name):
+    def __init__(self, setpath, name, attributes=None):
         self.setpath = setpath
         self.name = name
         self.npoints = 0
+        self.attributes = attributes
         self.attr = False
 
     def __getattr__(self, atr):
@@ -19,9 +20,11 @@ class Identity:
 
     def load_attr(self):
         if self.attr is False:
+            if self.attributes is not None:
+                self.attr = self.attributes.get(self.get_attr_key())
             # lazy loading
-            if os.path.exists(os.path.join(self.setpath, self.name + ".yaml")):
-                with open(os.path.join(self.setpath, self.name + ".yaml"), "r") as file:
+            elif os.path.exists(self.get_attr_path()):
+                with open(self.get_attr_path(), "r") as file:
                     self.attr = yaml.load(file, Loader=yaml.SafeLoader)
             else:
                 self.attr = {}
@@ -38,5 +41,14 @@ class Identity:
         self.save_attr_file()
 
     def save_attr_file(self):
-        with open(os.path.join(self.setpath, self.name + ".yaml"), "w") as file:
+        if self.attributes is not None:
+            self.attributes.set(self.get_attr_key(), self.attr)
+            return
+        with open(self.get_attr_path(), "w") as file:
             file.write("---\n" + yaml.dump(self.attr))
+
+    def get_attr_key(self):
+        return self.name
+
+    def get_attr_path(self):
+        return os.path.join(self.setpath, self.name + ".yaml")
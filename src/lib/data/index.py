@@ -0,0 +1,163 @@
+import os
+import os.path
+import json
+import yaml
+import fcntl
+import hashlib
+import logging
+from contextlib import contextmanager
+from ..utils import get_tmp_path
+
+
+class DatasetIndex:
+    """Persistent index of the provenance of all datasets in data/ (data/index.json).
+
+    Maps every dataset name to its provenance parameters (the meta without the copied original meta)
+    and canonical hashes of provenance queries to dataset names, so that lookups do not have to parse every meta file.
+    Datasets are also listed by the parent they refer to (see sources), so lookups missing the hashes only check the children of a parent.
+    The index is updated whenever a meta file is written or a dataset is deleted.
+    """
+
+    provenance = [
+        "original",
+        "content",
+        "anonymization",
+        "deanonymization",
+        "selector",
+        "splitter",
+        "background",
+        "params",
+        "part",
+        "restricted",
+    ]
+    # provenance entries referring to the parent of a dataset, by name or by content fingerprint
+    sources = ["original", "content"]
+    cache = None
+
+    @staticmethod
+    def get_path():
+        return os.path.join(os.getcwd(), "data", "index.json")
+
+    @staticmethod
+    def key(config):
+        return hashlib.sha1(json.dumps(config, sort_keys=True, default=str).encode()).hexdigest()
+
+    @staticmethod
+    def meta_key(meta):
+        config = {}
+        for k in DatasetIndex.provenance:
+            if k in meta:
+                config[k] = meta[k]
+        if isinstance(config.get("params"), dict):
+            config["params"] = {key: val for key, val in config["params"].items() if key != "opt"}
+        return DatasetIndex.key(config)
+
+    @staticmethod
+    def source_keys(meta):
+        """Return the keys the parents of a dataset or query are listed by in the index."""
+        return [DatasetIndex.key({k: meta[k]}) for k in DatasetIndex.sources if k in meta and not isinstance(meta[k], bool)]
+
+    @staticmethod
+    @contextmanager
+    def lock():
+        with open(os.path.join(os.getcwd(), "data", "index.lock"), "w") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def load(save=True):
+        """Return the index, rebuilt from the meta files if there is none (only kept in memory with save=False)."""
+        path = DatasetIndex.get_path()
+        if not os.path.exists(path):
+            return DatasetIndex.rebuild(save)
+
+        # the index is replaced on every change, a new inode tells changes apart within the resolution of mtime
+        stat = os.stat(path)
+        version = (path, stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        if DatasetIndex.cache is not None and DatasetIndex.cache[0] == version:
+            return DatasetIndex.cache[1]
+        with open(path, "r") as file:
+            index = json.load(file)
+        if "sources" not in index:
+            # written by an earlier version
+            return DatasetIndex.rebuild(save)
+        DatasetIndex.cache = (version, index)
+        return index
+
+    @staticmethod
+    def save(index):
+        path = DatasetIndex.get_path()
+        tmp = get_tmp_path(path)
+        with open(tmp, "w") as file:
+            json.dump(index, file)
+        os.replace(tmp, path)
+        stat = os.stat(path)
+        DatasetIndex.cache = ((path, stat.st_ino, stat.st_mtime_ns, stat.st_size), index)
+
+    @staticmethod
+    def rebuild(save=True):
+        logging.getLogger("seba.data").info("Rebuilding dataset index.")
+        if not save:
+            return DatasetIndex.read_metas()
+        with DatasetIndex.lock():
+            index = DatasetIndex.read_metas()
+            DatasetIndex.save(index)
+        return index
+
+    @staticmethod
+    def read_metas():
+        base = os.path.join(os.getcwd(), "data")
+        index = {"sets": {}, "keys": {}, "sources": {}}
+        for file in os.listdir(base):
+            if file[-10:] == ".meta.yaml":
+                with open(os.path.join(base, file), "r") as f:
+                    DatasetIndex.add(index, file[:-10], yaml.load(f, Loader=yaml.SafeLoader))
+        return index
+
+    @staticmethod
+    def add(index, name, meta):
+        DatasetIndex.drop(index, name)
+        index["sets"][name] = {k: v for k, v in meta.items() if k not in ["original_meta", "models"]}
+        index["keys"][DatasetIndex.meta_key(meta)] = name
+        for key in DatasetIndex.source_keys(meta):
+            index["sources"].setdefault(key, []).append(name)
+
+    @staticmethod
+    def drop(index, name):
+        meta = index["sets"].pop(name, None)
+        for k in [k for k, v in index["keys"].items() if v == name]:
+            del index["keys"][k]
+        for key in DatasetIndex.source_keys(meta or {}):
+            if name in index["sources"].get(key, []):
+                index["sources"][key].remove(name)
+                if not len(index["sources"][key]):
+                    del index["sources"][key]
+
+    @staticmethod
+    def update(name, meta):
+        if not os.path.exists(DatasetIndex.get_path()):
+            return DatasetIndex.rebuild()
+        with DatasetIndex.lock():
+            index = DatasetIndex.load()
+            DatasetIndex.add(index, name, meta)
+            DatasetIndex.save(index)
+
+    @staticmethod
+    def remove(name):
+        if not os.path.exists(DatasetIndex.get_path()):
+            return
+        with DatasetIndex.lock():
+            index = DatasetIndex.load()
+            DatasetIndex.drop(index, name)
+            DatasetIndex.save(index)
+
+    @staticmethod
+    def alias(config, name):
+        with DatasetIndex.lock():
+            index = DatasetIndex.load()
+            if name in index["sets"]:
+                index["keys"][DatasetIndex.key(config)] = name
+                DatasetIndex.save(index)
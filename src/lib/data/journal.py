@@ -0,0 +1,58 @@
+import os
+import os.path
+import time
+
+
+class Journal:
+    """Append-only record of the points of a dataset that an anonymization or de-anonymization has finished (data/<name>.journal).
+
+    The first line holds the time the journal was started, every further line the key of a finished point.
+    Lines are written through immediately, so the journal survives the process being killed.
+    """
+
+    ext = "journal"
+
+    def __init__(self, name):
+        self.name = name
+        self.path = Journal.get_path(name)
+        self.file = None
+
+    @staticmethod
+    def get_path(name):
+        return os.path.join(os.getcwd(), "data", name + "." + Journal.ext)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def start(self):
+        """Start a new journal, discarding any earlier progress."""
+        self.close()
+        with open(self.path, "w") as file:
+            file.write(str(time.time_ns()) + "\n")
+
+    def load(self):
+        """Return the start time (ns) and the set of finished point keys."""
+        with open(self.path, "r") as file:
+            content = file.read()
+        lines = content.split("\n")
+        # the last element is empty if the journal ends with a newline, otherwise it is a line cut off by a crash
+        # either way it is dropped and its point is processed again
+        return int(lines[0]), set(lines[1:-1])
+
+    def has_progress(self):
+        return self.exists() and len(self.load()[1]) > 0
+
+    def record(self, key):
+        if self.file is None:
+            self.file = open(self.path, "a", buffering=1)
+        self.file.write(key + "\n")
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def delete(self):
+        self.close()
+        if self.exists():
+            os.remove(self.path)
@@ -1,8 +1,11 @@
 import yaml
+import fcntl
 import collections.abc
 import os
 import os.path
+from contextlib import contextmanager
 from .set import Dataset
+from .index import DatasetIndex
 
 
 class DatasetManager:
@@ -16,12 +19,50 @@ class DatasetManager:
         return sets
 
     @staticmethod
-    def get_matching(config):
-        sets = DatasetManager.get_all()
-        for name, meta in sets.items():
-            if DatasetManager.match_level(meta, config):
-                set = Dataset(name)
-                return set
+    @contextmanager
+    def lock(config):
+        """Hold an exclusive lock on the dataset matching config (data/locks/<key>.lock) while it is looked up and created,
+        so that concurrent processes on one machine never create the same dataset twice. The lock is released if the process dies."""
+        folder = os.path.join(os.getcwd(), "data", "locks")
+        os.makedirs(folder, exist_ok=True)
+        with open(os.path.join(folder, DatasetIndex.key(config) + ".lock"), "w") as file:
+            fcntl.flock(file, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(file, fcntl.LOCK_UN)
+
+    @staticmethod
+    def get_matching(config, complete=True):
+        """Return a dataset matching the config. Sets an anonymization or de-anonymization is still working on
+        (or was interrupted on) are only returned with complete=False, e.g. to resume them.
+        The index is left unchanged while datasets are loaded read-only (see Dataset.read_only)."""
+        write = not Dataset.readonly
+        index = DatasetIndex.load(save=write)
+        base = os.path.join(os.getcwd(), "data")
+
+        name = index["keys"].get(DatasetIndex.key(config))
+        if name is not None and name in index["sets"] and DatasetManager.match_level(index["sets"][name], config):
+            if index["sets"][name].get("complete", True) == complete:
+                if os.path.exists(os.path.join(base, name + ".meta.yaml")):
+                    return Dataset(name)
+                if write:
+                    DatasetIndex.remove(name)
+
+        # only datasets of the parent the config refers to can match
+        keys = DatasetIndex.source_keys(config)
+        names = index["sources"].get(keys[0], []) if len(keys) else list(index["sets"].keys())
+        for name in list(names):
+            meta = index["sets"][name]
+            if meta.get("complete", True) == complete and DatasetManager.match_level(meta, config):
+                if not os.path.exists(os.path.join(base, name + ".meta.yaml")):
+                    if write:
+                        DatasetIndex.remove(name)
+                    continue
+                if complete and write:
+                    # remember the query so that the next lookup is a direct hit
+                    DatasetIndex.alias(config, name)
+                return Dataset(name)
         return None
 
     @staticmethod
@@ -40,6 +81,26 @@ class DatasetManager:
                 break
         return True
 
+    @staticmethod
+    def rename(name, newname):
+        base = os.path.join(os.getcwd(), "data")
+        if os.path.exists(os.path.join(base, newname + ".meta.yaml")):
+            raise AttributeError("destination exists!")
+
+        with open(os.path.join(base, name + ".meta.yaml"), "r") as file:
+            meta = yaml.load(file, Loader=yaml.SafeLoader)
+        meta["name"] = newname
+        with open(os.path.join(base, name + ".meta.yaml"), "w") as file:
+            file.write("---\n" + yaml.dump(meta))
+
+        if os.path.isdir(os.path.join(base, name)):
+            os.rename(os.path.join(base, name), os.path.join(base, newname))
+        for old, new in zip(Dataset.get_files(name), Dataset.get_files(newname)):
+            if os.path.exists(old):
+                os.rename(old, new)
+        DatasetIndex.remove(name)
+        DatasetIndex.update(newname, meta)
+
     @staticmethod
     def exists(name):
         sets = DatasetManager.get_all()
@@ -0,0 +1,204 @@
+import os
+import os.path
+import uuid
+import yaml
+import shutil
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from .set import Dataset
+from .point import Image, PNGImage, PackedImage, MemoryImage
+from .identity import Identity
+from .attributes import AttributeStore
+from .index import DatasetIndex
+from .clone import FileCloner
+from .fingerprint import Fingerprint
+
+
+class MemoryStore:
+    """Attributes of the identities and points of in-memory datasets.
+    Values are read from the parent dataset when first used, changes are only kept in memory."""
+
+    def __init__(self, parent):
+        self.parent = parent
+        self.values = {}
+
+    def get(self, key):
+        if key not in self.values:
+            obj = self.parent.datapoints[key] if key in self.parent.datapoints else self.parent.identities[key]
+            obj.load_attr()
+            self.values[key] = dict(obj.attr)
+        return self.values[key]
+
+    def set(self, key, value):
+        self.values[key] = value
+
+    def set_batch(self, items):
+        self.values.update(items)
+
+
+class MemoryDataset(Dataset):
+    """Dataset of images held in memory (see MemoryImage), used by the streaming experiment.
+
+    A memory dataset is created from a dataset on disk (wrap) and reads the images of its parent when they are first used.
+    Changes, e.g. anonymizations set with map(), are applied to a point when it is first read, so only points
+    that reach a later stage are processed. Copies are subsets sharing the points, every point is processed once.
+    Nothing is written to disk, unless a tool requires files (get_path, folder) or the set is saved as regular dataset (save).
+    Files written for tools are stored in data/<name of the wrapped set> and removed by delete().
+    """
+
+    def __new__(cls, *args, **kwargs):
+        return object.__new__(cls)
+
+    def __init__(self, name, meta, points, store, root=None):
+        self.log = logging.getLogger("seba.data")
+        self.identities = {}
+        self.datapoints = {}
+        self.id_points = {}
+        self.name = name
+        self.meta = meta
+        self.store = store
+        self.attributes = store
+        self.root = root if root is not None else name
+        self.setpath = os.path.join(os.getcwd(), "data", self.root)
+        self.materialized = False
+        for point in points:
+            if point.idname not in self.identities:
+                self.add_identity(point.idname)
+            self.datapoints[point.idname + "." + point.pointname] = point
+            self.id_points[point.idname].append(point.idname + "." + point.pointname)
+            self.identities[point.idname].npoints += 1
+        self.log_loaded()
+
+    @staticmethod
+    def get_meta(parent, newname):
+        meta = {"name": newname, "original": parent.name, "trait": parent.meta["trait"]}
+        if "original_meta" not in parent.meta:
+            meta["original_meta"] = parent.meta
+        else:
+            meta["original_meta"] = parent.meta["original_meta"]
+        return meta
+
+    @staticmethod
+    def wrap(parent, newname=None):
+        """Return an in-memory copy of a dataset of images."""
+        if newname is None:
+            newname = str(uuid.uuid4())
+        setpath = os.path.join(os.getcwd(), "data", newname)
+        meta = MemoryDataset.get_meta(parent, newname)
+        store = MemoryStore(parent)
+        points = []
+        for point in parent.datapoints.values():
+            if not isinstance(point, (Image, PNGImage, PackedImage, MemoryImage)):
+                raise AttributeError("MemoryDataset: dataset " + parent.name + " contains datapoints that are no images.")
+            points.append(MemoryImage(setpath, meta, point.identity, point, store))
+        return MemoryDataset(newname, meta, points, store)
+
+    def copy(self, only_points=False, only_ids=False, newname=None, softlinked=False, mode="copy", threads=None):
+        if newname is None:
+            newname = str(uuid.uuid4())
+        self.log.info("Creating new in-memory dataset " + newname + ", copy of " + self.name)
+        keys = self.select_keys(only_points=only_points, only_ids=only_ids)
+        meta = MemoryDataset.get_meta(self, newname)
+        if softlinked:
+            meta["softlinked"] = True
+        return MemoryDataset(newname, meta, [self.datapoints[key] for key in keys], self.store, root=self.root)
+
+    def map(self, transform):
+        """Change every point by transform(point) when its image is first read."""
+        for point in self.datapoints.values():
+            point.transform = transform
+
+    def load(self):
+        """Read all points in order, applying pending changes."""
+        for point in self.datapoints.values():
+            point.load_image()
+
+    @property
+    def folder(self):
+        return self.materialize()
+
+    def materialize(self):
+        """Return a folder with the files of all points, writing the changed images."""
+        folder = os.path.join(os.getcwd(), "data", self.name)
+        if not self.materialized:
+            self.log.info("Materializing in-memory dataset " + self.name)
+            os.makedirs(folder, exist_ok=True)
+            for point in self.datapoints.values():
+                path = point.get_path()
+                dst = os.path.join(folder, point.get_filename())
+                if path != dst and not os.path.lexists(dst):
+                    os.symlink(path, dst)
+            self.materialized = True
+        return folder
+
+    def save(self, newname=None, mode="copy", threads=None):
+        """Store the dataset as regular dataset, e.g. as checkpoint to be reused by later runs, and return it.
+        Changed images are written, the files of unchanged images are copied from their parent with the given copy mode."""
+        if newname is None:
+            newname = self.name
+        base = os.path.join(os.getcwd(), "data")
+        folder = os.path.join(base, newname)
+        self.log.info("Saving in-memory dataset " + self.name + " as " + newname)
+        if os.path.lexists(folder):
+            shutil.rmtree(folder)
+            self.materialized = False
+        os.mkdir(folder)
+
+        files = []
+        for point in self.datapoints.values():
+            point.load_image()
+            if point.changed:
+                point.write(os.path.join(folder, point.get_filename()))
+            else:
+                files.append((point.source.get_path(), os.path.join(folder, point.get_filename())))
+        mode = FileCloner(mode, threads).clone(files)
+
+        attributes = dict(
+            (key, self.store.get(key)) for key in list(self.identities.keys()) + list(self.datapoints.keys()) if len(self.store.get(key))
+        )
+        if len(attributes):
+            if self.store.parent.attributes is not None:
+                AttributeStore(newname).set_batch(attributes)
+            else:
+                for key, attr in attributes.items():
+                    with open(os.path.join(folder, key + ".yaml"), "w") as file:
+                        file.write("---\n" + yaml.dump(attr))
+
+        meta = dict(self.meta)
+        meta["name"] = newname
+        meta.pop("softlinked", None)
+        if mode == "hardlink":
+            meta["copy_mode"] = mode
+        with open(os.path.join(base, newname + ".meta.yaml"), "w") as file:
+            file.write("---\n" + yaml.dump(meta))
+        DatasetIndex.update(newname, meta)
+        return Dataset(newname)
+
+    def fingerprint(self, threads=None):
+        """Return the content fingerprint (see Fingerprint), equal to that of a copy of the parent on disk with the same changes."""
+        keys = list(self.datapoints.keys())
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            hashes = list(executor.map(lambda key: Fingerprint.digest(self.datapoints[key].get_content()), keys))
+        return Fingerprint.get_root(self.id_points, dict(zip(keys, hashes)))
+
+    def add_identity(self, idname):
+        self.identities[idname] = Identity(self.setpath, idname, self.store)
+        self.id_points[idname] = []
+
+    def save_meta(self):
+        # the meta of in-memory datasets only lives in memory, see save()
+        pass
+
+    def unshare(self):
+        pass
+
+    def sync(self):
+        pass
+
+    def delete(self):
+        """Remove the files written for tools that required files."""
+        folder = os.path.join(os.getcwd(), "data", self.name)
+        if os.path.isdir(folder):
+            self.log.debug("Removing files of in-memory dataset " + self.name)
+            shutil.rmtree(folder)
+        self.materialized = False
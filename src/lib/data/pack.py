@@ -0,0 +1,164 @@
+import os
+import os.path
+import json
+import shutil
+import numpy as np
+from .clone import FileCloner
+from ..utils import get_tmp_path
+
+
+class ImagePack:
+    """Packed storage of a dataset of equally sized images.
+
+    All images of the set live in one (N, H, W, 3) uint8 array in NumPy format in the dataset folder (pack.npy),
+    the index (pack.json) maps the point keys to rows of the array. The index may reference a subset of the rows,
+    so copies of a set can share the array of their parent. The array is memory-mapped, reading an image does not decode anything.
+    Tools that need a file get a PNG materialized into <folder>/.unpacked, changes to these files are written back by sync().
+    """
+
+    data = "pack.npy"
+    index = "pack.json"
+    unpacked = ".unpacked"
+    cache = {}
+    # rows copied per step when writing a new array
+    chunk = 1024
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.path = os.path.join(folder, ImagePack.data)
+        with open(os.path.join(folder, ImagePack.index), "r") as file:
+            self.rows = json.load(file)["rows"]
+        self.array = None
+        self.writable = None
+
+    @staticmethod
+    def exists(folder):
+        return os.path.exists(os.path.join(folder, ImagePack.index))
+
+    @staticmethod
+    def open(folder):
+        mtime = os.stat(os.path.join(folder, ImagePack.index)).st_mtime_ns
+        if folder not in ImagePack.cache or ImagePack.cache[folder][0] != mtime:
+            ImagePack.cache[folder] = (mtime, ImagePack(folder))
+        return ImagePack.cache[folder][1]
+
+    @staticmethod
+    def write_index(folder, rows):
+        path = os.path.join(folder, ImagePack.index)
+        tmp = get_tmp_path(path)
+        with open(tmp, "w") as file:
+            json.dump({"rows": rows}, file)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def create(folder, keys, shape):
+        """Create an empty pack for the given keys and image shape (H, W, 3). Returns the writable array."""
+        array = np.lib.format.open_memmap(os.path.join(folder, ImagePack.data), mode="w+", dtype=np.uint8, shape=(len(keys),) + tuple(shape))
+        ImagePack.write_index(folder, dict((key, i) for i, key in enumerate(keys)))
+        return array
+
+    def keys(self):
+        return self.rows.keys()
+
+    def get_shape(self):
+        """Return the shape (H, W, 3) of the images."""
+        return tuple(np.load(self.path, mmap_mode="r").shape[1:])
+
+    def get(self, key):
+        """Return the image as (H, W, 3) BGR array. The array is mapped copy-on-write, changing it does not change the pack."""
+        if self.array is None:
+            self.array = np.load(self.path, mmap_mode="c")
+        return np.asarray(self.array[self.rows[key]])
+
+    def set(self, key, img):
+        if self.writable is None:
+            self.unshare()
+            self.writable = np.load(self.path, mmap_mode="r+")
+        if img.dtype != np.uint8:
+            # saturate like cv2.imwrite
+            img = np.clip(np.rint(img), 0, 255).astype(np.uint8)
+        if img.shape != self.writable.shape[1:]:
+            raise AttributeError(
+                "ImagePack: image of shape "
+                + str(img.shape)
+                + " does not fit pack of shape "
+                + str(self.writable.shape[1:])
+                + ", images that change their size require an unpacked dataset"
+            )
+        self.writable[self.rows[key]] = img
+        # a materialized file of the image is outdated now
+        path = self.get_unpacked_path(key)
+        if os.path.exists(path):
+            os.remove(path)
+
+    def flush(self):
+        if self.writable is not None:
+            self.writable.flush()
+
+    def unshare(self):
+        """Replace the array by a private copy if it is shared with another dataset (symlinked or hardlinked)."""
+        if os.path.islink(self.path) or os.stat(self.path).st_nlink > 1:
+            # only the referenced rows are copied, the mapped source stays readable once its name is removed
+            source = np.load(os.path.realpath(self.path), mmap_mode="r")
+            os.remove(self.path)
+            self.compact(source)
+        else:
+            return
+        self.array = None
+        self.writable = None
+
+    def compact(self, source):
+        keys = list(self.rows.keys())
+        array = ImagePack.create(self.folder, keys, source.shape[1:])
+        for i in range(0, len(keys), ImagePack.chunk):
+            array[i : i + ImagePack.chunk] = source[[self.rows[key] for key in keys[i : i + ImagePack.chunk]]]
+        array.flush()
+        self.rows = dict((key, i) for i, key in enumerate(keys))
+
+    def copy_to(self, folder, keys, softlinked=False, mode="copy", threads=None):
+        """Copy the images of the given keys into the dataset folder. Returns the copy mode that was used (see FileCloner)."""
+        rows = dict((key, self.rows[key]) for key in keys if key in self.rows)
+        dst = os.path.join(folder, ImagePack.data)
+        if softlinked:
+            os.symlink(os.path.realpath(self.path), dst)
+        elif mode == "copy":
+            pack = ImagePack.__new__(ImagePack)
+            pack.folder = folder
+            pack.rows = rows
+            pack.compact(np.load(self.path, mmap_mode="r"))
+            return "copy"
+        else:
+            # copy-on-write clones and hardlinks share the full array, the index selects the rows
+            mode = FileCloner(mode, threads).clone([(self.path, dst)])
+        ImagePack.write_index(folder, rows)
+        return "softlink" if softlinked else mode
+
+    def get_unpacked_path(self, key):
+        return os.path.join(self.folder, ImagePack.unpacked, key + ".png")
+
+    def materialize(self, key):
+        import cv2
+
+        path = self.get_unpacked_path(key)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = get_tmp_path(path, "png")
+            cv2.imwrite(tmp, self.get(key))
+            os.replace(tmp, path)
+        return path
+
+    def sync(self):
+        """Write materialized images back into the pack and remove them."""
+        import cv2
+
+        folder = os.path.join(self.folder, ImagePack.unpacked)
+        if not os.path.isdir(folder):
+            return
+        for file in os.listdir(folder):
+            key = file[:-4]
+            if file[-4:] == ".png" and key in self.rows:
+                img = cv2.imread(os.path.join(folder, file))
+                if img is not None:
+                    self.set(key, img)
+        self.flush()
+        shutil.rmtree(folder)
@@ -1,19 +1,23 @@
 import os
 import os.path
 import yaml
+import shutil
 import json
 import numpy as np
+from .pack import ImagePack
+from ..utils import get_tmp_path
 
 
 class Datapoint:
     ext = "yaml"
 
-    def __init__(self, setpath, setmetadata, identity, pointname):
+    def __init__(self, setpath, setmetadata, identity, pointname, attributes=None):
         self.setpath = setpath
         self.setmetadata = setmetadata
         self.idname = identity.name
         self.identity = identity
         self.pointname = pointname
+        self.attributes = attributes
         self.attr = False
 
     def __getattr__(self, atr):
@@ -25,9 +29,11 @@ class Datapoint:
 
     def load_attr(self):
         if self.attr is False:
+            if self.attributes is not None:
+                self.attr = self.attributes.get(self.get_attr_key())
             # lazy loading
-            if os.path.exists(os.path.join(self.setpath, self.idname + "." + self.pointname + ".yaml")):
-                with open(os.path.join(self.setpath, self.idname + "." + self.pointname + ".yaml"), "r") as file:
+            elif os.path.exists(self.get_attr_path()):
+                with open(self.get_attr_path(), "r") as file:
                     self.attr = yaml.load(file, Loader=yaml.SafeLoader)
             else:
                 self.attr = {}
@@ -44,9 +50,26 @@ class Datapoint:
         self.save_attr_file()
 
     def save_attr_file(self):
-        with open(os.path.join(self.setpath, self.idname + "." + self.pointname + ".yaml"), "w") as file:
+        if self.attributes is not None:
+            self.attributes.set(self.get_attr_key(), self.attr)
+            return
+        with open(self.get_attr_path(), "w") as file:
             file.write("---\n" + yaml.dump(self.attr))
 
+    def get_attr_key(self):
+        return self.idname + "." + self.pointname
+
+    def get_attr_path(self):
+        return os.path.join(self.setpath, self.idname + "." + self.pointname + ".yaml")
+
+    def unshare(self):
+        """Replace the file by a private copy if it is hardlinked with another dataset. Call before writing to it in place."""
+        path = self.get_path()
+        if os.stat(path).st_nlink > 1:
+            tmp = get_tmp_path(path)
+            shutil.copy2(path, tmp)
+            os.replace(tmp, path)
+
     def get_path(self):
         return os.path.join(self.setpath, self.get_filename())
 
@@ -65,6 +88,16 @@ class Image(Datapoint):
     def is_datapoint(filename):
         return filename.split(".")[-1] == "jpg"
 
+    def load_image(self):
+        import cv2
+
+        return cv2.imread(self.get_path())
+
+    def save_image(self, img):
+        import cv2
+
+        cv2.imwrite(self.get_path(), img)
+
 
 class PNGImage(Datapoint):
     ext = "png"
@@ -73,6 +106,149 @@ class PNGImage(Datapoint):
     def is_datapoint(filename):
         return filename.split(".")[-1] == "png"
 
+    def load_image(self):
+        import cv2
+
+        return cv2.imread(self.get_path())
+
+    def save_image(self, img):
+        import cv2
+
+        cv2.imwrite(self.get_path(), img)
+
+
+class PackedImage(Datapoint):
+    """Image stored in the image pack of its dataset (see ImagePack), loaded without decoding.
+    get_path() materializes a PNG for tools that require a file."""
+
+    ext = "png"
+
+    @staticmethod
+    def is_datapoint(filename):
+        # packed images have no file of their own, they are found through the pack index
+        return False
+
+    def get_pack(self):
+        return ImagePack.open(self.setpath)
+
+    def load_image(self):
+        return self.get_pack().get(self.idname + "." + self.pointname)
+
+    def save_image(self, img):
+        self.get_pack().set(self.idname + "." + self.pointname, img)
+
+    def get_path(self):
+        return self.get_pack().materialize(self.idname + "." + self.pointname)
+
+    def unshare(self):
+        self.get_pack().unshare()
+
+
+class MemoryImage(Datapoint):
+    """Image of a dataset held in memory (see MemoryDataset), read from a point of the parent dataset.
+
+    If a transform is set, it is applied to the point when the image is first read, e.g. an anonymization.
+    Saved images are passed through the codec of the parent file, so they read back exactly as if written to and read from disk.
+    get_path() writes the image to <setpath>/<file> for tools that require a file.
+    """
+
+    ext = "png"
+
+    def __init__(self, setpath, setmetadata, identity, source, attributes=None, transform=None):
+        super().__init__(setpath, setmetadata, identity, source.pointname, attributes)
+        self.source = source
+        self.transform = transform
+        self.ext = source.ext
+        # packed images have no file and no codec
+        if isinstance(source, MemoryImage):
+            self.codec = source.codec
+        else:
+            self.codec = None if isinstance(source, PackedImage) else "." + source.ext
+        self.image = None
+        # encoded file content of the saved image, if it went through a lossy codec
+        self.data = None
+        self.changed = False
+
+    @staticmethod
+    def is_datapoint(filename):
+        return False
+
+    def load_image(self):
+        if self.image is None:
+            self.image = self.source.load_image()
+            if self.transform is not None:
+                transform, self.transform = self.transform, None
+                transform(self)
+        # like a decoded file, the returned array may be changed by the caller
+        return self.image.copy()
+
+    def save_image(self, img):
+        self.changed = True
+        self.data = None
+        # a file written by get_path is outdated now
+        path = os.path.join(self.setpath, self.get_filename())
+        if os.path.exists(path):
+            os.remove(path)
+        if self.codec is None:
+            # saturate like ImagePack.set
+            self.image = np.clip(np.rint(img), 0, 255).astype(np.uint8) if img.dtype != np.uint8 else img.copy()
+        elif self.codec == ".png" and img.dtype == np.uint8 and img.ndim == 3 and img.shape[2] == 3:
+            # lossless, reads back unchanged
+            self.image = img.copy()
+        else:
+            import cv2
+
+            ok, data = cv2.imencode(self.codec, img)
+            if not ok:
+                raise RuntimeError("Could not encode image " + self.get_filename())
+            self.data = data.tobytes()
+            self.image = cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+    def get_path(self):
+        self.load_image()
+        if not self.changed:
+            return self.source.get_path()
+        path = os.path.join(self.setpath, self.get_filename())
+        if not os.path.exists(path):
+            os.makedirs(self.setpath, exist_ok=True)
+            self.write(path)
+        return path
+
+    def encode(self):
+        """Return the file content of the image."""
+        if self.data is None:
+            import cv2
+
+            ok, data = cv2.imencode("." + self.ext, self.image)
+            if not ok:
+                raise RuntimeError("Could not encode image " + self.get_filename())
+            self.data = data.tobytes()
+        return self.data
+
+    def write(self, path):
+        """Write the image to a file, as the parent dataset would have stored it."""
+        tmp = get_tmp_path(path)
+        with open(tmp, "wb") as file:
+            file.write(self.encode())
+        os.replace(tmp, path)
+
+    def get_content(self):
+        """Return the bytes the point is fingerprinted by (see Fingerprint): the file content, or the pixels of packed images."""
+        self.load_image()
+        if not self.changed:
+            if isinstance(self.source, MemoryImage):
+                return self.source.get_content()
+            if isinstance(self.source, PackedImage):
+                return self.source.load_image().tobytes()
+            with open(self.source.get_path(), "rb") as file:
+                return file.read()
+        if self.codec is None:
+            return self.image.tobytes()
+        return self.encode()
+
+    def unshare(self):
+        pass
+
 
 class MOCAP(Datapoint):
     ext = "mocap"
@@ -81,42 +257,42 @@ class MOCAP(Datapoint):
     def is_datapoint(filename):
         return filename.split(".")[-1] == "mocap"
 
-    def load_position(self):
-        with open(self.get_path(), "r") as f:
-            data = np.array(json.load(f))
-
-            if "original_meta" in self.setmetadata:
-                meta = self.setmetadata["original_meta"]
-            else:
-                meta = self.setmetadata
+    # magic string of the NumPy .npy format
+    magic = b"\x93NUMPY"
 
-            range = meta["position_range"]
-            data = data[:, range[0] : range[1]]
+    def get_meta(self):
+        if "original_meta" in self.setmetadata:
+            return self.setmetadata["original_meta"]
+        return self.setmetadata
 
-        return data
+    def load_position(self):
+        range = self.get_meta()["position_range"]
+        return self.load()[:, range[0] : range[1]]
 
     def load_rotation(self):
-        with open(self.get_path(), "r") as f:
-            data = np.array(json.load(f))
-
-            if "original_meta" in self.setmetadata:
-                meta = self.setmetadata["original_meta"]
-            else:
-                meta = self.setmetadata
-
-            range = meta["rotation_range"]
-            data = data[:, range[0] : range[1]]
+        range = self.get_meta()["rotation_range"]
+        return self.load()[:, range[0] : range[1]]
 
-        return data
+    def is_binary(self):
+        with open(self.get_path(), "rb") as f:
+            return f.read(len(MOCAP.magic)) == MOCAP.magic
 
     def load(self):
+        """Load the sequence as (frames, channels) array.
+        Binary files are memory-mapped copy-on-write, changes to the array are never written back to the file.
+        Legacy JSON files are still read (see scripts/motion/convert_mocap.py)."""
+        if self.is_binary():
+            return np.load(self.get_path(), mmap_mode="c")
         with open(self.get_path(), "r") as f:
-            data = np.array(json.load(f))
-        return data
+            return np.array(json.load(f))
 
     def save(self, data):
-        with open(self.get_path(), "w") as f:
-            json.dump(data.tolist(), f)
+        # write to a new file, the old one may still be mapped or hardlinked to another dataset
+        path = self.get_path()
+        tmp = get_tmp_path(path)
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(data, dtype=np.float64))
+        os.replace(tmp, path)
 
 
 class Video(Datapoint):
@@ -1,47 +1,80 @@
 import os
 import os.path
 import yaml
+import json
 import shutil
 import uuid
 import logging
 import time
-from .point import Datapoint
+from contextlib import contextmanager
+from .point import Datapoint, PackedImage
+from .pack import ImagePack
 from .identity import Identity
+from .attributes import AttributeStore, AttributeBatch
+from .index import DatasetIndex
+from .clone import FileCloner
+from .fingerprint import Fingerprint
+from .journal import Journal
+from ..utils import get_tmp_path
 
 
 class Dataset:
+    # set while stages are only planned (see Planner): datasets are loaded without writing manifests or fingerprints
+    readonly = False
+
+    def __new__(cls, name):
+        # datasets stored as views are loaded as such wherever a dataset is opened by name
+        if cls is Dataset and os.path.exists(DatasetView.get_view_path(name)):
+            return super().__new__(DatasetView)
+        return super().__new__(cls)
+
     def __init__(self, name):
         self.log = logging.getLogger("seba.data")
         self.identities = {}
         self.datapoints = {}
+        self.id_points = {}
         self.name = name
         self.log.debug("Loading dataset " + name)
         self.reload_meta()
 
         base = os.path.join(os.getcwd(), "data")
         self.folder = os.path.join(base, name)
+        self.setpath = self.folder
+        self.root = name
+        self.attributes = AttributeStore(name) if AttributeStore.exists(name) else None
         self.scan_folder()
 
+    @staticmethod
+    @contextmanager
+    def read_only():
+        """Load datasets without writing anything to data/ while the context is active."""
+        previous = Dataset.readonly
+        Dataset.readonly = True
+        try:
+            yield
+        finally:
+            Dataset.readonly = previous
+
     def reload_meta(self):
+        self.meta = Dataset.load_meta(self.name)
+
+    @staticmethod
+    def load_meta(name):
+        """Return the meta of a dataset without loading the dataset."""
         base = os.path.join(os.getcwd(), "data")
-        with open(os.path.join(base, self.name + ".meta.yaml"), "r") as file:
-            self.meta = yaml.load(file, Loader=yaml.SafeLoader)
+        with open(os.path.join(base, name + ".meta.yaml"), "r") as file:
+            return yaml.load(file, Loader=yaml.SafeLoader)
 
     def scan_folder(self):
-        datapointclasses = Datapoint.__subclasses__()
-        files = os.listdir(self.folder)
-        files.sort()
-        self.log.debug("Checking " + str(len(files)) + " files.")
+        # the folder mtime only changes when files are added, removed or renamed
+        mtime = os.stat(self.folder).st_mtime_ns
+        if not self.load_manifest(mtime):
+            self.scan_files()
+            if not Dataset.readonly:
+                self.save_manifest(mtime)
+        self.log_loaded()
 
-        for file in files:
-            for cls in datapointclasses:
-                if cls.is_datapoint(file):
-                    if not file.split(".")[0] in self.identities:
-                        self.identities[file.split(".")[0]] = Identity(self.folder, file.split(".")[0])
-                    identity = self.identities[file.split(".")[0]]
-                    self.datapoints[".".join(file.split(".")[:2])] = cls(self.folder, self.meta, identity, file.split(".")[1])
-                    identity.npoints += 1
-                    continue
+    def log_loaded(self):
         self.log.info(
             "Loading dataset "
             + self.name
@@ -52,31 +85,157 @@ class Dataset:
             + " identities."
         )
 
+    def scan_files(self):
+        datapointclasses = dict((cls.ext, cls) for cls in Datapoint.__subclasses__() if cls.is_datapoint("." + cls.ext))
+        with os.scandir(self.folder) as it:
+            files = sorted(entry.name for entry in it)
+        self.log.debug("Checking " + str(len(files)) + " files.")
+
+        if ImagePack.exists(self.folder):
+            for key in ImagePack.open(self.folder).keys():
+                idname, pointname = key.split(".", 1)
+                self.add_point(idname, pointname, PackedImage)
+
+        for file in files:
+            parts = file.split(".")
+            if parts[-1] in datapointclasses and parts[0] + "." + parts[1] not in self.datapoints:
+                self.add_point(parts[0], parts[1], datapointclasses[parts[-1]])
+
+    def add_identity(self, idname):
+        self.identities[idname] = Identity(self.setpath, idname, self.attributes)
+        self.id_points[idname] = []
+
+    def add_point(self, idname, pointname, cls):
+        if idname not in self.identities:
+            self.add_identity(idname)
+        identity = self.identities[idname]
+        self.datapoints[idname + "." + pointname] = cls(self.setpath, self.meta, identity, pointname, self.attributes)
+        self.id_points[idname].append(idname + "." + pointname)
+        identity.npoints += 1
+
+    def load_manifest(self, mtime):
+        path = Dataset.get_manifest_path(self.name)
+        if not os.path.exists(path):
+            return False
+        with open(path, "r") as file:
+            manifest = json.load(file)
+        if manifest["mtime"] != mtime:
+            self.log.debug("Manifest of dataset " + self.name + " is outdated.")
+            return False
+        return self.load_points(manifest)
+
+    def load_points(self, manifest):
+        datapointclasses = dict((cls.__name__, cls) for cls in Datapoint.__subclasses__())
+        if not all(cls in datapointclasses for cls in manifest["classes"]):
+            return False
+        for idname in manifest["identities"]:
+            self.add_identity(idname)
+        for key, cls in manifest["points"]:
+            idname, pointname = key.split(".", 1)
+            self.add_point(idname, pointname, datapointclasses[manifest["classes"][cls]])
+        return True
+
+    def save_manifest(self, mtime, name=None, keys=None):
+        if name is None:
+            name = self.name
+        self.write_manifest(Dataset.get_manifest_path(name), {"mtime": mtime}, keys)
+
+    def write_manifest(self, path, manifest, keys=None):
+        if keys is None:
+            keys = self.datapoints.keys()
+
+        classes = []
+        identities = {}
+        points = []
+        for key in keys:
+            cls = type(self.datapoints[key]).__name__
+            if cls not in classes:
+                classes.append(cls)
+            identities[self.datapoints[key].idname] = True
+            points.append([key, classes.index(cls)])
+        manifest = manifest | {"classes": classes, "identities": list(identities.keys()), "points": points}
+
+        tmp = get_tmp_path(path)
+        with open(tmp, "w") as file:
+            json.dump(manifest, file)
+        os.replace(tmp, path)
+
+    @staticmethod
+    def get_manifest_path(name):
+        return os.path.join(os.getcwd(), "data", name + ".manifest.json")
+
     def point_by_id(self):
-        return list(map(lambda id: list(filter(lambda point: point.startswith(id + "."), self.datapoints.keys())), self.identities.keys()))
+        return [list(keys) for keys in self.id_points.values()]
 
-    def copy(self, only_points=False, only_ids=False, newname=None, softlinked=False):
-        if newname is None:
-            newname = str(uuid.uuid4())
-        base = os.path.join(os.getcwd(), "data")
-        folder = os.path.join(base, newname)
-        os.mkdir(folder)
+    def get_point_keys(self, idname):
+        return list(self.id_points[idname])
 
+    def get_points(self, idname):
+        return [self.datapoints[key] for key in self.id_points[idname]]
+
+    def select_keys(self, only_points=False, only_ids=False):
+        ids = set(only_ids) if only_ids else None
+        points = set(only_points) if only_points else None
+        return [
+            key
+            for idname, pointkeys in self.id_points.items()
+            if ids is None or idname in ids
+            for key in pointkeys
+            if points is None or key in points
+        ]
+
+    def link_files(self, folder, keys, softlinked=False, mode="copy", threads=None):
+        """Copy (or symlink) the files and YAML sidecars of the given points from the folder holding them into another folder.
+        Returns the copy mode that was used (see FileCloner)."""
         allowed_ext = ["yaml"]
         for cls in Datapoint.__subclasses__():
             allowed_ext.append(cls.ext)
 
+        points = set(keys)
+        ids = set(key.split(".")[0] for key in keys)
+
+        files = []
+        sidecars = []
+        for file in os.listdir(self.setpath):
+            parts = file.split(".")
+            if len(parts) > 1 and parts[-1] in allowed_ext and parts[0] in ids:
+                if parts[0] + "." + parts[1] in points or parts[1] == "yaml":
+                    files.append((os.path.join(self.setpath, file), os.path.join(folder, file)))
+                    if parts[-1] == "yaml":
+                        sidecars.append(files[-1][0])
+
+        packmode = None
+        if ImagePack.exists(self.setpath):
+            packmode = ImagePack.open(self.setpath).copy_to(folder, keys, softlinked=softlinked, mode=mode, threads=threads)
+
+        if softlinked:
+            for src, dst in files:
+                os.symlink(src, dst)
+            return "softlink"
+        mode = FileCloner(mode, threads).clone(files, private=sidecars)
+        return "hardlink" if packmode == "hardlink" else mode
+
+    def copy(self, only_points=False, only_ids=False, newname=None, softlinked=False, mode="copy", threads=None):
+        if newname is None:
+            newname = str(uuid.uuid4())
+        base = os.path.join(os.getcwd(), "data")
+
         self.log.info("Creating new dataset " + newname + ", copy of " + self.name)
+        keys = self.select_keys(only_points=only_points, only_ids=only_ids)
 
-        for file in os.listdir(self.folder):
-            if not only_ids or file.split(".")[0] in only_ids:
-                if (not only_points or ".".join(file.split(".")[:2]) in only_points or file.split(".")[1] == "yaml") and (
-                    file.split(".")[-1] in allowed_ext
-                ):
-                    if softlinked:
-                        os.symlink(os.path.join(self.folder, file), os.path.join(folder, file))
-                    else:
-                        shutil.copy(os.path.join(self.folder, file), os.path.join(folder, file))
+        if softlinked:
+            # softlinked copies are stored as views on the dataset holding the files
+            self.write_manifest(DatasetView.get_view_path(newname), {"root": self.root}, keys)
+        else:
+            folder = os.path.join(base, newname)
+            os.mkdir(folder)
+            mode = self.link_files(folder, keys, mode=mode, threads=threads)
+            # the new set contains exactly the selected points, so its manifest can be written without a rescan
+            self.save_manifest(os.stat(folder).st_mtime_ns, name=newname, keys=keys)
+
+            if self.attributes is not None:
+                ids = set(key.split(".")[0] for key in keys)
+                self.attributes.copy_to(newname, list(ids) + keys)
 
         meta = {"name": newname, "original": self.name, "trait": self.meta["trait"]}
         if "original_meta" not in self.meta:
@@ -85,26 +244,199 @@ class Dataset:
             meta["original_meta"] = self.meta["original_meta"]
         if softlinked:
             meta["softlinked"] = True
+        elif mode == "hardlink":
+            # files are shared with the parent until they are unshared before writing
+            meta["copy_mode"] = mode
         with open(os.path.join(base, newname + ".meta.yaml"), "w") as file:
             file.write("---\n" + yaml.dump(meta))
+        DatasetIndex.update(newname, meta)
 
         if softlinked:
-            return SoftlinkDataset(newname)
+            return DatasetView(newname)
         else:
             return Dataset(newname)
 
+    def resume(self, journal, keep=True):
+        """Prepare the dataset for an anonymization or de-anonymization that records its progress in the journal.
+        If an earlier run was interrupted, points it changed but did not finish are restored from the parent dataset.
+        Returns the keys of the points finished by the earlier run if keep is set, otherwise all points are processed again."""
+        if not journal.exists():
+            journal.start()
+            return set()
+
+        start, done = journal.load()
+        if not keep:
+            done = set()
+        parent = Dataset(self.meta["original"])
+        restored = 0
+        for key, point in self.datapoints.items():
+            if key in done:
+                continue
+            if isinstance(point, PackedImage):
+                point.save_image(parent.datapoints[key].load_image())
+                restored += 1
+                continue
+            path = point.get_path()
+            # allow for the coarse clock of file timestamps
+            if os.stat(path).st_mtime_ns >= start - 10**9:
+                tmp = get_tmp_path(path)
+                shutil.copy(parent.datapoints[key].get_path(), tmp)
+                os.replace(tmp, path)
+                restored += 1
+        self.log.info(
+            "Resuming dataset {}: {} points finished, {} points restored from {}.".format(self.name, len(done), restored, parent.name)
+        )
+        if not keep:
+            journal.start()
+        return done
+
+    def fingerprint(self, threads=None):
+        """Return the content fingerprint of the dataset (see Fingerprint).
+        Datasets loaded read-only are not hashed, None is returned unless their cached fingerprint is up to date."""
+        if Dataset.readonly:
+            return Fingerprint(self, threads).get_cached()
+        return Fingerprint(self, threads).get()
+
+    def attribute_batch(self, every=1000):
+        """Return a context for buffered attribute updates of many points, e.g.
+        with set.attribute_batch() as w:
+            w.set(point, key, value)
+        Updates are written every `every` changed points and when the context is left."""
+        return AttributeBatch(every)
+
     def save_meta(self):
         base = os.path.join(os.getcwd(), "data")
         with open(os.path.join(base, self.name + ".meta.yaml"), "w") as file:
             file.write("---\n" + yaml.dump(self.meta))
+        DatasetIndex.update(self.name, self.meta)
+
+    def is_packed(self):
+        """Whether the images of the dataset are stored in an image pack (see ImagePack) instead of files."""
+        return ImagePack.exists(self.setpath)
+
+    def get_file_folder(self):
+        """Return a folder holding a file <id>.<point>.<ext> of every point, for external tools reading a folder of images.
+        This is the dataset folder, except for packed datasets: their folder holds the pack only, so every point is materialized
+        (see PackedImage.get_path) and linked into <folder>/.files."""
+        if not self.is_packed():
+            return self.folder
+        folder = os.path.join(self.folder, ".files")
+        files = dict((point.get_filename(), point.get_path()) for point in self.datapoints.values())
+        if os.path.isdir(folder) and sorted(os.listdir(folder)) == sorted(files.keys()):
+            if all(os.path.exists(os.path.join(folder, file)) for file in files):
+                return folder
+        tmp = folder + "." + str(uuid.uuid4())[:8] + ".tmp"
+        os.mkdir(tmp)
+        for file, path in files.items():
+            os.symlink(path, os.path.join(tmp, file))
+        if os.path.isdir(folder):
+            # links of an earlier state of the dataset
+            shutil.rmtree(folder)
+        try:
+            os.rename(tmp, folder)
+        except OSError:
+            # linked concurrently by another process
+            shutil.rmtree(tmp)
+        return folder
+
+    def unshare(self):
+        """Replace all files hardlinked with another dataset by private copies."""
+        if self.meta.get("copy_mode") == "hardlink":
+            for point in self.datapoints.values():
+                point.unshare()
+
+    def sync(self):
+        """Write images changed through materialized files (see PackedImage.get_path) back into the image pack."""
+        if ImagePack.exists(self.folder):
+            ImagePack.open(self.folder).sync()
 
     def delete(self):
         self.log.warn("Deleting data set " + self.name)
         time.sleep(10)
         shutil.rmtree(self.folder)
+        DatasetIndex.remove(self.name)
+        for path in Dataset.get_files(self.name):
+            if os.path.exists(path):
+                os.remove(path)
+
+    @staticmethod
+    def get_files(name):
+        """Return the paths of all files that belong to a dataset but are stored next to its folder."""
         base = os.path.join(os.getcwd(), "data")
-        os.remove(os.path.join(base, self.name + ".meta.yaml"))
+        return [os.path.join(base, name + "." + ext) for ext in ["meta.yaml", AttributeStore.ext, "manifest.json", "view.json", Fingerprint.ext, Journal.ext]]
 
 
 class SoftlinkDataset(Dataset):
     pass
+
+
+class DatasetView(SoftlinkDataset):
+    """Dataset that references a selection of the points of another dataset without a folder of its own.
+
+    A view consists of its meta file and a manifest (data/<name>.view.json) naming the root dataset that holds the files
+    and listing the selected points. Points read their files and attributes directly from the root dataset.
+    A folder of symlinks is only created once a tool requires a directory (see folder).
+    """
+
+    def __init__(self, name):
+        self.log = logging.getLogger("seba.data")
+        self.identities = {}
+        self.datapoints = {}
+        self.id_points = {}
+        self.name = name
+        self.log.debug("Loading dataset view " + name)
+        self.reload_meta()
+
+        with open(DatasetView.get_view_path(name), "r") as file:
+            self.view = json.load(file)
+        base = os.path.join(os.getcwd(), "data")
+        self.root = self.view["root"]
+        self.setpath = os.path.join(base, self.root)
+        self.attributes = AttributeStore(self.root) if AttributeStore.exists(self.root) else None
+        self.scan_folder()
+
+    @staticmethod
+    def get_view_path(name):
+        return os.path.join(os.getcwd(), "data", name + ".view.json")
+
+    @property
+    def folder(self):
+        return self.materialize()
+
+    def scan_folder(self):
+        if not self.load_points(self.view):
+            raise RuntimeError("Dataset view " + self.name + " contains unknown datapoint types.")
+        self.log_loaded()
+
+    def materialize(self):
+        folder = os.path.join(os.getcwd(), "data", self.name)
+        if not os.path.isdir(folder):
+            self.log.info("Materializing dataset view " + self.name)
+            tmp = folder + "." + str(uuid.uuid4())[:8] + ".tmp"
+            os.mkdir(tmp)
+            self.link_files(tmp, list(self.datapoints.keys()), softlinked=True)
+            try:
+                os.rename(tmp, folder)
+            except OSError:
+                # materialized concurrently by another process
+                shutil.rmtree(tmp)
+        return folder
+
+    def detach(self):
+        """Turn the view into a dataset with its own folder of symlinks, e.g. to replace single files, and return it."""
+        self.materialize()
+        if self.attributes is not None:
+            self.attributes.copy_to(self.name, list(self.identities.keys()) + list(self.datapoints.keys()))
+        os.remove(DatasetView.get_view_path(self.name))
+        return Dataset(self.name)
+
+    def delete(self):
+        self.log.warn("Deleting data set " + self.name)
+        time.sleep(10)
+        folder = os.path.join(os.getcwd(), "data", self.name)
+        if os.path.isdir(folder):
+            shutil.rmtree(folder)
+        DatasetIndex.remove(self.name)
+        for path in Dataset.get_files(self.name):
+            if os.path.exists(path):
+                os.remove(path)
@@ -0,0 +1,216 @@
+from .resources import ResourceManager
+
+import queue
+import random
+import logging
+import threading
+import traceback
+import multiprocessing
+import numpy as np
+
+
+class PointExecutor:
+    """Run a function on every point of a dataset, in a pool of forked processes if more than one worker is configured.
+
+    The number of workers and the points sent to a worker at once are set by opt.workers and opt.chunksize
+    of the parameters of a plugin, which do not change cached datasets. Workers are capped by the CPU budget (see ResourceManager).
+    Forked workers use the plugin and dataset of the running process as they are, only the positions of the points are sent.
+    Points are finished (see AbstractAnonymization.finish_point) by the running process in the order of the points,
+    so progress and journal are the same as when running serially. A failing point stops the pool and raises a RuntimeError.
+    Anonymizations working on arrays of images run in batches instead (see run_batches and AbstractFaceAnonymization.anonymize_batch),
+    which are sent to the workers as a whole if more than one worker is configured.
+    """
+
+    # points or batches of points and function of the running pool, inherited by the forked workers
+    task = None
+    # fraction of the points between progress messages
+    progress = 0.1
+    # batches loaded ahead of and waiting to be saved behind the running batch (see run_batches)
+    prefetch = 2
+
+    def __init__(self, config, workers=1):
+        self.log = logging.getLogger("seba.executor")
+        opt = config.get("opt", {}) if isinstance(config, dict) else {}
+        self.workers = ResourceManager.get_workers(opt.get("workers", workers))
+        self.chunksize = opt.get("chunksize")
+
+    def is_parallel(self):
+        return self.workers > 1
+
+    def run(self, points, function, done, action="Processed"):
+        """Call function(point) for every point, then done(point) in the order of the points."""
+        points = list(points)
+        if not self.is_parallel() or len(points) < 2:
+            for i, point in enumerate(points):
+                function(point)
+                done(point)
+                self.report(i + 1, len(points), action)
+            return
+
+        chunksize = self.chunksize or max(len(points) // (self.workers * 4), 1)
+        self.log.debug("Running {} points in {} processes, {} points per chunk".format(len(points), self.workers, chunksize))
+        for i, point in enumerate(self.map(points, function, chunksize)):
+            done(point)
+            self.report(i + 1, len(points), action)
+
+    def map(self, items, function, chunksize):
+        """Call function(item) for every item in the pool of workers, yield the items in their order once they are done."""
+        PointExecutor.task = (items, function)
+        try:
+            context = multiprocessing.get_context("fork")
+            threads = ResourceManager.get_threads(self.workers)
+            with context.Pool(self.workers, initializer=PointExecutor.init_worker, initargs=(threads,)) as pool:
+                for position in pool.imap(PointExecutor.work, range(len(items)), chunksize):
+                    yield items[position]
+        finally:
+            PointExecutor.task = None
+
+    def run_batches(self, points, size, load, function, save, done, action="Processed"):
+        """Call function(images, points) on batches of up to size points whose images (load(point)) are of equal shape,
+        stacked into one array. Batches are loaded by a reading thread ahead of the running batch, results are saved
+        by save(point, image) and done(point) in the order of the points by a writing thread.
+        With more than one worker, every worker loads, processes and saves whole batches instead (see run_batches_parallel)."""
+        points = list(points)
+        if self.is_parallel() and len(points) > size:
+            self.run_batches_parallel(points, size, load, function, save, done, action)
+            return
+        loaded = queue.Queue(maxsize=PointExecutor.prefetch)
+        results = queue.Queue(maxsize=PointExecutor.prefetch)
+        stop = threading.Event()
+        errors = []
+
+        def read():
+            try:
+                for item in PointExecutor.stack(points, size, load):
+                    if not PointExecutor.put(loaded, item, stop):
+                        return
+                PointExecutor.put(loaded, None, stop)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        def write():
+            finished = 0
+            try:
+                while True:
+                    item = PointExecutor.get(results, stop)
+                    if item is None:
+                        return
+                    for point, image in zip(*item):
+                        save(point, image)
+                        done(point)
+                        finished += 1
+                        self.report(finished, len(points), action)
+            except Exception as e:
+                errors.append(e)
+                stop.set()
+
+        self.log.debug("Running {} points in batches of {}".format(len(points), size))
+        threads = [threading.Thread(target=read, daemon=True), threading.Thread(target=write, daemon=True)]
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                item = PointExecutor.get(loaded, stop)
+                if item is None:
+                    break
+                batch, images = item
+                if not PointExecutor.put(results, (batch, function(images, batch)), stop):
+                    break
+            PointExecutor.put(results, None, stop)
+        except Exception:
+            stop.set()
+            raise
+        finally:
+            # the writing thread records the finished points, wait for it
+            threads[1].join()
+            stop.set()
+            threads[0].join()
+        if len(errors):
+            raise errors[0]
+
+    def run_batches_parallel(self, points, size, load, function, save, done, action="Processed"):
+        """Send batches of size points to the pool of workers, each loading, processing and saving its batches.
+        Points are done in the order of the points by the running process."""
+        batches = [points[i : i + size] for i in range(0, len(points), size)]
+
+        def process(batch):
+            for stacked, images in PointExecutor.stack(batch, size, load):
+                for point, image in zip(stacked, function(images, stacked)):
+                    save(point, image)
+
+        self.log.debug("Running {} points in batches of {} in {} processes".format(len(points), size, self.workers))
+        finished = 0
+        for batch in self.map(batches, process, self.chunksize or 1):
+            for point in batch:
+                done(point)
+                finished += 1
+                self.report(finished, len(points), action)
+
+    @staticmethod
+    def stack(points, size, load):
+        """Yield (batch, images) of up to size consecutive points whose images are of equal shape, stacked into one array."""
+        batch = []
+        images = []
+        for point in points:
+            image = load(point)
+            if len(batch) == size or (len(batch) and image.shape != images[0].shape):
+                yield batch, np.stack(images)
+                batch = []
+                images = []
+            batch.append(point)
+            images.append(image)
+        if len(batch):
+            yield batch, np.stack(images)
+
+    @staticmethod
+    def put(q, item, stop):
+        """Put an item into a queue unless stop is set first. Returns whether it was put."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    @staticmethod
+    def get(q, stop):
+        """Return the next item of a queue, None if stop is set first."""
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        return None
+
+    def report(self, finished, total, action):
+        step = max(int(total * PointExecutor.progress), 1)
+        if finished % step == 0 or finished == total:
+            self.log.info("{} {}/{} points".format(action, finished, total))
+
+    @staticmethod
+    def init_worker(threads):
+        ResourceManager.init_worker(threads)
+        # forked workers inherit the random state, they would draw the same numbers otherwise
+        random.seed()
+        np.random.seed()
+
+    @staticmethod
+    def work(position):
+        items, function = PointExecutor.task
+        item = items[position]
+        try:
+            function(item)
+        except Exception:
+            # the traceback of the worker is lost when the exception is sent to the running process
+            if isinstance(item, list):
+                name = "batch of points " + PointExecutor.get_name(item[0]) + " to " + PointExecutor.get_name(item[-1])
+            else:
+                name = "point " + PointExecutor.get_name(item)
+            raise RuntimeError("Failed on " + name + ":\n" + traceback.format_exc())
+        return position
+
+    @staticmethod
+    def get_name(point):
+        return point.idname + "." + point.pointname
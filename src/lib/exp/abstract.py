@@ -1,7 +1,13 @@
 from ..data.set import Dataset
+from ..data.manager import DatasetManager
+from .step import Step
+from ..trace import Tracer
+from ..resources import ResourceManager
 
+import contextlib
 import copy
 import logging
+import time
 import yaml
 import json
 
@@ -15,8 +21,94 @@ class AbstractExperiment:
         self.orig_config = copy.deepcopy(config)
         self.sets["orig"] = Dataset(self.config["dataset"])
         self.trait = self.sets["orig"].meta["trait"]
+        ResourceManager.configure(self.get_opt("cpu_budget"))
+
+    def get_opt(self, key, default=None):
+        """Return an option from the opt block of the run config. Options do not influence results or cached datasets."""
+        if "opt" not in self.config or key not in self.config["opt"]:
+            return default
+        return self.config["opt"][key]
+
+    def get_source(self, parent):
+        """Return how a derived dataset refers to its parent when it is looked up:
+        by the content fingerprint of the parent if the content_cache option is set, otherwise by its name."""
+        if self.get_opt("content_cache", False):
+            return {"content": AbstractExperiment.get_fingerprint(parent, self.get_opt("copy_threads"))}
+        return {"original": parent.name}
+
+    @staticmethod
+    def get_fingerprint(set, threads=None):
+        """Return the fingerprint of a dataset, raises a RuntimeError if it is loaded read-only and not fingerprinted yet (see Planner)."""
+        fingerprint = set.fingerprint(threads=threads)
+        if fingerprint is None:
+            raise RuntimeError("Dataset " + set.name + " has no cached fingerprint.")
+        return fingerprint
+
+    def copy_set(self, parent):
+        new_set = parent.copy(mode=self.get_opt("copy_mode", "copy"), threads=self.get_opt("copy_threads"))
+        if self.get_opt("content_cache", False):
+            # saved with the meta of the anonymization or de-anonymization
+            new_set.meta["content"] = parent.fingerprint(threads=self.get_opt("copy_threads"))
+        return new_set
+
+    @staticmethod
+    def plan(config):
+        """Return the list of steps (see Step) run() consists of, or None if the experiment cannot be split into steps."""
+        return None
+
+    @staticmethod
+    def share_rounds(config, steps, other):
+        """Return the steps of a repeated run rearranged to share work with other rounds, given the steps of another round.
+        Stages are only shared if they create the same datasets in all rounds (see Run.plan)."""
+        return steps
+
+    def run(self):
+        for step in self.plan(self.config):
+            self.run_step(step)
+
+    def run_step(self, step):
+        if step.method is None:
+            self.sets[step.outputs[0]] = self.sets[step.inputs[0]]
+            return
+        # concurrent runs (scheduler jobs, queue workers) wait for each other instead of creating the same datasets
+        lock = contextlib.nullcontext()
+        if len(step.outputs):
+            lock = DatasetManager.lock(
+                {"method": step.method, "sets": [self.sets[name].name for name in step.inputs + step.uses], "params": step.params}
+            )
+        start = time.time()
+        with lock:
+            wait = time.time() - start
+            with Tracer.span(step.kind, method=step.method, module=step.get_name(), **step.info) as span:
+                result = getattr(self, step.method)(*[self.sets[name] for name in step.inputs], **step.kwargs)
+                if len(step.outputs) == 1:
+                    result = [result]
+                for name, set in zip(step.outputs, result if len(step.outputs) else []):
+                    self.sets[name] = set
+                if len(step.outputs):
+                    span.set(points=sum(len(self.sets[name].datapoints) for name in step.outputs), lock_wait=wait)
+
+    @staticmethod
+    def evaluation_steps(config):
+        if "privacy" in config:
+            params = {"privacy": config["privacy"]}
+        else:
+            params = {"utility": config["utility"]}
+        return [
+            Step("evaluate", "run_evaluation", [], [], params, uses=["train", "enroll", "test"]),
+            Step("metric", "record_metrics", [], [], {}),
+        ]
+
+    def record_metrics(self):
+        self.run_metrics()
+        self.save_metrics()
 
     def run_evaluation(self):
+        # points evaluated after training, see Tracer.record_throughput
+        Tracer.annotate(
+            module=self.config["privacy"]["name"] if "privacy" in self.config else self.config["utility"]["name"],
+            points=len(self.sets["enroll"].datapoints) + len(self.sets["test"].datapoints),
+        )
         if "privacy" in self.config:
             self.run_recognition()
         elif "utility" in self.config:
@@ -27,9 +119,15 @@ class AbstractExperiment:
 
         rec_module = ModuleLoader.get_classification_by_name(self.config["privacy"]["name"], self.trait)
         recognition = rec_module(self.config["privacy"]["params"])
+        recognition.content_cache = self.get_opt("content_cache", False)
         self.metrics = recognition.metrics
 
-        recognition.train(self.sets["train"])
+        with Tracer.span("train", module=self.config["privacy"]["name"], points=len(self.sets["train"].datapoints)) as span:
+            cached = recognition.is_cached(self.sets["train"])
+            if cached is not None:
+                span.set(cache="hit" if cached else "miss")
+            recognition.train(self.sets["train"])
+        Tracer.annotate(train_wall=span.args["wall"])
         self.resultset = recognition.run(self.sets["enroll"], self.sets["test"], self.save_result)
         self.resultset.save_context(self.orig_config, dict(map(lambda x: (x[0], x[1].name), self.sets.items())))
         recognition.cleanup()
@@ -39,9 +137,15 @@ class AbstractExperiment:
 
         ut_module = ModuleLoader.get_utility_by_name(self.config["utility"]["name"], self.trait)
         utility = ut_module(self.config["utility"]["params"])
+        utility.content_cache = self.get_opt("content_cache", False)
         self.metrics = utility.metrics
 
-        utility.train(self.sets["train"])
+        with Tracer.span("train", module=self.config["utility"]["name"], points=len(self.sets["train"].datapoints)) as span:
+            cached = utility.is_cached(self.sets["train"])
+            if cached is not None:
+                span.set(cache="hit" if cached else "miss")
+            utility.train(self.sets["train"])
+        Tracer.annotate(train_wall=span.args["wall"])
         self.resultset = utility.run(self.sets["enroll"], self.sets["test"], self.save_result)
         self.resultset.save_context(self.orig_config, dict(map(lambda x: (x[0], x[1].name), self.sets.items())))
 
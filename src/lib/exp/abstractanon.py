@@ -1,38 +1,157 @@
 from .abstract import AbstractExperiment
 from ..data.manager import DatasetManager
+from ..data.set import Dataset
+from ..data.journal import Journal
 from ..module_loader import ModuleLoader
+from .step import Step
+from ..trace import Tracer
 
 
 class AbstractAnonExperiment(AbstractExperiment):
-    def get_anonymized_set(self, parent):
-        params = {
-            "original": parent.name,
+    @staticmethod
+    def first_split_step(config):
+        return Step(
+            "split",
+            "get_first_split",
+            ["orig"],
+            ["anonbg", "attacker", "eval"],
+            {"splitter": "interid1to3", "rates": [config["rates"]["anonbg"], config["rates"]["attacker"]], "seed": config["seed"]},
+        )
+
+    @staticmethod
+    def anonymization_step(config, input, output):
+        return Step(
+            "anonymize",
+            "get_anonymized_set",
+            [input],
+            [output],
+            {
+                "anonymization": config["anonymization"]["name"],
+                "params": {key: val for key, val in config["anonymization"]["params"].items() if key != "opt"},
+            },
+            uses=["anonbg"],
+        )
+
+    @staticmethod
+    def selection_step(config, input, output):
+        return Step(
+            "select",
+            "get_selected_set",
+            [input],
+            [output],
+            {
+                "selector": config["selector"]["name"],
+                "params": {key: val for key, val in config["selector"]["params"].items() if key != "opt"} | {"seed": config["seed"]},
+            },
+            uses=["select_train"],
+        )
+
+    @staticmethod
+    def second_split_step(config, clear, anon, enroll_clear=False):
+        return Step(
+            "split",
+            "get_second_split",
+            [clear, anon],
+            ["enroll", "test"],
+            {"splitter": "intraid2to2", "rate": config["rates"]["enroll"], "seed": config["seed"], "enroll_clear": enroll_clear},
+            kwargs={"enroll_clear": enroll_clear},
+        )
+
+    @staticmethod
+    def share_rounds(config, steps, other):
+        """Anonymizations of the splits of the first split change with its seed. If every point is anonymized on its own
+        (see AbstractAnonymization.is_pointwise), the original dataset is anonymized once without background instead,
+        shared by all rounds, and the anonymized splits are restricted to the points of the splits (see get_restricted_set)."""
+        trait = Dataset.load_meta(config["dataset"])["trait"]
+        if not ModuleLoader.get_anonymization_by_name(config["anonymization"]["name"], trait).is_pointwise():
+            return steps
+        keys = Step.get_keys(steps, config["dataset"])[0]
+        other_keys = Step.get_keys(other, config["dataset"])[0]
+        shared = []
+        full = None
+        for step, key, other_step, other_key in zip(steps, keys, other, other_keys):
+            if step.kind != "anonymize" or key == other_key or step.params != other_step.params:
+                shared.append(step)
+                continue
+            if full is None:
+                full = Step(
+                    "anonymize",
+                    "get_anonymized_set",
+                    ["orig"],
+                    ["anon_orig"],
+                    step.params | {"background": False},
+                    kwargs={"background": False},
+                )
+                shared.append(full)
+            shared.append(Step("restrict", "get_restricted_set", ["anon_orig", step.inputs[0]], step.outputs, {}))
+        return shared
+
+    def get_anonymization_params(self, parent, background=True):
+        """Return the meta an anonymized dataset of parent is looked up by."""
+        params = self.get_source(parent) | {
             "anonymization": self.config["anonymization"]["name"],
-            "background": self.sets["anonbg"].name,
             "params": {key: val for key, val in self.config["anonymization"]["params"].items() if key != "opt"},
         }
+        if background:
+            params["background"] = self.get_background()
+        return params
+
+    def get_background(self):
+        """Return how anonymized datasets refer to the background set:
+        by its content fingerprint if the content_cache option is set, otherwise by its name."""
+        if self.get_opt("content_cache", False):
+            return AbstractExperiment.get_fingerprint(self.sets["anonbg"], self.get_opt("copy_threads"))
+        return self.sets["anonbg"].name
+
+    def find_anonymized_set(self, parent, background=True):
+        return DatasetManager.get_matching(self.get_anonymization_params(parent, background))
+
+    def get_anonymized_set(self, parent, background=True):
+        params = self.get_anonymization_params(parent, background)
         set = DatasetManager.get_matching(params)
         if set is not None:
             self.log.info("Anonymization skipped. Using existing dataset " + set.name)
+            Tracer.annotate(cache="hit")
             return set
+        Tracer.annotate(cache="miss")
+        set = DatasetManager.get_matching(params, complete=False)
+        if set is not None:
+            self.log.info("Resuming interrupted anonymization of dataset " + set.name)
+        return self.run_anonymization(parent, set, background)
+
+    def find_restricted_set(self, full, split):
+        return DatasetManager.get_matching({"original": full.name, "restricted": split.name})
+
+    def get_restricted_set(self, full, split):
+        """Return a view on the points of split in full, e.g. the anonymized points of a split of the original dataset."""
+        new_set = self.find_restricted_set(full, split)
+        Tracer.annotate(cache="miss" if new_set is None else "hit")
+        if new_set is None:
+            new_set = full.copy(only_points=list(split.datapoints.keys()), softlinked=True)
+            new_set.meta["restricted"] = split.name
+            new_set.save_meta()
         else:
-            return self.run_anonymization(parent)
+            self.log.info("Restriction skipped. Using existing dataset " + new_set.name)
+        return new_set
 
-    def run_anonymization(self, parent):
-        new_set = parent.copy()
+    def run_anonymization(self, parent, new_set=None, background=True):
+        if new_set is None:
+            new_set = self.copy_set(parent)
         try:
             anon = ModuleLoader.get_anonymization_by_name(self.config["anonymization"]["name"], self.trait)(
                 self.config["anonymization"]["params"], new_set
             )
-            anon.add_bg(self.sets["anonbg"])
+            if background:
+                anon.add_bg(self.sets["anonbg"], self.get_background())
             anon.run()
         except Exception:
-            if self.config["cleanup"]:
+            # sets with finished points are kept to be resumed by the next run
+            if self.config["cleanup"] and not Journal(new_set.name).has_progress():
                 new_set.delete()
             raise RuntimeError("Failed to run anonymization!")
         return new_set
 
-    def get_first_split(self, parent):
+    def find_first_split(self, parent):
         params = {
             "original": parent.name,
             "splitter": "interid1to3",
@@ -44,21 +163,31 @@ class AbstractAnonExperiment(AbstractExperiment):
         attacker = DatasetManager.get_matching(params)
         params["part"] = 2
         eval = DatasetManager.get_matching(params)
-
         if bg is None or attacker is None or eval is None:
+            return None
+        return bg, attacker, eval
+
+    def get_first_split(self, parent):
+        sets = self.find_first_split(parent)
+        Tracer.annotate(cache="miss" if sets is None else "hit")
+        if sets is None:
             splitter = ModuleLoader.get_splitter_by_name("interid1to3")(
                 {"rates": [self.config["rates"]["anonbg"], self.config["rates"]["attacker"]], "seed": self.config["seed"]}
             )
-            bg, attacker, eval = splitter.run([parent])
-        return bg, attacker, eval
+            sets = splitter.run([parent])
+        return sets
 
-    def get_selected_set(self, parent):
+    def find_selected_set(self, parent):
         params = {
             "original": parent.name,
             "selector": self.config["selector"]["name"],
             "params": {key: val for key, val in self.config["selector"]["params"].items() if key != "opt"} | {"seed": self.config["seed"]},
         }
-        new_set = DatasetManager.get_matching(params)
+        return DatasetManager.get_matching(params)
+
+    def get_selected_set(self, parent):
+        new_set = self.find_selected_set(parent)
+        Tracer.annotate(cache="miss" if new_set is None else "hit")
         if new_set is None:
             selector = ModuleLoader.get_selector_by_name(self.config["selector"]["name"])(
                 self.config["selector"]["params"] | {"seed": self.config["seed"]}
@@ -69,7 +198,7 @@ class AbstractAnonExperiment(AbstractExperiment):
             self.log.info("Selection skipped. Using existing dataset " + new_set.name)
         return new_set
 
-    def get_second_split(self, clear, anon, enroll_clear=False):
+    def find_second_split(self, clear, anon, enroll_clear=False):
         params = {
             "original": clear.name + "|" + anon.name,
             "splitter": "intraid2to2",
@@ -80,10 +209,16 @@ class AbstractAnonExperiment(AbstractExperiment):
         params["part"] = 1
         test_set = DatasetManager.get_matching(params)
         if enroll_set is None or test_set is None:
+            return None
+        return enroll_set, test_set
+
+    def get_second_split(self, clear, anon, enroll_clear=False):
+        sets = self.find_second_split(clear, anon, enroll_clear)
+        Tracer.annotate(cache="miss" if sets is None else "hit")
+        if sets is None:
             splitter = ModuleLoader.get_splitter_by_name("intraid2to2")(
                 {"rate": self.config["rates"]["enroll"], "seed": self.config["seed"], "enroll_clear": enroll_clear}
             )
-            enroll_set, test_set = splitter.run([clear, anon])
-        else:
-            self.log.info("Splitting skipped. Using existing datasets " + enroll_set.name + " & " + test_set.name)
-        return enroll_set, test_set
+            return splitter.run([clear, anon])
+        self.log.info("Splitting skipped. Using existing datasets " + sets[0].name + " & " + sets[1].name)
+        return sets
@@ -1,34 +1,57 @@
 from ..data.manager import DatasetManager
+from ..data.journal import Journal
 from ..module_loader import ModuleLoader
 from .abstractanon import AbstractAnonExperiment
+from .step import Step
+from ..trace import Tracer
 
 
 class DeanonExperiment(AbstractAnonExperiment):
-    def run(self):
-        self.sets["anonbg"], self.sets["attacker"], self.sets["eval"] = self.get_first_split(self.sets["orig"])
-        self.sets["train"] = self.sets["attacker"]
-        self.sets["anon_attacker"] = self.get_anonymized_set(self.sets["attacker"])
-        self.sets["select_train"] = self.sets["anon_attacker"]
-        self.sets["anon"] = self.get_anonymized_set(self.sets["eval"])
-        self.sets["select"] = self.get_selected_set(self.sets["anon"])
-        self.sets["deanon"] = self.get_deanonymized_set(self.sets["select"])
+    @staticmethod
+    def plan(config):
+        return [
+            AbstractAnonExperiment.first_split_step(config),
+            Step.alias("attacker", "train"),
+            AbstractAnonExperiment.anonymization_step(config, "attacker", "anon_attacker"),
+            Step.alias("anon_attacker", "select_train"),
+            AbstractAnonExperiment.anonymization_step(config, "eval", "anon"),
+            AbstractAnonExperiment.selection_step(config, "anon", "select"),
+            Step(
+                "deanonymize",
+                "get_deanonymized_set",
+                ["select"],
+                ["deanon"],
+                {
+                    "deanonymization": config["deanonymization"]["name"],
+                    "params": {key: val for key, val in config["deanonymization"]["params"].items() if key != "opt"},
+                },
+                uses=["attacker", "anon_attacker"],
+            ),
+            AbstractAnonExperiment.second_split_step(config, "eval", "deanon", enroll_clear=True),
+        ] + AbstractAnonExperiment.evaluation_steps(config)
 
-        self.sets["enroll"], self.sets["test"] = self.get_second_split(self.sets["eval"], self.sets["deanon"], enroll_clear=True)
-
-        self.run_evaluation()
-        self.run_metrics()
-        self.save_metrics()
-
-    def get_deanonymized_set(self, parent):
+    def get_deanonymization_params(self, parent):
+        """Return the meta a de-anonymized dataset of parent is looked up by."""
         config = self.config["deanonymization"]
-        params = {
-            "original": parent.name,
+        return self.get_source(parent) | {
             "deanonymization": config["name"],
             "params": {key: val for key, val in config["params"].items() if key != "opt"},
         }
+
+    def find_deanonymized_set(self, parent):
+        return DatasetManager.get_matching(self.get_deanonymization_params(parent))
+
+    def get_deanonymized_set(self, parent):
+        config = self.config["deanonymization"]
+        params = self.get_deanonymization_params(parent)
         new_set = DatasetManager.get_matching(params)
+        Tracer.annotate(cache="miss" if new_set is None else "hit")
         if new_set is None:
-            new_set = parent.copy()
+            new_set = DatasetManager.get_matching(params, complete=False)
+            if new_set is not None:
+                self.log.info("Resuming interrupted deanonymization of dataset " + new_set.name)
+            else:
+                new_set = self.copy_set(parent)
             try:
                 deanonymization = ModuleLoader.get_deanonymization_by_name(config["name"], self.trait)(config["params"])
                 deanonymization.train(self.sets["attacker"], self.sets["anon_attacker"])
@@ -36,7 +59,8 @@ class DeanonExperiment(AbstractAnonExperiment):
                 deanonymization.cleanup()
                 del deanonymization
             except Exception:
-                if self.config["cleanup"]:
+                # sets with finished points are kept to be resumed by the next run
+                if self.config["cleanup"] and not Journal(new_set.name).has_progress():
                     new_set.delete()
                 raise RuntimeError("Failed to run de-anonymization!")
         else:
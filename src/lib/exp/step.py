@@ -0,0 +1,69 @@
+from ..data.index import DatasetIndex
+
+
+class Step:
+    """One stage of an experiment, see AbstractExperiment.plan.
+
+    Calls the experiment method with the sets named in inputs and stores the returned sets under the names in outputs.
+    Sets in uses are read by the method from the experiment instead of being passed.
+    params are the parameters that, together with the stages producing the input and used sets, determine the result,
+    steps with equal parameters and producers create equal datasets and only have to run once (see Scheduler).
+    A step without method stores its input set under the output name.
+    The datasets a step would create are looked up without running it by the method named like its method with find_ instead of get_
+    (see Planner), e.g. find_anonymized_set for get_anonymized_set.
+    info is added to the trace of the step.
+    """
+
+    def __init__(self, kind, method, inputs, outputs, params, uses=None, kwargs=None):
+        self.kind = kind
+        self.method = method
+        self.inputs = inputs
+        self.outputs = outputs
+        self.params = params
+        self.uses = uses if uses is not None else []
+        self.kwargs = kwargs if kwargs is not None else {}
+        self.info = {}
+
+    def get_name(self):
+        """Return the name of the module the step runs, e.g. the anonymization."""
+        for key in ["anonymization", "deanonymization", "selector", "splitter"]:
+            if key in self.params:
+                return self.params[key]
+        for key in ["privacy", "utility"]:
+            if key in self.params:
+                return self.params[key]["name"]
+        return self.method
+
+    def get_finder(self):
+        if self.method is None or not self.method.startswith("get_"):
+            return None
+        return "find_" + self.method[4:]
+
+    @staticmethod
+    def get_keys(steps, dataset):
+        """Return the key of every step (None for aliases and evaluations) and the producer (key, output index) of every set.
+        Steps with equal keys create equal datasets (see Scheduler)."""
+        produced = {"orig": ("dataset:" + dataset, 0)}
+        keys = []
+        for step in steps:
+            if step.method is None:
+                produced[step.outputs[0]] = produced[step.inputs[0]]
+                keys.append(None)
+                continue
+            if not len(step.outputs):
+                keys.append(None)
+                continue
+            deps = [produced[name] for name in step.inputs + step.uses]
+            keys.append(DatasetIndex.key({"kind": step.kind, "method": step.method, "params": step.params, "deps": deps}))
+            for i, name in enumerate(step.outputs):
+                produced[name] = (keys[-1], i)
+        return keys, produced
+
+    @staticmethod
+    def alias(source, target):
+        return Step("alias", None, [source], [target], {})
+
+    def __str__(self):
+        if not len(self.outputs):
+            return self.kind + "(" + ", ".join(self.inputs + self.uses) + ")"
+        return self.kind + "(" + ", ".join(self.inputs) + ") -> " + ", ".join(self.outputs)
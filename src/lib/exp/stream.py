@@ -0,0 +1,81 @@
+from ..data.manager import DatasetManager
+from ..data.memory import MemoryDataset
+from ..module_loader import ModuleLoader
+from .abstractanon import AbstractAnonExperiment
+from .anon import AnonExperiment
+from ..trace import Tracer
+
+import uuid
+
+
+class StreamExperiment(AbstractAnonExperiment):
+    """Anonymization experiment like exp: anon, but anonymized datasets are kept in memory instead of being copied and written.
+
+    An anonymized set wraps its parent (see MemoryDataset): a point is anonymized when its image is first read by the
+    selector or the evaluation, so only points that reach a stage are processed and images are passed on as arrays.
+    Selection and the second split create in-memory subsets, of the clear set as well. The splits of the original dataset
+    are views without files of their own and are shared with exp: anon, as are complete anonymized datasets found on disk.
+    Results equal those of exp: anon for deterministic anonymizations.
+    Only anonymizations that change one point at a time through load_image and save_image can be streamed.
+
+    Options (opt block of the run config):
+        - checkpoint: also save anonymized sets as regular datasets, so that later runs reuse them
+    """
+
+    @staticmethod
+    def plan(config):
+        # the in-memory sets only exist in the process running all stages
+        return None
+
+    def run(self):
+        try:
+            for step in AnonExperiment.plan(self.config):
+                self.run_step(step)
+        finally:
+            for set in self.sets.values():
+                if isinstance(set, MemoryDataset):
+                    set.delete()
+
+    def get_anonymized_set(self, parent):
+        params = self.get_anonymization_params(parent)
+        set = DatasetManager.get_matching(params)
+        if set is not None:
+            self.log.info("Anonymization skipped. Using existing dataset " + set.name)
+            Tracer.annotate(cache="hit")
+            return set
+        # points are only anonymized when a later stage reads them, the span does not measure the anonymization
+        Tracer.annotate(cache="stream")
+
+        new_set = MemoryDataset.wrap(parent)
+        if "content" in params:
+            new_set.meta["content"] = params["content"]
+        anon = ModuleLoader.get_anonymization_by_name(self.config["anonymization"]["name"], self.trait)(
+            self.config["anonymization"]["params"], new_set
+        )
+        if not anon.streamable():
+            raise AttributeError(
+                "Anonymization " + self.config["anonymization"]["name"] + " cannot be streamed, run it with exp: anon instead."
+            )
+        anon.add_bg(self.sets["anonbg"], params["background"])
+        anon.save_meta()
+        new_set.map(anon.anonymize)
+        if anon.random:
+            # random anonymizations draw in the order of the points, as on disk
+            new_set.load()
+
+        if self.get_opt("checkpoint", False):
+            checkpoint = new_set.save(str(uuid.uuid4()), mode=self.get_opt("copy_mode", "copy"), threads=self.get_opt("copy_threads"))
+            self.log.info("Saved checkpoint of anonymized dataset as " + checkpoint.name)
+        return new_set
+
+    def find_second_split(self, clear, anon, enroll_clear=False):
+        # splits of in-memory sets are never stored
+        if isinstance(anon, MemoryDataset):
+            return None
+        return super().find_second_split(clear, anon, enroll_clear)
+
+    def get_second_split(self, clear, anon, enroll_clear=False):
+        if isinstance(anon, MemoryDataset) and not isinstance(clear, MemoryDataset):
+            # the clear part becomes an in-memory subset as well, so no dataset on disk refers to the in-memory set
+            clear = MemoryDataset.wrap(clear)
+        return super().get_second_split(clear, anon, enroll_clear)
@@ -1,11 +1,14 @@
 import logging
 
 from ..lib.result import ResultSet
+from ..lib.trace import Tracer
 
 
 class Inference:
     type = None
     metrics = []
+    # whether trained models are cached by the content fingerprint of the training set, set by the content_cache option of the run
+    content_cache = False
 
     def __init__(self, config):
         self.config = config
@@ -22,6 +25,10 @@ class Inference:
     def train(self, set):
         pass
 
+    def is_cached(self, set):
+        """Whether train(set) would reuse a cached model instead of training, None if models are not cached."""
+        return None
+
     def cleanup(self):
         pass
 
@@ -34,8 +41,10 @@ class Classification(Inference):
     metrics = ["accuracy"]
 
     def run(self, set1, set2, save_results):
-        self.enroll(set1)
-        return self.classify(set2, save_results)
+        with Tracer.span("enroll", points=len(set1.datapoints)):
+            self.enroll(set1)
+        with Tracer.span("classify", points=len(set2.datapoints)):
+            return self.classify(set2, save_results)
 
     def classify(self, set, save_results):
         results = ResultSet.new(folder="results/", save=save_results)
@@ -58,7 +67,8 @@ class Comparison(Inference):
     metrics = ["distance"]
 
     def run(self, set1, set2, save_results):
-        return self.compare(set1, set2, save_results)
+        with Tracer.span("compare", points=len(set2.datapoints)):
+            return self.compare(set1, set2, save_results)
 
     def compare(self, orig_set, new_set, save_results):
         results = ResultSet.new(folder="results/", save=save_results)
@@ -0,0 +1,209 @@
+from .scheduler import run_node
+from .trace import Tracer
+
+import os
+import json
+import time
+import uuid
+import yaml
+import fcntl
+import pickle
+import socket
+import sqlite3
+import logging
+import threading
+from contextlib import closing
+
+
+class JobQueue:
+    """Persistent queue of the stages of runs (queue.sqlite), processed by any number of workers on one machine.
+
+    The stages of a Scheduler are enqueued as jobs keyed like its nodes, so a stage already enqueued by another config
+    is only queued once. Workers lease a job whose dependencies are done and renew the lease by heartbeats while it runs.
+    Jobs of workers that crashed are retried when their lease expires, up to max_attempts times.
+    Jobs raising an exception fail right away, they would fail again. Jobs depending on a failed job fail as well. Datasets are locked while they are created (see DatasetManager.lock),
+    so workers sharing data/ never create the same dataset at once.
+    """
+
+    lease = 120.0
+    max_attempts = 3
+
+    def __init__(self, path="queue.sqlite"):
+        self.log = logging.getLogger("seba.jobs")
+        self.path = path
+
+    def connect(self):
+        con = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS jobs (key TEXT PRIMARY KEY, position INTEGER, node BLOB, deps TEXT, "
+            "state TEXT, worker TEXT, lease REAL, attempts INTEGER, outputs TEXT, result TEXT, events TEXT, error TEXT)"
+        )
+        con.execute("CREATE TABLE IF NOT EXISTS runs (id TEXT PRIMARY KEY, keys TEXT)")
+        return con
+
+    def enqueue(self, scheduler):
+        """Add the nodes of a Scheduler as jobs. Jobs that are pending or running are kept,
+        finished and failed jobs are queued again (finished ones only look up their datasets then)."""
+        added = 0
+        with closing(self.connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            position = con.execute("SELECT COALESCE(MAX(position), 0) FROM jobs").fetchone()[0]
+            for node in scheduler.get_order():
+                position += 1
+                row = con.execute("SELECT state FROM jobs WHERE key = ?", (node.key,)).fetchone()
+                if row is not None and row[0] in ["pending", "running"]:
+                    continue
+                con.execute(
+                    "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, 'pending', NULL, 0, 0, NULL, NULL, NULL, NULL)",
+                    (node.key, position, pickle.dumps((node.run.config, node.run.save_result, node.sets, node.steps)), json.dumps(node.deps)),
+                )
+                added += 1
+            for run, keys in scheduler.runs:
+                con.execute("INSERT INTO runs VALUES (?, ?)", (str(uuid.uuid4()), json.dumps(keys)))
+            con.execute("COMMIT")
+        self.log.info("Enqueued {} jobs ({} already queued).".format(added, len(scheduler.nodes) - added))
+        return added
+
+    def take(self, worker):
+        """Lease the next job whose dependencies are done. Returns (key, args of run_node), None if no job is ready."""
+        with closing(self.connect()) as con:
+            con.execute("BEGIN IMMEDIATE")
+            now = time.time()
+            # retry jobs of crashed workers
+            for key, attempts in con.execute("SELECT key, attempts FROM jobs WHERE state = 'running' AND lease < ?", (now,)).fetchall():
+                self.log.warning("Lease of job " + key + " expired.")
+                state = "pending" if attempts < JobQueue.max_attempts else "failed"
+                con.execute("UPDATE jobs SET state = ?, worker = NULL, error = 'lease expired' WHERE key = ?", (state, key))
+
+            states = dict(con.execute("SELECT key, state FROM jobs"))
+            job = None
+            for key, deps in con.execute("SELECT key, deps FROM jobs WHERE state = 'pending' ORDER BY position").fetchall():
+                deps = json.loads(deps)
+                if any(states.get(dep) == "failed" for dep in deps):
+                    con.execute("UPDATE jobs SET state = 'failed', error = 'a job it depends on failed' WHERE key = ?", (key,))
+                    states[key] = "failed"
+                    continue
+                if job is None and all(states.get(dep, "done") == "done" for dep in deps):
+                    job = key
+            if job is None:
+                con.execute("COMMIT")
+                return None
+            con.execute(
+                "UPDATE jobs SET state = 'running', worker = ?, lease = ?, attempts = attempts + 1 WHERE key = ?",
+                (worker, now + JobQueue.lease, job),
+            )
+            config, save_result, node_sets, steps = pickle.loads(con.execute("SELECT node FROM jobs WHERE key = ?", (job,)).fetchone()[0])
+            sets = {}
+            for name, (key, i) in node_sets.items():
+                row = con.execute("SELECT outputs FROM jobs WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    sets[name] = json.loads(row[0])[i]
+            con.execute("COMMIT")
+        return job, (config, save_result, sets, steps)
+
+    def heartbeat(self, key, worker):
+        """Renew the lease of a running job. Returns False if the job was taken from the worker."""
+        with closing(self.connect()) as con:
+            cursor = con.execute(
+                "UPDATE jobs SET lease = ? WHERE key = ? AND worker = ? AND state = 'running'", (time.time() + JobQueue.lease, key, worker)
+            )
+            return cursor.rowcount > 0
+
+    def finish(self, key, worker, outputs=None, error=None):
+        with closing(self.connect()) as con:
+            if error is not None:
+                con.execute("UPDATE jobs SET state = 'failed', worker = NULL, error = ? WHERE key = ? AND worker = ?", (str(error), key, worker))
+                return
+            con.execute(
+                "UPDATE jobs SET state = 'done', worker = NULL, outputs = ?, result = ?, events = ?, error = NULL WHERE key = ? AND worker = ?",
+                (json.dumps(outputs["outputs"]), outputs["result"], json.dumps(outputs["events"]), key, worker),
+            )
+
+    def is_idle(self):
+        """Whether no job is pending or running."""
+        with closing(self.connect()) as con:
+            return con.execute("SELECT COUNT(*) FROM jobs WHERE state IN ('pending', 'running')").fetchone()[0] == 0
+
+    def get_run_events(self, key):
+        """Return the events of all jobs of the runs a job belongs to."""
+        with closing(self.connect()) as con:
+            events = []
+            for (keys,) in con.execute("SELECT keys FROM runs").fetchall():
+                keys = json.loads(keys)
+                if key not in keys:
+                    continue
+                for k in keys:
+                    row = con.execute("SELECT events FROM jobs WHERE key = ?", (k,)).fetchone()
+                    if row is not None and row[0] is not None:
+                        events += json.loads(row[0])
+            return events
+
+    def get_status(self):
+        with closing(self.connect()) as con:
+            return dict(con.execute("SELECT state, COUNT(*) FROM jobs GROUP BY state"))
+
+
+class Worker:
+    """Process jobs of a JobQueue until no job is pending or running.
+    The trace of the jobs is saved to traces/<time>_<worker>.trace.json, results are summarized in traces.yaml like by the Scheduler."""
+
+    poll = 5.0
+
+    def __init__(self, queue):
+        self.log = logging.getLogger("seba.jobs")
+        self.queue = queue
+        self.id = socket.gethostname() + ":" + str(os.getpid()) + ":" + str(uuid.uuid4())[:8]
+        self.events = []
+        self.path = "traces/" + time.strftime("%Y-%m-%d_%H-%M-%S") + "_" + self.id.split(":")[-1] + ".trace.json"
+
+    def run(self):
+        self.log.info("Worker " + self.id + " started.")
+        jobs = 0
+        while True:
+            job = self.queue.take(self.id)
+            if job is None:
+                if self.queue.is_idle():
+                    break
+                time.sleep(Worker.poll)
+                continue
+            self.run_job(*job)
+            jobs += 1
+        self.log.info("Worker {} finished after {} jobs.".format(self.id, jobs))
+
+    def run_job(self, key, args):
+        self.log.info("Running job " + key)
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(JobQueue.lease / 3):
+                if not self.queue.heartbeat(key, self.id):
+                    self.log.warning("Lost the lease of job " + key)
+
+        thread = threading.Thread(target=heartbeat, daemon=True)
+        thread.start()
+        try:
+            outputs = run_node(*args)
+        except Exception as e:
+            self.log.warning("Job failed.")
+            self.log.exception(e)
+            self.queue.finish(key, self.id, error=e)
+            return
+        finally:
+            stop.set()
+            thread.join()
+        self.queue.finish(key, self.id, outputs)
+        self.save_traces(key, outputs)
+
+    def save_traces(self, key, outputs):
+        if not len(outputs["events"]):
+            return
+        self.events += outputs["events"]
+        Tracer.save(self.events, self.path)
+        Tracer.record_throughput(outputs["events"])
+        if outputs["result"] is not None:
+            row = {outputs["result"]: {"trace": self.path, "stages": Tracer.summarize(self.queue.get_run_events(key))}}
+            with open("traces.yaml", "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                f.write(yaml.dump(json.loads(json.dumps(row))))
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,207 @@
+from .module_loader import ModuleLoader
+from .inference import Inference
+from .trace import Tracer
+from .data.set import Dataset
+from ..deanonymization.abstract import AbstractDeanonymization
+
+import logging
+
+
+class Planner:
+    """Resolve the stages of a Scheduler against the dataset and model caches without running anything (main.py --plan).
+
+    Every stage is looked up like the experiment would (see Step.get_finder): a hit reuses existing datasets, a miss creates them.
+    Stages after a miss always miss, their datasets cannot exist yet.
+    Lookups needing a fingerprint that is not cached cannot be told (see Dataset.read_only),
+    they and the stages after them show "?". The number of points of datasets that do not exist yet
+    is estimated from the rates of the splits and the number of selected identities.
+    Runtimes are estimated from the throughput recorded by earlier runs for every stage and module (see Tracer.record_throughput).
+    Datasets are loaded read-only (see Dataset.read_only), planning writes nothing to data/.
+    Training sets without an up to date cached fingerprint are not hashed, their models show as unknown.
+    """
+
+    columns = ["#", "stage", "module", "cache", "model", "points", "est. time"]
+
+    def __init__(self, scheduler):
+        self.log = logging.getLogger("seba.planner")
+        self.scheduler = scheduler
+        self.throughput = Tracer.load_throughput()
+        # (node key, output index) -> existing dataset or None
+        self.sets = {}
+        # (node key, output index) -> (points, identities)
+        self.sizes = {}
+        # (node key, output index) of datasets that may or may not exist
+        self.unknown = set()
+        self.exps = {}
+
+    @staticmethod
+    def format_time(seconds):
+        if seconds is None:
+            return "?"
+        seconds = int(round(seconds))
+        return "{}:{:02d}:{:02d}".format(seconds // 3600, seconds // 60 % 60, seconds % 60)
+
+    def get_time(self, key, points):
+        """Return the estimated runtime for processing points with the recorded throughput of key, None if nothing was recorded."""
+        if key not in self.throughput or not self.throughput[key]["points"]:
+            return None
+        return points * self.throughput[key]["wall"] / self.throughput[key]["points"]
+
+    def get_exp(self, run):
+        if id(run) not in self.exps:
+            self.exps[id(run)] = ModuleLoader.get_exp_by_name(run.config["exp"])(run.config, run.save_result)
+        exp = self.exps[id(run)]
+        exp.sets = {"orig": exp.sets["orig"]}
+        return exp
+
+    @staticmethod
+    def get_size(set):
+        return (len(set.datapoints), len(set.identities))
+
+    def estimate(self, step, sizes):
+        """Return the estimated (points, identities) of the outputs of a step that has not run yet."""
+        points, ids = sizes[0]
+        if step.kind == "restrict":
+            return [sizes[1]]
+        if step.params.get("splitter") == "interid1to3":
+            rates = step.params["rates"] + [max(1.0 - sum(step.params["rates"]), 0.0)]
+            return [(points * rate, ids * rate) for rate in rates]
+        if step.params.get("splitter") == "intraid2to2":
+            # splits the points of every identity of the (anonymized) second set
+            points, ids = sizes[1]
+            if step.params["rate"] == 1.0:
+                # both sets are kept whole for comparisons
+                return [(points, ids), (points, ids)]
+            return [(points * step.params["rate"], ids), (points * (1.0 - step.params["rate"]), ids)]
+        if "selector" in step.params and "ids" in step.params["params"] and ids > 0:
+            selected = min(ids, int(step.params["params"]["ids"]))
+            per_id = points / ids
+            if "max_imgs_per_id" in step.params["params"]:
+                per_id = min(per_id, int(step.params["params"]["max_imgs_per_id"]))
+            return [(selected * per_id, selected)]
+        return [sizes[0]] * len(step.outputs)
+
+    def get_model_cache(self, exp, step):
+        """Return whether the step would reuse a trained model (True/False), None if it trains none or it cannot be told."""
+        try:
+            if step.kind == "deanonymize":
+                config = exp.config["deanonymization"]
+                module = ModuleLoader.get_deanonymization_by_name(config["name"], exp.trait)(config["params"])
+                if type(module).is_cached is AbstractDeanonymization.is_cached:
+                    return None
+                if "attacker" not in exp.sets or "anon_attacker" not in exp.sets:
+                    return False
+                return module.is_cached(exp.sets["attacker"], exp.sets["anon_attacker"])
+            if step.kind == "evaluate":
+                if "privacy" in exp.config:
+                    module = ModuleLoader.get_classification_by_name(exp.config["privacy"]["name"], exp.trait)(exp.config["privacy"]["params"])
+                else:
+                    module = ModuleLoader.get_utility_by_name(exp.config["utility"]["name"], exp.trait)(exp.config["utility"]["params"])
+                if type(module).is_cached is Inference.is_cached:
+                    return None
+                module.content_cache = exp.get_opt("content_cache", False)
+                if "train" not in exp.sets:
+                    return False
+                return module.is_cached(exp.sets["train"])
+        except Exception as e:
+            self.log.debug("Could not check model cache of " + str(step) + ": " + str(e))
+        return None
+
+    def plan_node(self, node):
+        """Return the rows of the stages of a node, resolving its outputs."""
+        if node.steps is None:
+            return [[str(node), node.run.config["exp"], "?", "?", "?", None]]
+
+        exp = self.get_exp(node.run)
+        sizes = {"orig": Planner.get_size(exp.sets["orig"])}
+        unknown = set()
+        for name, (key, i) in node.sets.items():
+            if key in self.scheduler.nodes:
+                sizes[name] = self.sizes[(key, i)]
+                if self.sets[(key, i)] is not None:
+                    exp.sets[name] = self.sets[(key, i)]
+                if (key, i) in self.unknown:
+                    unknown.add(name)
+
+        rows = []
+        for step in node.steps:
+            name = step.get_name()
+            if not len(step.outputs):
+                if step.kind != "evaluate":
+                    continue
+                model = self.get_model_cache(exp, step)
+                if model is not None and "train" in unknown:
+                    model = "?"
+                points = sizes["enroll"][0] + sizes["test"][0]
+                time = self.get_time("evaluate:" + name, points)
+                if model is not True:
+                    train = self.get_time("train:" + name, sizes["train"][0])
+                    time = None if time is None or train is None else time + train
+                rows.append([str(step), name, "-", model, points, time])
+                continue
+
+            result = None
+            cache = "?" if any(n in unknown for n in step.inputs + step.uses) else "miss"
+            if cache == "miss" and all(n in exp.sets for n in step.inputs + step.uses) and step.get_finder() is not None:
+                try:
+                    result = getattr(exp, step.get_finder())(*[exp.sets[n] for n in step.inputs], **step.kwargs)
+                except RuntimeError as e:
+                    # a fingerprint of the lookup is not cached
+                    self.log.debug("Could not look up " + str(step) + ": " + str(e))
+                    cache = "?"
+                if result is not None and len(step.outputs) == 1:
+                    result = [result]
+
+            model = None
+            if result is None:
+                outputs = [None] * len(step.outputs)
+                estimates = self.estimate(step, [sizes[n] for n in step.inputs])
+                model = self.get_model_cache(exp, step)
+                if model is not None and cache == "?":
+                    model = "?"
+                # like the recorded throughput, counted by the points of the created datasets
+                points = sum(estimate[0] for estimate in estimates)
+                time = self.get_time(step.kind + ":" + name, points)
+            else:
+                outputs = list(result)
+                estimates = [Planner.get_size(set) for set in outputs]
+                points = 0
+                time = 0.0
+            for i, out in enumerate(step.outputs):
+                self.sets[(node.key, i)] = outputs[i]
+                self.sizes[(node.key, i)] = estimates[i]
+                sizes[out] = estimates[i]
+                if outputs[i] is not None:
+                    exp.sets[out] = outputs[i]
+                if cache == "?":
+                    self.unknown.add((node.key, i))
+                    unknown.add(out)
+            rows.append([str(step), name, cache if result is None else "hit", model, points, time])
+        return rows
+
+    def get_table(self):
+        """Return the lines of a table of all stages in execution order, followed by the estimated total runtime."""
+        rows = []
+        with Dataset.read_only():
+            for i, node in enumerate(self.scheduler.get_order()):
+                for row in self.plan_node(node):
+                    model = {True: "hit", False: "miss", None: "-"}.get(row[3], row[3])
+                    points = row[4] if isinstance(row[4], str) else str(int(round(row[4])))
+                    rows.append([str(i)] + row[:3] + [model, points, row[5]])
+
+        total = sum(row[6] for row in rows if row[6] is not None)
+        unknown = len([row for row in rows if row[6] is None])
+        rows = [row[:6] + [Planner.format_time(row[6])] for row in rows]
+
+        widths = [max(len(str(x)) for x in column) for column in zip(Planner.columns, *rows)]
+        lines = []
+        for row in [Planner.columns] + rows:
+            lines.append("  ".join(str(x).ljust(w) for x, w in zip(row, widths)))
+        lines.insert(1, "  ".join("-" * w for w in widths))
+        lines.append("")
+        lines.append(
+            "Estimated runtime: {}{}".format(
+                Planner.format_time(total), " (without {} stages lacking recorded throughput)".format(unknown) if unknown else ""
+            )
+        )
+        return lines
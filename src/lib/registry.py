@@ -0,0 +1,307 @@
+import ast
+import os
+import os.path
+import re
+import sys
+import yaml
+import logging
+
+
+class PluginRegistry:
+    """Descriptors of all plugins (anonymizations, recognitions, selectors, ...), read from their source without importing them.
+
+    Plugins are found by the naming convention of ModuleLoader: src/<package>/[<trait>/]<name>.py defining <Name><Suffix>.
+    A descriptor holds the kind, trait, name and class of a plugin, the required pips and parameters from its docstring
+    and the packages it imports, including those imported by the modules of this repository it imports.
+    Listing plugins and validating configs only parses the source files, the heavy dependencies of a plugin
+    (torch, tensorflow, deepface, ...) are imported by ModuleLoader when the plugin is used.
+    """
+
+    # kind -> (package, class suffix, whether plugins are grouped by trait)
+    kinds = {
+        "exp": ("src/lib/exp", "Experiment", False),
+        "anonymization": ("src/anonymization", "Anonymization", True),
+        "deanonymization": ("src/deanonymization", "Deanonymization", True),
+        "privacy": ("src/privacy", "Classification", True),
+        "utility": ("src/utility", "Utility", True),
+        "selector": ("src/selector", "Selector", False),
+        "splitter": ("src/splitter", "Splitter", False),
+        "metric": ("src/metric", "Metric", False),
+    }
+    # keys of a run config naming a plugin -> kind
+    config_keys = {
+        "anonymization": "anonymization",
+        "deanonymization": "deanonymization",
+        "privacy": "privacy",
+        "utility": "utility",
+        "selector": "selector",
+    }
+    types = {
+        "int": int,
+        "float": (int, float),
+        "bool": bool,
+        "string": str,
+        "str": str,
+        "list": list,
+        "dict": dict,
+    }
+    plugins = None
+    imports = {}
+
+    @staticmethod
+    def get_root():
+        return os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    @staticmethod
+    def load():
+        """Return the descriptors of all plugins."""
+        if PluginRegistry.plugins is None:
+            plugins = []
+            root = PluginRegistry.get_root()
+            for kind, (package, suffix, traits) in PluginRegistry.kinds.items():
+                folder = os.path.join(root, package)
+                groups = [(None, folder)]
+                if traits:
+                    groups = [(trait, os.path.join(folder, trait)) for trait in sorted(os.listdir(folder))]
+                for trait, path in groups:
+                    if not os.path.isdir(path) or trait == "__pycache__":
+                        continue
+                    for file in sorted(os.listdir(path)):
+                        if file[-3:] != ".py" or file in ["__init__.py", "abstract.py"]:
+                            continue
+                        plugin = PluginRegistry.describe(os.path.join(path, file), kind, trait, file[:-3], suffix)
+                        if plugin is not None:
+                            plugins.append(plugin)
+            PluginRegistry.plugins = plugins
+        return PluginRegistry.plugins
+
+    @staticmethod
+    def describe(path, kind, trait, name, suffix):
+        """Return the descriptor of the plugin defined in a source file, None if it defines none."""
+        with open(path, "r") as file:
+            tree = ast.parse(file.read(), filename=path)
+        class_name = name.capitalize() + suffix
+        node = next((node for node in tree.body if isinstance(node, ast.ClassDef) and node.name == class_name), None)
+        if node is None:
+            return None
+        doc = ast.get_docstring(node) or ""
+        return {
+            "kind": kind,
+            "trait": trait,
+            "name": name,
+            "class": class_name,
+            "path": os.path.relpath(path, PluginRegistry.get_root()),
+            "bases": [ast.unparse(base) for base in node.bases],
+            "summary": doc.split("\n")[0],
+            "pips": PluginRegistry.parse_pips(doc),
+            "params": PluginRegistry.parse_params(doc),
+            "imports": sorted(PluginRegistry.get_imports(path)),
+        }
+
+    @staticmethod
+    def get_section(doc, title):
+        """Return the lines of a section of a docstring, e.g. Parameters:, None if it has none."""
+        lines = doc.split("\n")
+        for i, line in enumerate(lines):
+            if line.strip().lower() == title.lower() + ":":
+                section = []
+                for line in lines[i + 1 :]:
+                    if not line.strip() or re.match(r"^\s*[A-Za-z ]+:\s*$", line):
+                        if len(section) or re.match(r"^\s*[A-Za-z ]+:\s*$", line):
+                            break
+                        continue
+                    section.append(line.strip())
+                return section
+        return None
+
+    @staticmethod
+    def parse_pips(doc):
+        section = PluginRegistry.get_section(doc, "Required pips")
+        if section is None:
+            return None
+        pips = []
+        for line in section:
+            pips += [pip.strip() for pip in line.lstrip("- ").split(",") if pip.strip()]
+        return [pip for pip in pips if pip.lower() != "none"]
+
+    @staticmethod
+    def parse_params(doc):
+        """Return the documented parameters as {name: {"type", "doc", "optional"}}, None if they are not documented.
+        Parameters are documented as - (type) name: description or - name (type): description."""
+        section = PluginRegistry.get_section(doc, "Parameters")
+        if section is None:
+            return None
+        params = {}
+        for line in section:
+            match = re.match(r"^-\s*[({]([^)]*)\)\s*([A-Za-z_][A-Za-z0-9_]*)\s*:\s*(.*)$", line)
+            if match is not None:
+                type, name, text = match.groups()
+            else:
+                match = re.match(r"^-\s*([A-Za-z_][A-Za-z0-9_]*)\s*\(([^)]*)\)\s*:\s*(.*)$", line)
+                if match is None:
+                    continue
+                name, type, text = match.groups()
+            params[name] = {"type": type.strip(), "doc": text, "optional": "optional" in text.lower() or "default" in text.lower()}
+        # parameters documented as none may still be inherited, e.g. from TorchDeanonymization
+        return params if len(params) else None
+
+    @staticmethod
+    def get_imports(path):
+        """Return the top-level packages imported by a module and the modules of this repository it imports (not the standard library)."""
+        path = os.path.abspath(path)
+        if path in PluginRegistry.imports:
+            return PluginRegistry.imports[path]
+        PluginRegistry.imports[path] = set()
+        with open(path, "r") as file:
+            tree = ast.parse(file.read(), filename=path)
+        # imports inside functions are only run when the plugin is used
+        nodes = list(tree.body)
+        for node in tree.body:
+            if isinstance(node, (ast.Try, ast.If)):
+                nodes += node.body + [n for handler in getattr(node, "handlers", []) for n in handler.body] + node.orelse
+        packages = set()
+        for node in nodes:
+            if isinstance(node, ast.Import):
+                packages.update(alias.name.split(".")[0] for alias in node.names)
+            elif isinstance(node, ast.ImportFrom):
+                if node.level == 0:
+                    if node.module.split(".")[0] == "src":
+                        source = PluginRegistry.find_module(PluginRegistry.get_root(), node.module.split("."), node.names)
+                    else:
+                        packages.add(node.module.split(".")[0])
+                        continue
+                else:
+                    base = path
+                    for _ in range(node.level):
+                        base = os.path.dirname(base)
+                    source = PluginRegistry.find_module(base, node.module.split(".") if node.module else [], node.names)
+                for module in source:
+                    packages.update(PluginRegistry.get_imports(module))
+        packages = set(package for package in packages if package not in sys.stdlib_module_names and package != "src")
+        PluginRegistry.imports[path] = packages
+        return packages
+
+    @staticmethod
+    def find_module(base, parts, names):
+        """Return the source files of the repository imported by from <parts> import <names> relative to base."""
+        path = os.path.join(base, *parts)
+        if os.path.isfile(path + ".py"):
+            return [path + ".py"]
+        files = []
+        if os.path.isfile(os.path.join(path, "__init__.py")):
+            files.append(os.path.join(path, "__init__.py"))
+        for alias in names:
+            if os.path.isfile(os.path.join(path, alias.name + ".py")):
+                files.append(os.path.join(path, alias.name + ".py"))
+        return files
+
+    @staticmethod
+    def get(kind, name, trait=None):
+        """Return the descriptor of a plugin, None if there is none."""
+        for plugin in PluginRegistry.load():
+            if plugin["kind"] == kind and plugin["name"] == name and (plugin["trait"] is None or plugin["trait"] == trait):
+                return plugin
+        return None
+
+    @staticmethod
+    def list(kind=None, trait=None):
+        return [
+            plugin
+            for plugin in PluginRegistry.load()
+            if (kind is None or plugin["kind"] == kind) and (trait is None or plugin["trait"] is None or plugin["trait"] == trait)
+        ]
+
+    @staticmethod
+    def get_table(kind=None, trait=None):
+        """Return the lines of a table of all plugins."""
+        rows = [["kind", "trait", "name", "imports", "description"]]
+        for plugin in PluginRegistry.list(kind, trait):
+            rows.append([plugin["kind"], plugin["trait"] or "-", plugin["name"], ", ".join(plugin["imports"]) or "-", plugin["summary"]])
+        widths = [max(len(row[i]) for row in rows) for i in range(4)]
+        lines = ["  ".join(x.ljust(w) for x, w in zip(row[:4], widths)) + "  " + row[4] for row in rows]
+        lines.insert(1, "  ".join("-" * w for w in widths + [len(rows[0][4])]))
+        return lines
+
+    @staticmethod
+    def check_params(plugin, params):
+        """Return the errors and warnings about the parameters of a plugin."""
+        errors = []
+        warnings = []
+        prefix = plugin["kind"] + " " + plugin["name"]
+        if not isinstance(params, dict):
+            return [prefix + ": params must be a mapping"], []
+        if plugin["params"] is None:
+            return errors, warnings
+        for key, value in params.items():
+            if key == "opt":
+                continue
+            if key not in plugin["params"]:
+                warnings.append(prefix + ": parameter " + key + " is not documented")
+                continue
+            type = PluginRegistry.types.get(plugin["params"][key]["type"].split("[")[0].strip().lower())
+            # values containing $ROUND are replaced per round
+            if type is None or (isinstance(value, str) and "$" in value):
+                continue
+            if type is int or type == (int, float):
+                try:
+                    (int if type is int else float)(value)
+                except (TypeError, ValueError):
+                    errors.append(prefix + ": parameter " + key + " must be " + plugin["params"][key]["type"] + ", got " + repr(value))
+                if isinstance(value, bool):
+                    errors.append(prefix + ": parameter " + key + " must be " + plugin["params"][key]["type"] + ", got " + repr(value))
+            elif not isinstance(value, type):
+                errors.append(prefix + ": parameter " + key + " must be " + plugin["params"][key]["type"] + ", got " + repr(value))
+        return errors, warnings
+
+    @staticmethod
+    def validate(config):
+        """Return the errors and warnings of a run config (the config block of a config file entry)."""
+        errors = []
+        warnings = []
+        if not isinstance(config, dict):
+            return ["config must be a mapping"], []
+        for key in ["exp", "dataset"]:
+            if key not in config:
+                errors.append("missing " + key)
+        if len(errors):
+            return errors, warnings
+
+        exp = PluginRegistry.get("exp", config["exp"])
+        if exp is None:
+            errors.append("unknown exp " + str(config["exp"]))
+        elif "AbstractAnonExperiment" in exp["bases"]:
+            for key in ["seed", "rates", "anonymization", "selector"]:
+                if key not in config:
+                    errors.append("exp " + config["exp"] + ": missing " + key)
+            if "privacy" not in config and "utility" not in config:
+                errors.append("exp " + config["exp"] + ": missing privacy or utility")
+            if config["exp"] == "deanon" and "deanonymization" not in config:
+                errors.append("exp deanon: missing deanonymization")
+            for key in ["anonbg", "attacker", "enroll"]:
+                if key not in config.get("rates", {}):
+                    errors.append("exp " + config["exp"] + ": missing rates." + key)
+
+        trait = None
+        meta = os.path.join(os.getcwd(), "data", str(config["dataset"]) + ".meta.yaml")
+        if os.path.exists(meta):
+            with open(meta, "r") as file:
+                trait = yaml.load(file, Loader=yaml.SafeLoader).get("trait")
+        else:
+            warnings.append("dataset " + str(config["dataset"]) + " does not exist, plugins are checked for all traits")
+
+        for key, kind in PluginRegistry.config_keys.items():
+            if key not in config:
+                continue
+            if not isinstance(config[key], dict) or "name" not in config[key]:
+                errors.append(key + ": missing name")
+                continue
+            candidates = [plugin for plugin in PluginRegistry.list(kind, trait) if plugin["name"] == config[key]["name"]]
+            if not len(candidates):
+                errors.append("unknown " + kind + " " + str(config[key]["name"]) + (" for trait " + trait if trait else ""))
+                continue
+            e, w = PluginRegistry.check_params(candidates[0], config[key].get("params", {}))
+            errors += e
+            warnings += w
+
+        logging.getLogger("seba.registry").debug("Validated config with {} errors and {} warnings".format(len(errors), len(warnings)))
+        return errors, warnings
@@ -0,0 +1,99 @@
+import os
+import sys
+import logging
+
+
+class ResourceManager:
+    """CPU budget of the current process, shared by its process pools, the thread pools of cv2, torch and BLAS, and external commands.
+
+    The budget of a run is set by its opt.cpu_budget (number of cores, default: all cores). Processes running stages
+    in parallel (Scheduler -j, job queue workers) share the cores of the machine, each gets its part of the default budget.
+    Process pools are sized by get_workers and every worker limits its libraries to its share of the budget (init_worker),
+    so that nested pools never run more threads than the budget allows.
+    """
+
+    budget = None
+    # number of processes sharing the default budget
+    share = 1
+    env = ["OMP_NUM_THREADS", "OPENBLAS_NUM_THREADS", "MKL_NUM_THREADS", "NUMEXPR_NUM_THREADS", "VECLIB_MAXIMUM_THREADS"]
+    # libraries limited to the budget so far
+    limited = set()
+
+    @staticmethod
+    def get_cpus():
+        if hasattr(os, "sched_getaffinity"):
+            return len(os.sched_getaffinity(0))
+        return os.cpu_count() or 1
+
+    @staticmethod
+    def configure(budget=None):
+        """Set the budget of the current process and limit the thread pools of its libraries to it."""
+        if budget is None:
+            budget = ResourceManager.get_cpus() // ResourceManager.share
+        ResourceManager.budget = max(int(budget), 1)
+        ResourceManager.limit(ResourceManager.budget)
+        logging.getLogger("seba.resources").debug("CPU budget: {} cores".format(ResourceManager.budget))
+
+    @staticmethod
+    def get_budget():
+        if ResourceManager.budget is None:
+            ResourceManager.configure()
+        return ResourceManager.budget
+
+    @staticmethod
+    def get_workers(requested=None):
+        """Return the number of processes of a pool: the requested number, at most the budget."""
+        if requested is None:
+            return ResourceManager.get_budget()
+        return max(min(int(requested), ResourceManager.get_budget()), 1)
+
+    @staticmethod
+    def get_threads(workers):
+        """Return the threads every worker of a pool of the given size may use."""
+        return max(ResourceManager.get_budget() // max(workers, 1), 1)
+
+    @staticmethod
+    def init_worker(threads):
+        """Initializer of pool workers: limit the worker to its share of the budget."""
+        ResourceManager.budget = threads
+        ResourceManager.share = 1
+        ResourceManager.limit(threads)
+
+    @staticmethod
+    def limit(threads):
+        """Limit the thread pools of cv2, torch and BLAS in this process, and of processes it starts, to threads."""
+        for name in ResourceManager.env:
+            os.environ[name] = str(threads)
+        ResourceManager.limited = set()
+        ResourceManager.update()
+
+    @staticmethod
+    def update():
+        """Limit libraries loaded since the budget was set, they ignore the environment once loaded (see ModuleLoader)."""
+        if ResourceManager.budget is None:
+            return
+        threads = ResourceManager.budget
+        if "cv2" in sys.modules and "cv2" not in ResourceManager.limited:
+            sys.modules["cv2"].setNumThreads(threads)
+            ResourceManager.limited.add("cv2")
+        if "torch" in sys.modules and "torch" not in ResourceManager.limited:
+            sys.modules["torch"].set_num_threads(threads)
+            ResourceManager.limited.add("torch")
+        if "numpy" in sys.modules and "numpy" not in ResourceManager.limited:
+            try:
+                from threadpoolctl import threadpool_limits
+
+                threadpool_limits(limits=threads)
+            except ImportError:
+                pass
+            ResourceManager.limited.add("numpy")
+
+    @staticmethod
+    def get_env(threads=None):
+        """Return the environment for an external command using threads (default: the budget)."""
+        if threads is None:
+            threads = ResourceManager.get_budget()
+        env = dict(os.environ)
+        for name in ResourceManager.env:
+            env[name] = str(threads)
+        return env
@@ -0,0 +1,25 @@
+import hashlib
+import numpy as np
+
+
+class RandomStreams:
+    """Independent random generators derived from a seed and names, e.g. one per (seed, anonymization, point).
+
+    Every name is hashed into the entropy of a numpy SeedSequence, so the generator of a point only depends on the seed
+    and its names, not on the order points are processed in or the process they are processed by (see PointExecutor).
+    Seeds and names may be of any type, they are compared by their string value ($ROUND seeds are strings, for example).
+    """
+
+    @staticmethod
+    def get_entropy(value):
+        # hash() of strings differs between processes
+        return int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=16).digest(), "little")
+
+    @staticmethod
+    def get_sequence(seed, *names):
+        return np.random.SeedSequence([RandomStreams.get_entropy(seed)] + [RandomStreams.get_entropy(name) for name in names])
+
+    @staticmethod
+    def get_generator(seed, *names):
+        """Return the generator of the stream of seed and names."""
+        return np.random.default_rng(RandomStreams.get_sequence(seed, *names))
@@ -1,12 +1,23 @@
 from .utils import recursive_replace
 from .module_loader import ModuleLoader
+from .exp.step import Step
 
+import copy
 import logging
 import os
 
 
 class Run:
-    def __init__(self, config, round=0, save_result=False):
+    """One round of a run config. $ROUND in the config is replaced by the number of the round.
+
+    Runs repeated for several rounds know which of their stages are round-invariant, i.e. create the same datasets
+    in every round (see plan). The Scheduler merges these stages, so they are computed once and reused by all rounds.
+    """
+
+    def __init__(self, config, round=0, save_result=False, rounds=1):
+        self.template = copy.deepcopy(config)
+        self.round = round
+        self.rounds = rounds
         config = recursive_replace(config, "$ROUND", round)
         self.log = logging.getLogger("seba.run")
         self.log.info("=" * 30)
@@ -18,6 +29,31 @@ class Run:
             self.config["cleanup"] = False
         os.makedirs("results", exist_ok=True)
 
+    def plan(self):
+        """Return the steps of the experiment (see AbstractExperiment.plan).
+        If the run is repeated, the steps are compared with those of another round: the experiment may rearrange
+        stages to share them between rounds (see AbstractExperiment.share_rounds), and steps creating the same
+        datasets in both rounds are marked round-invariant in their trace."""
+        exp = ModuleLoader.get_exp_by_name(self.config["exp"])
+        steps = exp.plan(self.config)
+        if steps is None or self.rounds <= 1:
+            return steps
+
+        config = recursive_replace(copy.deepcopy(self.template), "$ROUND", (self.round + 1) % self.rounds)
+        other = exp.share_rounds(config, exp.plan(config), exp.plan(self.config))
+        steps = exp.share_rounds(self.config, steps, exp.plan(config))
+        keys = Step.get_keys(steps, self.config["dataset"])[0]
+        other_keys = set(Step.get_keys(other, config["dataset"])[0])
+        for step, key in zip(steps, keys):
+            if key is None:
+                continue
+            step.info["round_invariant"] = key in other_keys
+            if self.round == 0:
+                self.log.info(
+                    "Stage {} is {}".format(step, "computed once for all rounds" if key in other_keys else "computed in every round")
+                )
+        return steps
+
     def run(self):
         exp = ModuleLoader.get_exp_by_name(self.config["exp"])(self.config, self.save_result)
         exp.run()
@@ -0,0 +1,240 @@
+from .module_loader import ModuleLoader
+from .data.set import Dataset
+from .exp.step import Step
+from .trace import Tracer
+from .resources import ResourceManager
+
+import logging
+import multiprocessing
+import uuid
+import time
+import yaml
+import json
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+
+
+def run_node(config, save_result, sets, steps):
+    """Run the steps of a node in a new experiment.
+    Returns the names of the created datasets, the trace events and the id of the result set, if any."""
+    Tracer.collect()
+    exp = ModuleLoader.get_exp_by_name(config["exp"])(config, save_result)
+    if steps is None:
+        exp.run()
+        outputs = []
+    else:
+        for name, setname in sets.items():
+            exp.sets[name] = Dataset(setname)
+        for step in steps:
+            exp.run_step(step)
+        outputs = [exp.sets[name].name for step in steps for name in step.outputs]
+    result = exp.resultset.id if hasattr(exp, "resultset") else None
+    return {"outputs": outputs, "events": Tracer.collect(), "result": result}
+
+
+class Node:
+    def __init__(self, key, run, steps, deps, sets):
+        self.key = key
+        self.run = run
+        self.steps = steps
+        # keys of the nodes this node depends on
+        self.deps = deps
+        # set name in the run -> (key of the producing node, index of the output)
+        self.sets = sets
+        self.outputs = None
+        self.events = []
+        self.result = None
+        self.runs = 1
+
+    def get_kind(self):
+        if self.steps is None:
+            return "run"
+        return "+".join(step.kind for step in self.steps)
+
+    def __str__(self):
+        if self.steps is None:
+            return "run " + self.run.config["exp"]
+        return ", ".join(str(step) for step in self.steps)
+
+
+class Scheduler:
+    """Run a list of runs as one graph of stages.
+
+    The steps of all runs (see AbstractExperiment.plan) are expanded into nodes keyed by their parameters
+    and the keys of the nodes producing their inputs. Nodes with equal keys create equal datasets and are merged,
+    so stages shared by several runs (e.g. the same anonymization evaluated with several recognitions) run once.
+    Evaluations and metrics are never merged, every run gets its own results.
+    Nodes whose dependencies are done run concurrently on a pool of processes.
+    Nodes run depth-first (see get_order), so datasets are used by all stages depending on them while they are still cached.
+    """
+
+    def __init__(self):
+        self.log = logging.getLogger("seba.scheduler")
+        self.nodes = {}
+        self.nsteps = 0
+        # run -> keys of the nodes it consists of
+        self.runs = []
+
+    def add(self, run):
+        keys = []
+        self.runs.append((run, keys))
+        steps = run.plan()
+        if steps is None:
+            keys.append(str(uuid.uuid4()))
+            self.add_node(keys[-1], run, None, [], {})
+            return
+
+        step_keys, produced = Step.get_keys(steps, run.config["dataset"])
+        evaluation = []
+        for step, key in zip(steps, step_keys):
+            if step.method is None:
+                continue
+            self.nsteps += 1
+            if not len(step.outputs):
+                # evaluations run in one node per run, their results only live in memory
+                evaluation.append(step)
+                continue
+            deps = [produced[name] for name in step.inputs + step.uses]
+            self.add_node(key, run, [step], deps, dict((name, produced[name]) for name in step.inputs + step.uses))
+            keys.append(key)
+
+        if len(evaluation):
+            sets = dict((name, producer) for name, producer in produced.items() if name != "orig")
+            keys.append(str(uuid.uuid4()))
+            self.add_node(keys[-1], run, evaluation, list(sets.values()), sets)
+
+    def add_node(self, key, run, steps, deps, sets):
+        if key in self.nodes:
+            self.nodes[key].runs += 1
+            for step in self.nodes[key].steps:
+                step.info["runs"] = self.nodes[key].runs
+            return
+        deps = list(dict.fromkeys(k for k, i in deps if k in self.nodes))
+        self.nodes[key] = Node(key, run, steps, deps, sets)
+
+    def get_order(self):
+        """Return the nodes in the order they are started: every node is followed by the nodes depending on it,
+        as soon as all their dependencies are started, before any other node."""
+        children = dict((key, []) for key in self.nodes)
+        for node in self.nodes.values():
+            for dep in node.deps:
+                children[dep].append(node.key)
+        order = []
+        started = set()
+
+        def visit(key):
+            started.add(key)
+            order.append(self.nodes[key])
+            for child in children[key]:
+                if child not in started and all(dep in started for dep in self.nodes[child].deps):
+                    visit(child)
+
+        for key, node in self.nodes.items():
+            if key not in started and all(dep in started for dep in node.deps):
+                visit(key)
+        return order
+
+    def get_plan(self):
+        """Return a description of all nodes in execution order."""
+        lines = []
+        order = self.get_order()
+        index = dict((node.key, i) for i, node in enumerate(order))
+        for i, node in enumerate(order):
+            deps = [str(index[k]) for k in node.deps]
+            lines.append(
+                "[{}] {}{}{}".format(
+                    i,
+                    node,
+                    " after " + ",".join(deps) if len(deps) else "",
+                    " shared by {} runs".format(node.runs) if node.runs > 1 else "",
+                )
+            )
+        return lines
+
+    def get_args(self, node):
+        sets = {}
+        for name, (key, i) in node.sets.items():
+            if key in self.nodes:
+                sets[name] = self.nodes[key].outputs[i]
+        return (node.run.config, node.run.save_result, sets, node.steps)
+
+    def run(self, jobs=1):
+        self.log.info("Running {} nodes for {} steps.".format(len(self.nodes), self.nsteps))
+        done = set()
+        failed = set()
+        pending = self.get_order()
+
+        def ready(node):
+            return all(k in done for k in node.deps)
+
+        def skip_failed():
+            for node in list(pending):
+                if any(k in failed for k in node.deps):
+                    self.log.warning("Skipping " + str(node) + ", a stage it depends on failed.")
+                    pending.remove(node)
+                    failed.add(node.key)
+
+        def finish(node, outputs=None, error=None):
+            if error is not None:
+                self.log.warning("Run failed.")
+                self.log.exception(error)
+                failed.add(node.key)
+                skip_failed()
+            else:
+                node.outputs = outputs["outputs"]
+                node.events = outputs["events"]
+                node.result = outputs["result"]
+                done.add(node.key)
+
+        if jobs <= 1:
+            while len(pending):
+                node = pending.pop(0)
+                try:
+                    finish(node, run_node(*self.get_args(node)))
+                except Exception as e:
+                    finish(node, error=e)
+            self.save_traces()
+            return
+
+        # forked workers inherit the logging setup and share the cores of the machine
+        ResourceManager.share = jobs
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("fork")) as executor:
+            running = {}
+            while len(pending) or len(running):
+                for node in [node for node in pending if ready(node)]:
+                    pending.remove(node)
+                    running[executor.submit(run_node, *self.get_args(node))] = node
+                finished, _ = wait(running.keys(), return_when=FIRST_COMPLETED)
+                for future in finished:
+                    node = running.pop(future)
+                    try:
+                        finish(node, future.result())
+                    except Exception as e:
+                        finish(node, error=e)
+        self.save_traces()
+
+    def save_traces(self):
+        """Save the spans of all nodes as Chrome trace (traces/<time>.trace.json)
+        and append a summary of the stages of every run to traces.yaml, keyed like results.yaml by the result id.
+        The throughput of the stages is added to throughput.yaml."""
+        events = [event for node in self.nodes.values() for event in node.events]
+        if not len(events):
+            return
+        path = "traces/" + time.strftime("%Y-%m-%d_%H-%M-%S") + "_" + str(uuid.uuid4())[:8] + ".trace.json"
+        Tracer.save(events, path)
+        self.log.info("Saved trace to " + path)
+        # estimates of main.py --plan, see Planner
+        Tracer.record_throughput(events)
+
+        rows = {}
+        for run, keys in self.runs:
+            nodes = [self.nodes[key] for key in keys]
+            result = next((node.result for node in nodes if node.result is not None), None)
+            if result is None:
+                continue
+            rows[result] = {
+                "trace": path,
+                "stages": Tracer.summarize([event for node in nodes for event in node.events]),
+            }
+        if len(rows):
+            with open("traces.yaml", "a") as f:
+                f.write(yaml.dump(json.loads(json.dumps(rows))))
@@ -0,0 +1,94 @@
+import copy
+import itertools
+
+
+class Sweep:
+    """Parameter sweeps over run configs.
+
+    A sweep is a list of groups, each mapping dotted paths of the run config (e.g. anonymization.params.kernel)
+    to lists of values. A group either combines all values (product, the default) or takes the i-th value
+    of every path together (zip). The groups of a sweep are combined with each other:
+
+        sweep:
+          - product:
+              anonymization.params.kernel: [51, 83, 115]
+              selector.params.ids: [20, 50]
+          - zip:
+              privacy.params.model: [ArcFace, Facenet]
+              privacy.params.distance: [cosine, euclidean]
+
+    Paths whose first key is not in a config are skipped, e.g. privacy parameters of configs evaluating utility.
+    Runs are ordered by the stages they consist of (see order), so that runs sharing stages run one after another.
+    """
+
+    modes = ["product", "zip"]
+
+    @staticmethod
+    def get_assignments(group):
+        """Return the list of {path: value} a group expands to."""
+        if len(group) != 1 or list(group.keys())[0] not in Sweep.modes:
+            raise AttributeError("Sweep: every group needs exactly one of " + ", ".join(Sweep.modes))
+        mode, values = list(group.items())[0]
+        paths = list(values.keys())
+        for path in paths:
+            if not isinstance(values[path], list):
+                raise AttributeError("Sweep: values of " + path + " must be a list")
+        if mode == "zip":
+            if len(set(len(values[path]) for path in paths)) > 1:
+                raise AttributeError("Sweep: zipped values must be of equal length")
+            combinations = zip(*[values[path] for path in paths])
+        else:
+            combinations = itertools.product(*[values[path] for path in paths])
+        return [dict(zip(paths, combination)) for combination in combinations]
+
+    @staticmethod
+    def set(config, path, value):
+        keys = path.split(".")
+        if keys[0] not in config:
+            return
+        for key in keys[:-1]:
+            config = config.setdefault(key, {})
+        config[keys[-1]] = copy.deepcopy(value)
+
+    @staticmethod
+    def expand(config, sweep=None):
+        """Return the run configs of a sweep over config, without duplicates."""
+        if not sweep:
+            return [config]
+        configs = []
+        for assignments in itertools.product(*[Sweep.get_assignments(group) for group in sweep]):
+            new_config = copy.deepcopy(config)
+            for assignment in assignments:
+                for path, value in assignment.items():
+                    Sweep.set(new_config, path, value)
+            if new_config not in configs:
+                configs.append(new_config)
+        return configs
+
+    @staticmethod
+    def get_prefix(config):
+        """Return the keys of the stages of a run config (see Step.get_keys), evaluations last, None if it cannot be planned."""
+        # imported here, expanding sweeps (main.py --validate) only needs the config
+        from .module_loader import ModuleLoader
+        from .exp.step import Step
+
+        try:
+            steps = ModuleLoader.get_exp_by_name(config["exp"]).plan(config)
+            if steps is None:
+                return []
+            return [key for key in Step.get_keys(steps, config["dataset"])[0] if key is not None]
+        except Exception:
+            return None
+
+    @staticmethod
+    def order(entries):
+        """Return the entries of a config file ({"repeat", "config"}) ordered by the stages of their runs:
+        runs sharing a prefix of stages, e.g. the same anonymized set, are next to each other.
+        The Scheduler then runs them one after another while their datasets are still cached."""
+        keys = []
+        for entry in entries:
+            key = Sweep.get_prefix(entry["config"])
+            # malformed runs stay behind the run before them, their errors are reported when they are added to the Scheduler
+            keys.append(key if key is not None else (keys[-1] if len(keys) else []))
+        # the order of runs with equal stages is kept
+        return [entry for key, entry in sorted(zip(keys, entries), key=lambda x: x[0])]
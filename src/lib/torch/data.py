@@ -1,24 +1,23 @@
 import torch
 from torch.utils.data import Dataset
 
-import cv2
 import numpy as np
 import random
-from ..data.point import Image, PNGImage
+from ..data.point import Image, PNGImage, PackedImage, MemoryImage
 
 
 class TorchImageDataset(Dataset):
-    def __init__(self, filenames, transform=None):
-        self.filenames = filenames
-        self.len = len(filenames)
+    def __init__(self, points, transform=None):
+        self.points = points
+        self.len = len(points)
         self.transform = transform
         self.initialization()
 
     def initialization(self):
         pass
 
-    def process_img(self, filename):
-        img = cv2.imread(filename)
+    def process_img(self, point):
+        img = point.load_image()
         img.astype(float)
         img = img / 255.0
         img = torch.from_numpy(img)
@@ -29,13 +28,13 @@ class TorchImageDataset(Dataset):
         return img.float()
 
     def __getitem__(self, index):
-        return self.process_img(self.filenames[index])
+        return self.process_img(self.points[index])
 
     def split(self, rate):
         threshold = int(self.len * rate)
         return (
-            TorchImageDataset(self.filenames[:threshold], self.transform),
-            TorchImageDataset(self.filenames[threshold:], self.transform),
+            TorchImageDataset(self.points[:threshold], self.transform),
+            TorchImageDataset(self.points[threshold:], self.transform),
         )
 
     def __len__(self):
@@ -45,27 +44,26 @@ class TorchImageDataset(Dataset):
         new = new.detach().cpu().numpy()
         new = np.transpose(new, (1, 2, 0))
         new = new * 255
-        cv2.imwrite(self.filenames[index], new)
+        self.points[index].save_image(new)
 
     def shuffle(self, seed=None):
         random.seed(a=seed)
-        random.shuffle(self.filenames)
+        random.shuffle(self.points)
 
     @staticmethod
     def from_set(set):
         points = list(set.datapoints.values())
-        if not type(points[0]) in [Image, PNGImage]:
+        if not type(points[0]) in [Image, PNGImage, PackedImage, MemoryImage]:
             raise AttributeError("TorchImageDataset: Datapoints must be images")
 
-        filenames = list(map(lambda x: x.get_path(), points))
-        return __class__(filenames)
+        return __class__(points)
 
 
 class MemoryTorchImageDataset(TorchImageDataset):
     def initialization(self):
         self.images = []
-        for filename in self.filenames:
-            self.images.append(self.process_img(filename))
+        for point in self.points:
+            self.images.append(self.process_img(point))
 
     def __getitem__(self, index):
         return self.images[index]
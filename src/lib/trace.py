@@ -0,0 +1,152 @@
+import os
+import json
+import time
+import yaml
+import fcntl
+import resource
+import threading
+from contextlib import contextmanager
+from .utils import get_tmp_path
+
+
+class Span:
+    def __init__(self, name, args):
+        self.name = name
+        self.args = args
+
+    def set(self, **args):
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects timed spans of the stages of a run in the current process.
+
+    Every span records wall and CPU time (including finished child processes), the bytes read and written
+    (from /proc/self/io, where available) and whatever the stage adds, e.g. processed points or cache hit/miss.
+    Spans are kept as Chrome trace events (chrome://tracing, Perfetto) until collected.
+    """
+
+    events = []
+    stack = []
+
+    @staticmethod
+    def get_io():
+        try:
+            with open("/proc/self/io", "r") as file:
+                io = dict(line.split(": ") for line in file.read().splitlines())
+            return int(io["rchar"]), int(io["wchar"])
+        except (OSError, KeyError, ValueError):
+            return None
+
+    @staticmethod
+    def get_cpu():
+        self = resource.getrusage(resource.RUSAGE_SELF)
+        children = resource.getrusage(resource.RUSAGE_CHILDREN)
+        return self.ru_utime + self.ru_stime + children.ru_utime + children.ru_stime
+
+    @staticmethod
+    @contextmanager
+    def span(name, **args):
+        span = Span(name, args)
+        Tracer.stack.append(span)
+        start = time.time_ns()
+        cpu = Tracer.get_cpu()
+        io = Tracer.get_io()
+        try:
+            yield span
+        finally:
+            Tracer.stack.pop()
+            wall = (time.time_ns() - start) / 1e9
+            span.args["wall"] = wall
+            span.args["cpu"] = Tracer.get_cpu() - cpu
+            end_io = Tracer.get_io()
+            if io is not None and end_io is not None:
+                span.args["read"] = end_io[0] - io[0]
+                span.args["written"] = end_io[1] - io[1]
+            if "points" in span.args and wall > 0:
+                span.args["points_per_s"] = span.args["points"] / wall
+            Tracer.events.append(
+                {
+                    "name": name,
+                    "cat": "seba",
+                    "ph": "X",
+                    "ts": start // 1000,
+                    "dur": int(wall * 1e6),
+                    "pid": os.getpid(),
+                    "tid": threading.get_native_id(),
+                    "args": span.args,
+                }
+            )
+
+    @staticmethod
+    def annotate(**args):
+        """Add values to the innermost open span."""
+        if len(Tracer.stack):
+            Tracer.stack[-1].set(**args)
+
+    @staticmethod
+    def collect():
+        """Return and forget the events recorded so far."""
+        events = Tracer.events
+        Tracer.events = []
+        return events
+
+    @staticmethod
+    def save(events, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    @staticmethod
+    def summarize(events):
+        """Sum up the top-level values of the events per span name."""
+        summary = {}
+        for event in events:
+            stage = summary.setdefault(event["name"], {"count": 0})
+            stage["count"] += 1
+            for k, v in event["args"].items():
+                if k == "cache":
+                    stage[v] = stage.get(v, 0) + 1
+                elif isinstance(v, (int, float)) and k != "points_per_s":
+                    stage[k] = stage.get(k, 0) + v
+        for stage in summary.values():
+            if stage.get("points") and stage.get("wall"):
+                stage["points_per_s"] = stage["points"] / stage["wall"]
+        return summary
+
+    @staticmethod
+    def load_throughput(path="throughput.yaml"):
+        """Return the recorded points and wall time per stage and module, e.g. throughput["anonymize:gaussianblur"]."""
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as file:
+            return yaml.load(file, Loader=yaml.SafeLoader) or {}
+
+    @staticmethod
+    def record_throughput(events, path="throughput.yaml"):
+        """Add the points and wall time of the events that processed points to the recorded throughput.
+        Cache hits and lazily anonymized sets (exp: stream) are skipped,
+        the time an evaluation spent training is only counted for the training."""
+        with open(path + ".lock", "w") as lock:
+            # workers of the job queue record concurrently
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                return Tracer.add_throughput(events, path)
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+    @staticmethod
+    def add_throughput(events, path):
+        throughput = Tracer.load_throughput(path)
+        for event in events:
+            args = event["args"]
+            if "module" not in args or not args.get("points") or args.get("cache") in ["hit", "stream"]:
+                continue
+            stage = throughput.setdefault(event["name"] + ":" + args["module"], {"points": 0, "wall": 0.0})
+            stage["points"] += args["points"]
+            stage["wall"] += max(args["wall"] - args.get("train_wall", 0.0), 0.0)
+        tmp = get_tmp_path(path)
+        with open(tmp, "w") as file:
+            file.write("---\n" + yaml.dump(throughput))
+        os.replace(tmp, path)
+        return throughput
@@ -3,6 +3,8 @@ import subprocess
 from contextlib import contextmanager
 import sys
 import os
+import uuid
+from .resources import ResourceManager
 
 
 def recursive_replace(data, needle, replace):
@@ -17,9 +19,16 @@ def recursive_replace(data, needle, replace):
     return data
 
 
+def get_tmp_path(path, ext="tmp"):
+    """Return a temporary path next to path, unique to the caller, to write a file that then replaces path (os.replace).
+    Processes replacing the same file at once never write to the same temporary file."""
+    return path + "." + str(os.getpid()) + "-" + str(uuid.uuid4())[:8] + "." + ext
+
+
 def exec_ext_cmd(cmd, cwd=None, ignore=False):
     logging.getLogger("seba.cmd").info("Running an external command: " + " ".join(cmd))
-    output = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, cwd=cwd)
+    # the command runs with the CPU budget of the run
+    output = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, cwd=cwd, env=ResourceManager.get_env())
     logging.getLogger("seba.cmd").debug(output.stdout)
     if output.returncode > 0 and not ignore:
         raise RuntimeError("External command returned non-zero exit-code!")
@@ -2,6 +2,7 @@ from ...lib.result import Result
 from .abstract import AbstractFacePrivacy
 from ...lib.inference import Classification
 from ...lib.utils import exec_ext_cmd
+from ...lib.resources import ResourceManager
 
 import os
 import os.path
@@ -34,10 +35,26 @@ class ArcfaceClassification(Classification, AbstractFacePrivacy):
         if "opt" not in self.config or "num_gpus" not in self.config["opt"]:
             raise AttributeError("ArcFace requires number of available gpus")
 
+    def get_model_name(self, set):
+        if not self.content_cache:
+            return set.name
+        # models are cached by the content of the training set, models cached by name by earlier versions are still used
+        name = set.fingerprint()
+        if (name is None or not os.path.exists("arcface_models/" + name + ".pt")) and os.path.exists("arcface_models/" + set.name + ".pt"):
+            return set.name
+        # None if the training set is loaded read-only and was not fingerprinted yet
+        return name
+
+    def is_cached(self, set):
+        name = self.get_model_name(set)
+        if name is None:
+            return None
+        return os.path.exists("arcface_models/" + name + ".pt")
+
     def train(self, set):
-        self.trainingset = set.name
-        if os.path.exists("arcface_models/" + set.name + ".pt"):
-            self.log.info("Skipping training from scratch - using cached model: " + set.name + ".pt")
+        self.trainingset = self.get_model_name(set)
+        if os.path.exists("arcface_models/" + self.trainingset + ".pt"):
+            self.log.info("Skipping training from scratch - using cached model: " + self.trainingset + ".pt")
             return
 
         self.id = str(uuid.uuid4())[:8]
@@ -53,13 +70,13 @@ class ArcfaceClassification(Classification, AbstractFacePrivacy):
         self.reprs = {}
 
         for point in set.datapoints.values():
-            img = self.load_img(point.get_path())
+            img = self.load_img(point)
             self.reprs[point.idname + "." + point.pointname] = self.net(img).numpy()[0]
 
     @torch.no_grad()
     def classify_point(self, image):
         rs = Result(image.idname, image.pointname)
-        img = self.load_img(image.get_path())
+        img = self.load_img(image)
         repr = self.net(img).numpy()[0]
 
         for k, v in self.reprs.items():
@@ -71,7 +88,7 @@ class ArcfaceClassification(Classification, AbstractFacePrivacy):
 
     @torch.no_grad()
     def get_encoding(self, image):
-        img = self.load_img(image.get_path())
+        img = self.load_img(image)
         return self.new(img).numpy()[0]
 
     def create_training_data(self, set):
@@ -92,7 +109,7 @@ class ArcfaceClassification(Classification, AbstractFacePrivacy):
             "-m",
             "mxnet.tools.im2rec",
             "--num-thread",
-            "16",
+            str(ResourceManager.get_budget()),
             "--quality",
             "100",
             "--resize",
@@ -171,8 +188,8 @@ config.val_targets = ['lfw', 'cfp_fp', "agedb_30"]
         return net
 
     @torch.no_grad()
-    def load_img(self, path):
-        img = cv2.imread(path)
+    def load_img(self, point):
+        img = point.load_image()
         img = cv2.resize(img, (112, 112))
 
         img = cv2.cvtColor(img, cv2.COLOR_BGR2RGB)
@@ -49,7 +49,8 @@ class DeepfaceClassification(Classification, AbstractFacePrivacy):
         self.log.info("TRAINING SET: " + set.name)
 
     def enroll(self, set):
-        self.folder = set.folder
+        # DeepFace enrolls the images of a folder, packed sets are linked into one
+        self.folder = set.get_file_folder()
         self.log.info("Starting privacy.\n\tEnroll-Folder: " + self.folder + "\n\tConfiguration: " + str(self.config))
 
     def classify_all(self, set, results):
@@ -28,8 +28,7 @@ class FrknnClassification(Classification, AbstractFacePrivacy):
         pass
 
     def enroll(self, set):
-        self.folder = set.folder
-        self.log.info("Starting privacy.\n\tFolder: " + self.folder + "\n\tConfiguration: " + str(self.config))
+        self.log.info("Starting privacy.\n\tDataset: " + set.name + "\n\tConfiguration: " + str(self.config))
 
         self.log.debug("Extracting face encodings.")
         encodings = []
@@ -33,7 +33,7 @@ class RekognitionClassification(Classification, AbstractFacePrivacy):
 
     def enroll(self, set):
         self.training_set = set
-        self.log.info("Starting privacy.\n\tFolder: " + set.folder + "\n\tConfiguration: " + str(self.config))
+        self.log.info("Starting privacy.\n\tDataset: " + set.name + "\n\tConfiguration: " + str(self.config))
 
         if "arn" in set.meta and set.meta["arn"] not in [None, "", False]:
             if set.meta["arn"].split("/")[-1] == set.name:
@@ -3,8 +3,6 @@ from .abstract import AbstractFacePrivacy
 from ...lib.inference import Classification
 from src.utility.face.ssim import SsimUtility
 
-import cv2
-
 
 class SsimClassification(Classification, AbstractFacePrivacy):
     """This is an image classication using SSIM.
@@ -26,9 +24,9 @@ class SsimClassification(Classification, AbstractFacePrivacy):
 
     def classify_point(self, image):
         rs = Result(image.idname, image.pointname)
-        img1 = cv2.imread(image.get_path())
+        img1 = image.load_image()
         for galimg in self.set.datapoints.values():
-            img2 = cv2.imread(galimg.get_path())
+            img2 = galimg.load_image()
             dist = self.ssim.ssim(img1, img2)
             rs.add_recognized(galimg.idname + "." + galimg.pointname, dist=(1 - dist))
         self.log.debug(str(rs))
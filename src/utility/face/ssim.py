@@ -23,8 +23,8 @@ class SsimUtility(Comparison, AbstractFaceUtility):
     """
 
     def compare_point(self, old_point, new_point):
-        img1 = cv2.imread(old_point.get_path())
-        img2 = cv2.imread(new_point.get_path())
+        img1 = old_point.load_image()
+        img2 = new_point.load_image()
 
         if img1.shape[0] != img2.shape[0] or img1.shape[1] != img2.shape[1]:
             img1 = cv2.resize(img1, (224, 224), interpolation=cv2.INTER_NEAREST)